@@ -0,0 +1,30 @@
+"""Synthetic databases shared by the benchmarks."""
+import random
+from studytracker.db import Database
+
+
+def build_database(path: str, courses: int = 50, assignments: int = 5000, sessions: int = 0,
+                   seed: int = 42) -> None:
+    random.seed(seed)
+    db = Database(path)
+    db.connect()
+    db.initialize_schema('database/schema.sql')
+    db.apply_migrations('database/migrations')
+    db.connection.executemany(
+        "INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+        [(f"Course {i}", f"Teacher {i}", random.randint(1, 6)) for i in range(courses)]
+    )
+    db.connection.executemany(
+        "INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+        ((random.randint(1, courses), f"Assignment {i}",
+          f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+          round(random.uniform(40, 100), 1)) for i in range(assignments))
+    )
+    db.connection.executemany(
+        "INSERT INTO study_sessions (course_id, date, duration_minutes, notes) VALUES (?, ?, ?, ?)",
+        ((random.randint(1, courses),
+          f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+          random.randint(15, 240), f"Session {i}") for i in range(sessions))
+    )
+    db.connection.commit()
+    db.close()
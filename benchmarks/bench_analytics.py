@@ -0,0 +1,78 @@
+"""Vectorized grade analytics against the equivalent per-row Python loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_analytics --assignments 200000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from studytracker.db import Database
+from studytracker.analytics import compute_grade_analytics
+from benchmarks._data import build_database
+
+
+def row_loop_analytics(db: Database) -> dict:
+    """Same statistics computed one sqlite3.Row at a time"""
+    rows = db.fetch_all("""
+        SELECT a.course_id, c.credits, a.grade
+        FROM assignments a
+        JOIN courses c ON a.course_id = c.id
+        WHERE a.grade IS NOT NULL
+    """)
+    grades_by_course = {}
+    total_weighted = 0.0
+    total_credits = 0
+    for row in rows:
+        grades_by_course.setdefault(row['course_id'], []).append(row['grade'])
+        total_weighted += row['grade'] * row['credits']
+        total_credits += row['credits']
+
+    courses = {}
+    for course_id, grades in grades_by_course.items():
+        quartiles = statistics.quantiles(grades, n=4) if len(grades) > 1 else [grades[0]] * 3
+        courses[course_id] = {
+            'mean': statistics.fmean(grades),
+            'median': statistics.median(grades),
+            'std': statistics.stdev(grades) if len(grades) > 1 else None,
+            'p25': quartiles[0],
+            'p75': quartiles[2],
+        }
+    return {'courses': courses, 'weighted_final_grade': total_weighted / total_credits}
+
+
+def best_of(func, db: Database, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(db)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--assignments', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_database(path, args.courses, args.assignments)
+        db = Database(path)
+        db.connect()
+
+        loop_time = best_of(row_loop_analytics, db, args.repeat)
+        vector_time = best_of(compute_grade_analytics, db, args.repeat)
+        db.close()
+
+    print(f"{args.assignments} graded assignments over {args.courses} courses")
+    print(f"  row loop:   {loop_time * 1000:9.1f} ms")
+    print(f"  vectorized: {vector_time * 1000:9.1f} ms   ({loop_time / vector_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
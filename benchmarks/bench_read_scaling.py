@@ -0,0 +1,64 @@
+"""Read throughput of AssignmentService.get_all_assignments from 1 to N threads.
+
+Run from the repository root:
+    python -m benchmarks.bench_read_scaling --assignments 5000 --max-threads 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from studytracker.db import Database
+from studytracker.assignment_service import AssignmentService
+from benchmarks._data import build_database
+
+
+def measure(db: Database, threads: int, duration: float) -> float:
+    service = AssignmentService(db)
+    calls = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        while time.perf_counter() < deadline:
+            service.get_all_assignments()
+            calls[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(calls) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--assignments', type=int, default=5000)
+    parser.add_argument('--max-threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_database(path, args.courses, args.assignments)
+
+        print(f"get_all_assignments over {args.assignments} assignments")
+        print(f"{'threads':>8} {'thread-local':>14} {'read pool':>14}")
+        threads = 1
+        baseline = None
+        while threads <= args.max_threads:
+            results = []
+            for pool_size in (0, threads):
+                db = Database(path, thread_safe=True, read_pool_size=pool_size)
+                db.connect()
+                results.append(measure(db, threads, args.duration))
+                db.close()
+            baseline = baseline or results[0]
+            print(f"{threads:>8} {results[0]:>10.1f}/s {results[1]:>10.1f}/s"
+                  f"   ({results[0] / baseline:.2f}x)")
+            threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Report cards per second: a fresh pyplot figure per course vs one reused CourseChart.
+
+Run from the repository root:
+    python -m benchmarks.bench_report_cards --courses 200
+"""
+import argparse
+import os
+import tempfile
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+from studytracker.db import Database
+from studytracker.report_cards import CourseChart, load_course_data
+from benchmarks._data import build_database
+
+
+def pyplot_card(filename: str, course: dict):
+    """The plotting module's pattern: new figure, tight_layout, close"""
+    fig, (grades_ax, study_ax) = plt.subplots(1, 2, figsize=(9, 3.2))
+    grades_ax.vlines(course['grade_days'], 0, course['grades'], linewidth=6)
+    grades_ax.set_ylim(0, 100)
+    grades_ax.set_title('Grades by Due Date', fontsize=10)
+    if course['average'] is not None:
+        grades_ax.axhline(course['average'], color='#e15759', linestyle='--', linewidth=1)
+    hours = [minutes / 60.0 for minutes in course['study_minutes']]
+    study_ax.step(course['study_weeks'], hours, where='post')
+    study_ax.set_title('Study Hours per Week', fontsize=10)
+    for ax in (grades_ax, study_ax):
+        locator = AutoDateLocator(maxticks=6)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        ax.grid(axis='y', linestyle='--', alpha=0.4)
+    plt.suptitle(course['name'], fontsize=12, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(filename, dpi=100)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--assignments-per-course', type=int, default=30)
+    parser.add_argument('--sessions-per-course', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_database(path, args.courses, args.courses * args.assignments_per_course,
+                       args.courses * args.sessions_per_course)
+        db = Database(path)
+        db.connect()
+        courses = load_course_data(db, list(range(1, args.courses + 1)))
+        db.close()
+
+        filename = os.path.join(tmp, 'card.png')
+        start = time.perf_counter()
+        for course in courses.values():
+            pyplot_card(filename, course)
+        pyplot_rate = len(courses) / (time.perf_counter() - start)
+
+        chart = CourseChart()
+        start = time.perf_counter()
+        for course in courses.values():
+            chart.render(filename, course['name'], course['grade_days'], course['grades'], course['average'],
+                         course['graded_count'], course['study_weeks'], course['study_minutes'])
+        chart_rate = len(courses) / (time.perf_counter() - start)
+
+    print(f"Report cards per second on one core ({len(courses)} courses)")
+    print(f"  pyplot, new figure each   {pyplot_rate:7.1f}")
+    print(f"  reused CourseChart        {chart_rate:7.1f}")
+    print(f"  {chart_rate / pyplot_rate:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
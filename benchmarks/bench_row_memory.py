@@ -0,0 +1,101 @@
+"""Memory per row and load time of StudySessionService.get_all_sessions, dicts vs records.
+
+Run from the repository root:
+    python -m benchmarks.bench_row_memory --sessions 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from studytracker.db import Database
+from studytracker.study_session_service import StudySessionService
+from benchmarks._data import build_database
+
+
+def dict_rows(db: Database) -> list:
+    """The previous implementation: every sqlite3.Row copied into a new dict"""
+    rows = db.fetch_all("""
+        SELECT
+            s.id,
+            s.course_id,
+            c.name as course_name,
+            s.assignment_id,
+            a.title as assignment_title,
+            s.date,
+            s.duration_minutes,
+            s.notes
+        FROM study_sessions s
+        JOIN courses c ON s.course_id = c.id
+        LEFT JOIN assignments a ON s.assignment_id = a.id
+        ORDER BY s.date DESC
+    """)
+    sessions = []
+    for row in rows:
+        sessions.append({
+            'id': row['id'],
+            'course_id': row['course_id'],
+            'course_name': row['course_name'],
+            'assignment_id': row['assignment_id'],
+            'assignment_title': row['assignment_title'],
+            'date': row['date'],
+            'duration_minutes': row['duration_minutes'],
+            'notes': row['notes']
+        })
+    return sessions
+
+
+def record_rows(db: Database) -> list:
+    return StudySessionService(db).get_all_sessions()
+
+
+def bytes_per_row(func, db: Database) -> float:
+    gc.collect()
+    tracemalloc.start()
+    rows = func(db)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    return retained / count
+
+
+def best_of(func, db: Database, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(db)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--sessions', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_database(path, args.courses, assignments=0, sessions=args.sessions)
+        db = Database(path)
+        db.connect()
+
+        results = []
+        for name, func in (('dicts', dict_rows), ('records', record_rows)):
+            results.append((name, bytes_per_row(func, db), best_of(func, db, args.repeat)))
+        db.close()
+
+    print(f"get_all_sessions over {args.sessions} sessions (bytes include the column values)")
+    for name, size, elapsed in results:
+        print(f"  {name:8} {size:7.1f} bytes/row   {elapsed * 1000:9.1f} ms")
+    (_, dict_size, dict_time), (_, record_size, record_time) = results
+    print(f"  records use {dict_size / record_size:.1f}x less memory and load {dict_time / record_time:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
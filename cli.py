@@ -1,16 +1,37 @@
 #!/usr/bin/env python3
 import argparse
 import configparser
+import json
 import sys
 import os
-from studytracker.db import Database
+import time
+from studytracker.db import Database, DELETE_BATCH_SIZE
 from studytracker.course_service import CourseService
 from studytracker.assignment_service import AssignmentService
 from studytracker.study_session_service import StudySessionService
+from studytracker.search_service import SearchService
 from studytracker.reports import ReportGenerator
 from studytracker import plotting
+from studytracker import maintenance
+from studytracker import metrics
+from studytracker import analytics
+from studytracker import multi_db
+from studytracker import archive
+from studytracker import columnar
+from studytracker import dashboard
+from studytracker import report_cards
+from studytracker import watch
 
 
+MIGRATIONS_DIR = 'database/migrations'
+
+# Tables included in a delta export for each --type
+DELTA_EXPORT_TABLES = {
+    'courses': ['courses'],
+    'assignments': ['assignments'],
+    'full': ['courses', 'assignments', 'study_sessions'],
+}
+
 def load_config():
     config = configparser.ConfigParser()
     config_path = 'config/settings.ini'
@@ -24,6 +45,64 @@ def load_config():
     return config['database']['db_path']
 
 
+def load_metrics_textfile():
+    # Metrics are recorded only when [metrics] textfile is set
+    config = configparser.ConfigParser()
+    config.read('config/settings.ini')
+    return config.get('metrics', 'textfile', fallback='') or None
+
+
+def run_command(args):
+    textfile = load_metrics_textfile()
+    if not textfile:
+        args.func(args)
+        return
+
+    metrics.enable()
+    status = 'error'
+    start = time.perf_counter()
+    try:
+        args.func(args)
+        status = 'ok'
+    except SystemExit as e:
+        status = 'error' if e.code else 'ok'
+        raise
+    finally:
+        metrics.record_command(args.command, status, time.perf_counter() - start)
+        try:
+            metrics.write_textfile(textfile)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not write metrics to {textfile}: {e}", file=sys.stderr)
+
+
+def use_snapshot_if_requested(db, args):
+    # Reports read from an in-memory copy so the live file is released right away
+    if not getattr(args, 'snapshot', False):
+        return db
+    snapshot_db = db.snapshot()
+    db.close()
+    return snapshot_db
+
+
+def columnar_if_requested(db, args):
+    # Catch the columnar snapshot up with the database, then read from it instead of SQL
+    if not getattr(args, 'columnar', False):
+        return None
+    columnar.refresh_snapshot(db)
+    return columnar.ColumnarSnapshot(columnar.default_snapshot_dir(db))
+
+
+def plot_pages_if_requested(db, args, chart):
+    # --page-size switches a per-course plot to a multi-page PDF
+    if not getattr(args, 'page_size', None):
+        return False
+    output = args.output
+    if not output.lower().endswith('.pdf'):
+        output = os.path.splitext(output)[0] + '.pdf'
+    plotting.plot_course_pages(db, output, chart, args.page_size, args.sort, args.top)
+    return True
+
+
 def init_database(args):
     try:
         db_path = load_config()
@@ -36,12 +115,33 @@ def init_database(args):
             sys.exit(1)
         
         db.initialize_schema(schema_path)
+        db.apply_migrations(MIGRATIONS_DIR)
+        if args.wal:
+            print(f"Journal mode: {db.set_journal_mode('wal')}")
+        print(f"Schema version: {db.get_schema_version()}")
         db.close()
     except Exception as e:
         print(f"Error initializing database: {e}")
         sys.exit(1)
 
 
+def migrate_database(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        applied = db.apply_migrations(MIGRATIONS_DIR)
+        if applied == 0:
+            print("Database schema is already up to date.")
+        print(f"Schema version: {db.get_schema_version()}")
+        
+        db.close()
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+        sys.exit(1)
+
+
 def add_course(args):
     try:
         db_path = load_config()
@@ -86,6 +186,26 @@ def list_courses(args):
         sys.exit(1)
 
 
+def delete_course(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        course_service = CourseService(db)
+        found = course_service.delete_course(args.id, args.batch_size, show_progress=True)
+        
+        db.close()
+        if not found:
+            sys.exit(1)
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error deleting course: {e}")
+        sys.exit(1)
+
+
 def add_assignment(args):
     try:
         db_path = load_config()
@@ -113,7 +233,14 @@ def list_assignments(args):
         
         assignment_service = AssignmentService(db)
         
-        if args.course_id:
+        if args.upcoming is not None:
+            assignments = assignment_service.get_upcoming_assignments(args.upcoming, args.course_id)
+            print(f"\n=== Assignments Due in the Next {args.upcoming} Days ===")
+        elif args.from_date or args.to_date:
+            assignments = assignment_service.get_assignments_due_between(
+                args.from_date, args.to_date, args.course_id)
+            print(f"\n=== Assignments Due {args.from_date or '...'} to {args.to_date or '...'} ===")
+        elif args.course_id:
             assignments = assignment_service.get_assignments_by_course(args.course_id)
             print(f"\n=== Assignments for Course {args.course_id} ===")
         else:
@@ -157,16 +284,47 @@ def update_grade(args):
         sys.exit(1)
 
 
+def import_grades(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        assignment_service = AssignmentService(db)
+        result = assignment_service.import_grades(args.file)
+        for assignment_id in result['missing_ids']:
+            print(f"  Unknown assignment ID: {assignment_id}")
+        
+        db.close()
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error importing grades: {e}")
+        sys.exit(1)
+
+
 def export_report(args):
     try:
+        if args.since is not None and args.snapshot:
+            raise ValueError("--snapshot cannot be combined with --since, the watermark must be saved to the live database")
+        if args.since is not None and args.since != 'last' and not args.since.isdigit():
+            raise ValueError("--since must be a change log sequence number or 'last'")
         db_path = load_config()
         db = Database(db_path)
         db.connect()
+        db = use_snapshot_if_requested(db, args)
         
         report_gen = ReportGenerator(db)
         
         # Determine report type and format
-        if args.type == 'courses':
+        if args.since is not None:
+            since = None if args.since == 'last' else int(args.since)
+            report_gen.export_changes(args.output, since, args.format, DELTA_EXPORT_TABLES[args.type],
+                                      args.watermark_name or args.type)
+        elif args.format == 'ndjson':
+            raise ValueError("The ndjson format is only available for delta exports (--since)")
+        elif args.type == 'courses':
             if args.format == 'csv':
                 report_gen.export_courses_to_csv(args.output)
             else:
@@ -193,6 +351,7 @@ def export_report_pandas(args):
         db_path = load_config()
         db = Database(db_path)
         db.connect()
+        db = use_snapshot_if_requested(db, args)
 
         report_gen = ReportGenerator(db)
         report_gen.export_full_report_with_pandas(args.output, args.format)
@@ -208,13 +367,31 @@ def final_grade(args):
         db_path = load_config()
         db = Database(db_path)
         db.connect()
+        db = use_snapshot_if_requested(db, args)
 
         report_gen = ReportGenerator(db)
-        grade = report_gen.calculate_weighted_final_grade()
-        if grade == 0.0:
-            print("No graded assignments available to calculate final grade.")
+        if args.rebuild:
+            report_gen.rebuild_grade_totals()
+
+        if args.verify:
+            result = report_gen.verify_grade_totals()
+            print(f"Running total grade: {result['running']}")
+            print(f"Recomputed grade: {result['recomputed']}")
+            if result['ok']:
+                print("Running totals match the assignments.")
+            else:
+                print("Running totals do NOT match the assignments.")
+                for course_name in result['mismatched_courses']:
+                    print(f"  Mismatch: {course_name}")
+                print("Run 'python cli.py final-grade --rebuild' to repair them.")
+                db.close()
+                sys.exit(1)
         else:
-            print(f"Weighted final grade: {grade}")
+            grade = report_gen.calculate_weighted_final_grade()
+            if grade == 0.0:
+                print("No graded assignments available to calculate final grade.")
+            else:
+                print(f"Weighted final grade: {grade}")
 
         db.close()
     except Exception as e:
@@ -222,13 +399,59 @@ def final_grade(args):
         sys.exit(1)
 
 
+def grade_analytics(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        result = analytics.compute_grade_analytics(db, columnar_if_requested(db, args))
+        output = json.dumps(result, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+            print(f"Analytics exported to {args.output}")
+        else:
+            print(output)
+
+        db.close()
+    except Exception as e:
+        print(f"Error computing analytics: {e}")
+        sys.exit(1)
+
+
+def multi_report(args):
+    try:
+        paths = multi_db.discover_databases(args.databases)
+        if not paths:
+            print(f"No database files found for {args.databases}")
+            sys.exit(1)
+
+        result = multi_db.export_combined_report(paths, args.output, args.workers)
+
+        print(f"\n=== Combined Report ({result['databases']} databases) ===")
+        if result['weighted_final_grade'] is None:
+            print("No graded assignments available to calculate final grade.")
+        else:
+            print(f"Weighted final grade: {result['weighted_final_grade']}")
+        print(f"Total Study Time: {result['study_hours']} hours")
+        if result['failed']:
+            print(f"\nFailed to read {len(result['failed'])} database(s):")
+            for path, error in sorted(result['failed'].items()):
+                print(f"  {path}: {error}")
+    except Exception as e:
+        print(f"Error generating combined report: {e}")
+        sys.exit(1)
+
+
 def plot_grades(args):
     try:
         db_path = load_config()
         db = Database(db_path)
         db.connect()
 
-        plotting.plot_average_grade_per_course(db, args.output)
+        if not plot_pages_if_requested(db, args, 'grades'):
+            plotting.plot_average_grade_per_course(db, args.output, columnar_if_requested(db, args))
 
         db.close()
     except Exception as e:
@@ -242,7 +465,7 @@ def plot_timeline(args):
         db = Database(db_path)
         db.connect()
 
-        plotting.plot_assignment_timeline(db, args.output)
+        plotting.plot_assignment_timeline(db, args.output, columnar_if_requested(db, args))
 
         db.close()
     except Exception as e:
@@ -282,7 +505,10 @@ def list_sessions(args):
         
         session_service = StudySessionService(db)
         
-        if args.course_id:
+        if args.from_date or args.to_date:
+            sessions = session_service.get_sessions_between(args.from_date, args.to_date, args.course_id)
+            print(f"\n=== Study Sessions {args.from_date or '...'} to {args.to_date or '...'} ===")
+        elif args.course_id:
             sessions = session_service.get_sessions_by_course(args.course_id)
             print(f"\n=== Study Sessions for Course {args.course_id} ===")
         else:
@@ -312,6 +538,86 @@ def list_sessions(args):
         sys.exit(1)
 
 
+def print_session_findings(duplicates, overfull_days, limit):
+    for duplicate in duplicates[:limit]:
+        ref = f"line {duplicate['ref']}" if duplicate['imported'] else f"session {duplicate['ref']}"
+        first = (f"line {duplicate['duplicate_of']}" if duplicate['duplicate_of_imported']
+                 else f"session {duplicate['duplicate_of']}")
+        print(f"  Duplicate: {ref} repeats {first} ({duplicate['date']}, course {duplicate['course_id']}, "
+              f"{duplicate['duration_minutes']} min)")
+    if len(duplicates) > limit:
+        print(f"  ... and {len(duplicates) - limit} more duplicate(s)")
+    for day in overfull_days[:limit]:
+        print(f"  Over 24h: {day['date']} has {day['sessions']} session(s) totalling "
+              f"{day['minutes'] // 60}h {day['minutes'] % 60}m")
+    if len(overfull_days) > limit:
+        print(f"  ... and {len(overfull_days) - limit} more day(s)")
+
+
+def audit_sessions(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        session_service = StudySessionService(db)
+        report = session_service.audit_sessions(args.from_date, args.to_date)
+        
+        print("\n=== Study Session Audit ===")
+        print(f"Duplicate sessions: {len(report['duplicates'])} ({report['duplicate_minutes']} minutes)")
+        print(f"Days over 24 hours: {len(report['overfull_days'])}")
+        print_session_findings(report['duplicates'], report['overfull_days'], args.limit)
+        
+        db.close()
+        if report['duplicates'] or report['overfull_days']:
+            sys.exit(1)
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error auditing study sessions: {e}")
+        sys.exit(1)
+
+
+def import_sessions(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        session_service = StudySessionService(db)
+        report = session_service.import_sessions(args.file, args.skip_duplicates, args.allow_overfull)
+        print_session_findings(report['duplicates'], report['overfull_days'], args.limit)
+        
+        db.close()
+        if not report['imported'] and (report['duplicates'] or report['overfull_days']):
+            sys.exit(1)
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error importing study sessions: {e}")
+        sys.exit(1)
+
+
+def purge_sessions(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+        
+        session_service = StudySessionService(db)
+        session_service.purge_sessions(args.before, args.course_id, args.batch_size, show_progress=True)
+        
+        db.close()
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error purging study sessions: {e}")
+        sys.exit(1)
+
+
 def session_report(args):
     try:
         db_path = load_config()
@@ -342,13 +648,103 @@ def session_report(args):
         sys.exit(1)
 
 
+def assignment_study_time(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        session_service = StudySessionService(db)
+        rows = session_service.get_study_time_by_assignment(args.assignment_id, args.course_id)
+
+        if not rows:
+            print("No assignments found.")
+        else:
+            print("\n=== Study Time by Assignment ===")
+            for row in rows:
+                grade = row['grade'] if row['grade'] is not None else 'Not graded'
+                print(f"{row['title']} ({row['course_name']}, due {row['due_date']})")
+                print(f"  Studied: {row['total_hours']} hours in {row['session_count']} sessions")
+                print(f"  Grade: {grade}")
+                print()
+
+        if args.output:
+            ReportGenerator(db).export_study_time_by_assignment_to_csv(args.output, args.course_id)
+        if args.plot:
+            plotting.plot_study_time_vs_grade(db, args.plot, args.course_id)
+
+        db.close()
+    except Exception as e:
+        print(f"Error generating assignment study time: {e}")
+        sys.exit(1)
+
+
+def study_trend(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        session_service = StudySessionService(db)
+        trend = session_service.get_study_trend(args.period, args.from_date, args.to_date, args.course_id)
+
+        if not trend:
+            print("No study sessions recorded in this period.")
+        else:
+            print(f"\n=== Study Time per {args.period.capitalize()} ===")
+            current_period = None
+            for row in trend:
+                if row['period_start'] != current_period:
+                    current_period = row['period_start']
+                    print(f"\n{current_period}")
+                print(f"  {row['course_name']}: {row['total_hours']} hours ({row['session_count']} sessions)")
+
+            if args.output:
+                plotting.plot_study_trend(db, args.output, args.period, args.from_date,
+                                          args.to_date, args.course_id)
+
+        db.close()
+    except Exception as e:
+        print(f"Error generating study trend: {e}")
+        sys.exit(1)
+
+
+def search(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        search_service = SearchService(db)
+        results = search_service.search(args.text, args.course_id, args.from_date, args.to_date,
+                                        args.type, args.limit, args.raw)
+
+        if not results:
+            print("No matches found.")
+        else:
+            print(f"\n=== Search Results for \"{args.text}\" ===")
+            for result in results:
+                print(f"{result['kind'].capitalize()} {result['id']} - {result['course_name']} ({result['date']})")
+                print(f"  {result['snippet']}")
+                print()
+
+        db.close()
+    except ValueError as e:
+        print(f"Validation error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error searching: {e}")
+        sys.exit(1)
+
+
 def plot_study_time(args):
     try:
         db_path = load_config()
         db = Database(db_path)
         db.connect()
 
-        plotting.plot_study_time_per_course(db, args.output)
+        if not plot_pages_if_requested(db, args, 'study-time'):
+            plotting.plot_study_time_per_course(db, args.output, columnar_if_requested(db, args))
 
         db.close()
     except Exception as e:
@@ -362,7 +758,8 @@ def plot_efficiency(args):
         db = Database(db_path)
         db.connect()
 
-        plotting.plot_study_efficiency(db, args.output)
+        if not plot_pages_if_requested(db, args, 'efficiency'):
+            plotting.plot_study_efficiency(db, args.output, columnar_if_requested(db, args))
 
         db.close()
     except Exception as e:
@@ -370,6 +767,174 @@ def plot_efficiency(args):
         sys.exit(1)
 
 
+def plot_per_course(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        result = report_cards.plot_per_course(db, args.output_dir, args.course_ids, args.workers, args.dpi)
+        if result:
+            print(f"{result['rendered']} report card(s) in {result['seconds']}s "
+                  f"({result['per_second']} per second)")
+
+        db.close()
+    except Exception as e:
+        print(f"Error plotting report cards: {e}")
+        sys.exit(1)
+
+
+def write_dashboard(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        dashboard.write_dashboard(db, args.output)
+
+        db.close()
+    except Exception as e:
+        print(f"Error writing dashboard: {e}")
+        sys.exit(1)
+
+
+def watch_artifacts(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        watcher = watch.ArtifactWatcher(db, args.output_dir, args.artifacts, args.interval,
+                                        args.debounce, args.max_delay)
+        print(f"Watching {db_path} for changes (Ctrl+C to stop)")
+        try:
+            watcher.run(initial=not args.no_initial)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+
+        db.close()
+    except Exception as e:
+        print(f"Error watching database: {e}")
+        sys.exit(1)
+
+
+def maintain_database(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        report = maintenance.run_maintenance(db, args.vacuum_pages, args.prune_change_log)
+        before = report['before']
+        after = report['after']
+
+        print("\n=== Database Maintenance ===")
+        print(f"Vacuum: {report['vacuum']}")
+        print(f"Auto-vacuum mode: {before['auto_vacuum']} -> {after['auto_vacuum']}")
+        print(f"Pages: {before['page_count']} -> {after['page_count']} "
+              f"({before['page_size']} bytes each)")
+        print(f"Freelist pages: {before['freelist_count']} -> {after['freelist_count']}")
+        print(f"File size: {before['file_bytes']} -> {after['file_bytes']} bytes")
+        if report['change_log_pruned'] is not None:
+            print(f"Change log entries pruned: {report['change_log_pruned']}")
+
+        integrity = report['integrity']
+        if integrity == ['ok']:
+            print("Integrity check: ok")
+        else:
+            print("Integrity check FAILED:")
+            for message in integrity:
+                print(f"  {message}")
+
+        print("\nQuery timings (ms, before -> after):")
+        for name, before_ms in report['timings_before'].items():
+            print(f"  {name}: {before_ms} -> {report['timings_after'][name]}")
+
+        db.close()
+        if integrity != ['ok']:
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error maintaining database: {e}")
+        sys.exit(1)
+
+
+def show_metrics(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        storage = maintenance.get_storage_stats(db)
+        objects = maintenance.get_object_stats(db) if args.objects else None
+        registry = metrics.storage_registry(db_path, storage, objects)
+        db.close()
+
+        if args.output:
+            metrics.write_textfile(args.output, registry, replace=True)
+            print(f"Metrics written to {args.output}")
+        elif args.format == 'prometheus':
+            print(registry.render(), end='')
+        else:
+            print("\n=== Database Metrics ===")
+            print(f"File: {db_path} ({os.path.getsize(db_path)} bytes)")
+            print(f"Pages: {storage['page_count']} x {storage['page_size']} bytes, "
+                  f"{storage['freelist_count']} free")
+            if objects is not None:
+                print(f"\n{'Name':<40} {'Type':<6} {'Pages':>8} {'KB':>10} {'Unused':>7} {'Rows (est.)':>12}")
+                print("-" * 88)
+                for item in objects:
+                    unused = f"{100.0 * item['unused_bytes'] / item['bytes']:.0f}%" if item['bytes'] else '-'
+                    rows = item['rows'] if item['rows'] is not None else '-'
+                    print(f"{item['name']:<40} {item['type']:<6} {item['pages']:>8} "
+                          f"{item['bytes'] / 1024:>10.0f} {unused:>7} {rows:>12}")
+            elif args.objects:
+                print("Per-table sizes need SQLite built with the dbstat virtual table")
+    except Exception as e:
+        print(f"Error collecting metrics: {e}")
+        sys.exit(1)
+
+
+def archive_data(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        report = archive.archive_before(db, args.before, args.archive_dir)
+        if report:
+            sessions = sum(result['sessions'] for result in report.values())
+            assignments = sum(result['assignments'] for result in report.values())
+            print(f"\nArchived {sessions} session(s) and {assignments} assignment(s) "
+                  f"into {len(report)} term file(s)")
+            print("Run 'maintain' to reclaim the freed pages")
+
+        db.close()
+    except Exception as e:
+        print(f"Error archiving data: {e}")
+        sys.exit(1)
+
+
+def refresh_columnar(args):
+    try:
+        db_path = load_config()
+        db = Database(db_path)
+        db.connect()
+
+        directory = args.dir or columnar.default_snapshot_dir(db)
+        report = columnar.refresh_snapshot(db, directory)
+        print(f"\n=== Columnar Snapshot ({directory}) ===")
+        for table, result in report.items():
+            if result['action'] == 'append':
+                print(f"{table}: {result['appended']} row(s) appended, {result['updated']} updated")
+            else:
+                print(f"{table}: rebuilt with {result['rows']} row(s)")
+
+        db.close()
+    except Exception as e:
+        print(f"Error refreshing columnar snapshot: {e}")
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Study Tracker - Manage your courses and assignments',
@@ -406,8 +971,14 @@ Examples:
     
     # Init command
     parser_init = subparsers.add_parser('init', help='Initialize the database schema')
+    parser_init.add_argument('--wal', action='store_true',
+                             help='Switch the database to WAL journal mode so long reads never block writers')
     parser_init.set_defaults(func=init_database)
     
+    # Migrate command
+    parser_migrate = subparsers.add_parser('migrate', help='Apply pending schema migrations to an existing database')
+    parser_migrate.set_defaults(func=migrate_database)
+    
     # Add course command
     parser_add_course = subparsers.add_parser('add-course', help='Add a new course')
     parser_add_course.add_argument('--name', required=True, help='Course name')
@@ -419,6 +990,13 @@ Examples:
     parser_list_courses = subparsers.add_parser('list-courses', help='List all courses')
     parser_list_courses.set_defaults(func=list_courses)
     
+    # Delete course command
+    parser_delete_course = subparsers.add_parser('delete-course', help='Delete a course with its assignments and sessions')
+    parser_delete_course.add_argument('--id', type=int, required=True, help='Course ID')
+    parser_delete_course.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE,
+                                      help='Rows deleted per transaction')
+    parser_delete_course.set_defaults(func=delete_course)
+    
     # Add assignment command
     parser_add_assignment = subparsers.add_parser('add-assignment', help='Add a new assignment')
     parser_add_assignment.add_argument('--course-id', type=int, required=True, help='Course ID')
@@ -430,6 +1008,9 @@ Examples:
     # List assignments command
     parser_list_assignments = subparsers.add_parser('list-assignments', help='List assignments')
     parser_list_assignments.add_argument('--course-id', type=int, help='Filter by course ID')
+    parser_list_assignments.add_argument('--from', dest='from_date', help='Only assignments due on or after this date (YYYY-MM-DD)')
+    parser_list_assignments.add_argument('--to', dest='to_date', help='Only assignments due on or before this date (YYYY-MM-DD)')
+    parser_list_assignments.add_argument('--upcoming', type=int, metavar='DAYS', help='Only assignments due in the next DAYS days')
     parser_list_assignments.set_defaults(func=list_assignments)
     
     # Update grade command
@@ -438,33 +1019,78 @@ Examples:
     parser_update_grade.add_argument('--grade', type=float, required=True, help='New grade')
     parser_update_grade.set_defaults(func=update_grade)
     
+    # Import grades command
+    parser_import_grades = subparsers.add_parser('import-grades', help='Update many grades from a CSV or JSONL gradebook file')
+    parser_import_grades.add_argument('--file', required=True,
+                                      help='CSV with assignment_id,grade columns, or .jsonl with one {"assignment_id", "grade"} object per line')
+    parser_import_grades.set_defaults(func=import_grades)
+    
     # Export command
     parser_export = subparsers.add_parser('export', help='Export data to CSV or Excel')
     parser_export.add_argument('--type', choices=['courses', 'assignments', 'full'], 
                                default='full', help='Type of report')
-    parser_export.add_argument('--format', choices=['csv', 'excel'], 
-                               default='csv', help='Output format')
+    parser_export.add_argument('--format', choices=['csv', 'excel', 'ndjson'], 
+                               default='csv', help='Output format (ndjson only with --since)')
     parser_export.add_argument('--output', required=True, help='Output file path')
+    parser_export.add_argument('--snapshot', action='store_true',
+                               help='Export from an in-memory point-in-time copy of the database')
+    parser_export.add_argument('--since', metavar='WATERMARK',
+                               help="Export only rows changed after this change log sequence number, "
+                                    "or 'last' for the stored watermark; the new watermark is saved")
+    parser_export.add_argument('--watermark-name',
+                               help='Name under which the delta export watermark is stored (default: the --type)')
     parser_export.set_defaults(func=export_report)
 
     # Export using pandas
     parser_export_pd = subparsers.add_parser('export-pandas', help='Export full report using pandas')
     parser_export_pd.add_argument('--format', choices=['csv', 'excel'], default='csv', help='Output format')
     parser_export_pd.add_argument('--output', required=True, help='Output file path')
+    parser_export_pd.add_argument('--snapshot', action='store_true',
+                                  help='Export from an in-memory point-in-time copy of the database')
     parser_export_pd.set_defaults(func=export_report_pandas)
 
     # Final grade command
     parser_final = subparsers.add_parser('final-grade', help='Calculate weighted final grade across courses')
+    parser_final.add_argument('--snapshot', action='store_true',
+                              help='Calculate from an in-memory point-in-time copy of the database')
+    parser_final.add_argument('--verify', action='store_true',
+                              help='Recompute the grade from every assignment and compare it with the running totals')
+    parser_final.add_argument('--rebuild', action='store_true',
+                              help='Rebuild the running grade totals from the assignments')
     parser_final.set_defaults(func=final_grade)
 
+    # Analytics command
+    parser_analytics = subparsers.add_parser('analytics', help='Grade distribution statistics per course as JSON')
+    parser_analytics.add_argument('--output', help='Write the JSON to this file instead of printing it')
+    parser_analytics.add_argument('--columnar', action='store_true',
+                                  help='Read from the columnar snapshot, refreshing it first')
+    parser_analytics.set_defaults(func=grade_analytics)
+
+    # Multi-database report command
+    parser_multi = subparsers.add_parser('multi-report', help='Combined report and weighted grade across many tracker files')
+    parser_multi.add_argument('--databases', required=True,
+                              help='Directory of .db files or a glob pattern such as "students/*.db"')
+    parser_multi.add_argument('--output', default='combined_report.csv', help='Combined CSV output file path')
+    parser_multi.add_argument('--workers', type=int, help='Worker processes (default: one per CPU core)')
+    parser_multi.set_defaults(func=multi_report)
+
     # Plot command
     parser_plot = subparsers.add_parser('plot-grades', help='Plot average grades per course')
     parser_plot.add_argument('--output', default='grade_plot.png', help='Output image file path')
+    parser_plot.add_argument('--columnar', action='store_true',
+                             help='Read from the columnar snapshot, refreshing it first')
+    parser_plot.add_argument('--page-size', type=int,
+                             help='Write a multi-page PDF with this many courses per page')
+    parser_plot.add_argument('--sort', choices=['value', 'name'], default='value',
+                             help='Page order: highest value first or by course name')
+    parser_plot.add_argument('--top', type=int, help='Only the first N courses in page order')
     parser_plot.set_defaults(func=plot_grades)
 
     # Plot timeline command
     parser_plot_timeline = subparsers.add_parser('plot-timeline', help='Plot assignment timeline and workload')
     parser_plot_timeline.add_argument('--output', default='assignment_timeline.png', help='Output image file path')
+    parser_plot_timeline.add_argument('--columnar', action='store_true',
+                                      help='Read from the columnar snapshot, refreshing it first')
     parser_plot_timeline.set_defaults(func=plot_timeline)
     
     # Add study session command
@@ -479,28 +1105,153 @@ Examples:
     # List study sessions command
     parser_list_sessions = subparsers.add_parser('list-sessions', help='List study sessions')
     parser_list_sessions.add_argument('--course-id', type=int, help='Filter by course ID')
+    parser_list_sessions.add_argument('--from', dest='from_date', help='Only sessions on or after this date (YYYY-MM-DD)')
+    parser_list_sessions.add_argument('--to', dest='to_date', help='Only sessions on or before this date (YYYY-MM-DD)')
     parser_list_sessions.set_defaults(func=list_sessions)
     
+    # Import study sessions command
+    parser_import_sessions = subparsers.add_parser('import-sessions', help='Add many study sessions from a CSV or JSONL log')
+    parser_import_sessions.add_argument('--file', required=True,
+                                        help='CSV with a course_id,date,duration_minutes[,assignment_id,notes] header, or .jsonl')
+    parser_import_sessions.add_argument('--skip-duplicates', action='store_true',
+                                        help='Leave out sessions already stored or repeated in the file instead of rejecting it')
+    parser_import_sessions.add_argument('--allow-overfull', action='store_true',
+                                        help='Import even if a day would add up to more than 24 hours')
+    parser_import_sessions.add_argument('--limit', type=int, default=20, help='Findings to list per kind')
+    parser_import_sessions.set_defaults(func=import_sessions)
+    
+    # Audit study sessions command
+    parser_audit_sessions = subparsers.add_parser('audit-sessions', help='Find duplicate sessions and days over 24 hours')
+    parser_audit_sessions.add_argument('--from', dest='from_date', help='Only sessions on or after this date (YYYY-MM-DD)')
+    parser_audit_sessions.add_argument('--to', dest='to_date', help='Only sessions on or before this date (YYYY-MM-DD)')
+    parser_audit_sessions.add_argument('--limit', type=int, default=20, help='Findings to list per kind')
+    parser_audit_sessions.set_defaults(func=audit_sessions)
+    
+    # Purge study sessions command
+    parser_purge_sessions = subparsers.add_parser('purge-sessions', help='Delete study sessions by date and/or course in batches')
+    parser_purge_sessions.add_argument('--before', help='Delete sessions dated before this day (YYYY-MM-DD)')
+    parser_purge_sessions.add_argument('--course', dest='course_id', type=int, help='Only sessions of this course ID')
+    parser_purge_sessions.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE,
+                                       help='Rows deleted per transaction')
+    parser_purge_sessions.set_defaults(func=purge_sessions)
+    
     # Study session report command
     parser_session_report = subparsers.add_parser('session-report', help='Show study time summary by course')
     parser_session_report.set_defaults(func=session_report)
     
+    # Search command
+    parser_search = subparsers.add_parser('search', help='Search session notes and assignment titles')
+    parser_search.add_argument('text', help='Words to search for')
+    parser_search.add_argument('--type', choices=['session', 'assignment'], help='Only search one kind of record')
+    parser_search.add_argument('--course-id', type=int, help='Filter by course ID')
+    parser_search.add_argument('--from', dest='from_date', help='Only records on or after this date (YYYY-MM-DD)')
+    parser_search.add_argument('--to', dest='to_date', help='Only records on or before this date (YYYY-MM-DD)')
+    parser_search.add_argument('--limit', type=int, default=20, help='Maximum number of results')
+    parser_search.add_argument('--raw', action='store_true', help='Treat the text as an FTS5 query (AND, OR, NOT, prefix*)')
+    parser_search.set_defaults(func=search)
+    
     # Plot study time command
     parser_plot_study = subparsers.add_parser('plot-study-time', help='Plot study time per course')
     parser_plot_study.add_argument('--output', default='study_time_plot.png', help='Output image file path')
+    parser_plot_study.add_argument('--columnar', action='store_true',
+                                   help='Read from the columnar snapshot, refreshing it first')
+    parser_plot_study.add_argument('--page-size', type=int,
+                                   help='Write a multi-page PDF with this many courses per page')
+    parser_plot_study.add_argument('--sort', choices=['value', 'name'], default='value',
+                                   help='Page order: highest value first or by course name')
+    parser_plot_study.add_argument('--top', type=int, help='Only the first N courses in page order')
     parser_plot_study.set_defaults(func=plot_study_time)
     
+    # Study trend command
+    parser_trend = subparsers.add_parser('study-trend', help='Show study time per course by week or month')
+    parser_trend.add_argument('--period', choices=['week', 'month'], default='week', help='Period length')
+    parser_trend.add_argument('--from', dest='from_date', help='Start date (YYYY-MM-DD)')
+    parser_trend.add_argument('--to', dest='to_date', help='End date (YYYY-MM-DD)')
+    parser_trend.add_argument('--course-id', type=int, help='Filter by course ID')
+    parser_trend.add_argument('--output', help='Also save a trend plot to this image file')
+    parser_trend.set_defaults(func=study_trend)
+    
+    # Study time by assignment command
+    parser_assignment_time = subparsers.add_parser('assignment-study-time', help='Show minutes studied per assignment next to its grade')
+    parser_assignment_time.add_argument('--assignment-id', type=int, help='Show a single assignment')
+    parser_assignment_time.add_argument('--course-id', type=int, help='Filter by course ID')
+    parser_assignment_time.add_argument('--output', help='Also export the table to this CSV file')
+    parser_assignment_time.add_argument('--plot', help='Also save a study time vs grade scatter plot to this image file')
+    parser_assignment_time.set_defaults(func=assignment_study_time)
+    
     # Plot study efficiency command
     parser_plot_efficiency = subparsers.add_parser('plot-study-efficiency', help='Plot study time vs grades to identify areas needing more study')
     parser_plot_efficiency.add_argument('--output', default='study_efficiency_plot.png', help='Output image file path')
+    parser_plot_efficiency.add_argument('--columnar', action='store_true',
+                                        help='Read from the columnar snapshot, refreshing it first')
+    parser_plot_efficiency.add_argument('--page-size', type=int,
+                                        help='Write a multi-page PDF with this many courses per page')
+    parser_plot_efficiency.add_argument('--sort', choices=['value', 'name'], default='value',
+                                        help='Page order: highest value first or by course name')
+    parser_plot_efficiency.add_argument('--top', type=int, help='Only the first N courses in page order')
     parser_plot_efficiency.set_defaults(func=plot_efficiency)
     
+    # Per-course report cards command
+    parser_per_course = subparsers.add_parser('plot-per-course', help='Render one report card PNG per course in parallel')
+    parser_per_course.add_argument('--output-dir', default='report_cards', help='Directory for the course_<id>.png files')
+    parser_per_course.add_argument('--course-id', dest='course_ids', type=int, action='append',
+                                   help='Only this course (repeat for several)')
+    parser_per_course.add_argument('--workers', type=int, help='Worker processes (default: one per CPU core)')
+    parser_per_course.add_argument('--dpi', type=int, default=100, help='Image resolution')
+    parser_per_course.set_defaults(func=plot_per_course)
+    
+    # Dashboard command
+    parser_dashboard = subparsers.add_parser('dashboard', help='Write a self-contained HTML dashboard with interactive charts')
+    parser_dashboard.add_argument('--output', default='dashboard.html', help='Output HTML file path')
+    parser_dashboard.set_defaults(func=write_dashboard)
+    
+    # Watch command
+    parser_watch = subparsers.add_parser('watch', help='Regenerate exports and plots whenever the tables they read change')
+    parser_watch.add_argument('--output-dir', default='artifacts', help='Directory for the regenerated files')
+    parser_watch.add_argument('--artifact', dest='artifacts', action='append', choices=list(watch.WATCHED_ARTIFACTS),
+                              help='Only this artifact (repeat for several, default: all)')
+    parser_watch.add_argument('--interval', type=float, default=1.0, help='Seconds between change checks')
+    parser_watch.add_argument('--debounce', type=float, default=2.0,
+                              help='Seconds without new commits before regenerating')
+    parser_watch.add_argument('--max-delay', type=float, default=30.0,
+                              help='Regenerate after this many seconds even if writes keep coming')
+    parser_watch.add_argument('--no-initial', action='store_true',
+                              help='Skip the full build at startup and only react to new changes')
+    parser_watch.set_defaults(func=watch_artifacts)
+    
+    # Maintenance command
+    parser_maintain = subparsers.add_parser('maintain', help='Refresh planner statistics, vacuum free pages and check integrity')
+    parser_maintain.add_argument('--vacuum-pages', type=int, help='Maximum free pages to reclaim per run (default: all)')
+    parser_maintain.add_argument('--prune-change-log', action='store_true',
+                                 help='Delete change log entries that every stored export watermark has passed')
+    parser_maintain.set_defaults(func=maintain_database)
+    
+    # Metrics command
+    parser_metrics = subparsers.add_parser('metrics', help='Show file and page counts, and optionally per-table/index sizes')
+    parser_metrics.add_argument('--format', choices=['table', 'prometheus'], default='table',
+                                help='Human readable table or Prometheus text format')
+    parser_metrics.add_argument('--output', help='Write the gauges in Prometheus text format into this textfile')
+    parser_metrics.add_argument('--objects', action='store_true',
+                                help='Also measure every table and index with dbstat (reads every page)')
+    parser_metrics.set_defaults(func=show_metrics)
+    
+    # Archive command
+    parser_archive = subparsers.add_parser('archive', help='Move old sessions and assignments into per-term archive files')
+    parser_archive.add_argument('--before', required=True, help='Archive rows dated before this day (YYYY-MM-DD)')
+    parser_archive.add_argument('--archive-dir', help='Directory for the archive files (default: archive/ next to the database)')
+    parser_archive.set_defaults(func=archive_data)
+    
+    # Columnar snapshot command
+    parser_columnar = subparsers.add_parser('columnar-refresh', help='Export or update the NumPy column files used by --columnar')
+    parser_columnar.add_argument('--dir', help='Snapshot directory (default: columnar/ next to the database)')
+    parser_columnar.set_defaults(func=refresh_columnar)
+    
     # Parse arguments
     args = parser.parse_args()
     
     # Execute the appropriate function
     if hasattr(args, 'func'):
-        args.func(args)
+        run_command(args)
     else:
         parser.print_help()
 
@@ -0,0 +1,18 @@
+-- Migration 001: composite, covering and partial indexes for the hot service queries
+
+-- Assignments for a course ordered by due date (replaces the single-column course index)
+CREATE INDEX IF NOT EXISTS idx_assignments_course_due ON assignments(course_id, due_date);
+DROP INDEX IF EXISTS idx_assignments_course_id;
+
+-- All assignments ordered by due date (list-assignments, exports, timeline plot)
+CREATE INDEX IF NOT EXISTS idx_assignments_due_date ON assignments(due_date);
+
+-- Graded assignments by course (final grade, average grade plots)
+CREATE INDEX IF NOT EXISTS idx_assignments_graded ON assignments(course_id, grade) WHERE grade IS NOT NULL;
+
+-- Sessions by course ordered by date, covering the per-course duration sums
+CREATE INDEX IF NOT EXISTS idx_study_sessions_course_date ON study_sessions(course_id, date, duration_minutes);
+DROP INDEX IF EXISTS idx_study_sessions_course_id;
+
+-- Courses ordered by name
+CREATE INDEX IF NOT EXISTS idx_courses_name ON courses(name);
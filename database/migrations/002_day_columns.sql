@@ -0,0 +1,12 @@
+-- Migration 002: integer day columns (days since 1970-01-01) for fast date range queries
+
+ALTER TABLE study_sessions ADD COLUMN date_day INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(date) - 2440587.5 AS INTEGER)) VIRTUAL;
+ALTER TABLE assignments ADD COLUMN due_day INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(due_date) - 2440587.5 AS INTEGER)) VIRTUAL;
+
+-- Sessions in a date window
+CREATE INDEX IF NOT EXISTS idx_study_sessions_date_day ON study_sessions(date_day);
+
+-- Assignments due in a date window
+CREATE INDEX IF NOT EXISTS idx_assignments_due_day ON assignments(due_day);
@@ -0,0 +1,76 @@
+-- Migration 003: study minutes rolled up per (course, day), kept current by triggers
+
+CREATE TABLE IF NOT EXISTS study_daily_rollup (
+    course_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,  -- Day number (days since 1970-01-01), as in study_sessions.date_day
+    session_count INTEGER NOT NULL,
+    total_minutes INTEGER NOT NULL,
+    PRIMARY KEY (course_id, day),
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_study_daily_rollup_day ON study_daily_rollup(day);
+
+-- Backfill from the sessions that already exist; dates without a day number are
+-- added by the update trigger once migration 009 zero-pads them
+INSERT OR REPLACE INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+SELECT course_id, date_day, COUNT(*), SUM(duration_minutes)
+FROM study_sessions
+WHERE date_day IS NOT NULL
+GROUP BY course_id, date_day;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup_insert
+AFTER INSERT ON study_sessions
+BEGIN
+    INSERT INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+    VALUES (NEW.course_id, NEW.date_day, 1, NEW.duration_minutes)
+    ON CONFLICT (course_id, day) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup_delete
+AFTER DELETE ON study_sessions
+BEGIN
+    UPDATE study_daily_rollup
+    SET session_count = session_count - 1,
+        total_minutes = total_minutes - OLD.duration_minutes
+    WHERE course_id = OLD.course_id AND day = OLD.date_day;
+    DELETE FROM study_daily_rollup
+    WHERE course_id = OLD.course_id AND day = OLD.date_day AND session_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup_update
+AFTER UPDATE OF course_id, date, duration_minutes ON study_sessions
+BEGIN
+    UPDATE study_daily_rollup
+    SET session_count = session_count - 1,
+        total_minutes = total_minutes - OLD.duration_minutes
+    WHERE course_id = OLD.course_id AND day = OLD.date_day;
+    DELETE FROM study_daily_rollup
+    WHERE course_id = OLD.course_id AND day = OLD.date_day AND session_count <= 0;
+    INSERT INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+    VALUES (NEW.course_id, NEW.date_day, 1, NEW.duration_minutes)
+    ON CONFLICT (course_id, day) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
+
+-- Weeks start on Monday; day 0 (1970-01-01) was a Thursday
+CREATE VIEW IF NOT EXISTS study_weekly_rollup AS
+SELECT
+    course_id,
+    date((day - ((day + 3) % 7 + 7) % 7) * 86400, 'unixepoch') AS period_start,
+    SUM(session_count) AS session_count,
+    SUM(total_minutes) AS total_minutes
+FROM study_daily_rollup
+GROUP BY course_id, period_start;
+
+CREATE VIEW IF NOT EXISTS study_monthly_rollup AS
+SELECT
+    course_id,
+    date(day * 86400, 'unixepoch', 'start of month') AS period_start,
+    SUM(session_count) AS session_count,
+    SUM(total_minutes) AS total_minutes
+FROM study_daily_rollup
+GROUP BY course_id, period_start;
@@ -0,0 +1,60 @@
+-- Migration 004: FTS5 full-text indexes over session notes and assignment titles
+
+CREATE VIRTUAL TABLE IF NOT EXISTS study_sessions_fts USING fts5(
+    notes,
+    content='study_sessions',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS assignments_fts USING fts5(
+    title,
+    content='assignments',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+-- Index the rows that already exist
+INSERT INTO study_sessions_fts(study_sessions_fts) VALUES ('rebuild');
+INSERT INTO assignments_fts(assignments_fts) VALUES ('rebuild');
+
+-- Keep the indexes in sync; sessions without notes are never indexed
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_fts_insert
+AFTER INSERT ON study_sessions WHEN NEW.notes IS NOT NULL
+BEGIN
+    INSERT INTO study_sessions_fts (rowid, notes) VALUES (NEW.id, NEW.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_fts_delete
+AFTER DELETE ON study_sessions WHEN OLD.notes IS NOT NULL
+BEGIN
+    INSERT INTO study_sessions_fts (study_sessions_fts, rowid, notes) VALUES ('delete', OLD.id, OLD.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_fts_update
+AFTER UPDATE OF notes ON study_sessions
+BEGIN
+    INSERT INTO study_sessions_fts (study_sessions_fts, rowid, notes)
+    SELECT 'delete', OLD.id, OLD.notes WHERE OLD.notes IS NOT NULL;
+    INSERT INTO study_sessions_fts (rowid, notes)
+    SELECT NEW.id, NEW.notes WHERE NEW.notes IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_fts_insert
+AFTER INSERT ON assignments
+BEGIN
+    INSERT INTO assignments_fts (rowid, title) VALUES (NEW.id, NEW.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_fts_delete
+AFTER DELETE ON assignments
+BEGIN
+    INSERT INTO assignments_fts (assignments_fts, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_fts_update
+AFTER UPDATE OF title ON assignments
+BEGIN
+    INSERT INTO assignments_fts (assignments_fts, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+    INSERT INTO assignments_fts (rowid, title) VALUES (NEW.id, NEW.title);
+END;
@@ -0,0 +1,74 @@
+-- Migration 005: running per-course grade totals for the credit-weighted final grade
+
+CREATE TABLE IF NOT EXISTS course_grade_totals (
+    course_id INTEGER PRIMARY KEY,
+    graded_count INTEGER NOT NULL,
+    grade_sum REAL NOT NULL,
+    weighted_sum REAL NOT NULL,  -- SUM(grade * credits) over graded assignments
+    total_weight REAL NOT NULL,  -- SUM(credits) over graded assignments
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
+
+-- Backfill from the assignments that are already graded
+INSERT OR REPLACE INTO course_grade_totals (course_id, graded_count, grade_sum, weighted_sum, total_weight)
+SELECT a.course_id, COUNT(*), SUM(a.grade), SUM(a.grade) * c.credits, COUNT(*) * c.credits
+FROM assignments a
+JOIN courses c ON a.course_id = c.id
+WHERE a.grade IS NOT NULL
+GROUP BY a.course_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_grade_totals_insert
+AFTER INSERT ON assignments WHEN NEW.grade IS NOT NULL
+BEGIN
+    INSERT INTO course_grade_totals (course_id, graded_count, grade_sum, weighted_sum, total_weight)
+    SELECT NEW.course_id, 1, NEW.grade, NEW.grade * credits, credits
+    FROM courses WHERE id = NEW.course_id
+    ON CONFLICT (course_id) DO UPDATE SET
+        graded_count = graded_count + 1,
+        grade_sum = grade_sum + excluded.grade_sum,
+        weighted_sum = weighted_sum + excluded.weighted_sum,
+        total_weight = total_weight + excluded.total_weight;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_grade_totals_delete
+AFTER DELETE ON assignments WHEN OLD.grade IS NOT NULL
+BEGIN
+    UPDATE course_grade_totals
+    SET graded_count = graded_count - 1,
+        grade_sum = grade_sum - OLD.grade,
+        weighted_sum = weighted_sum - OLD.grade * (SELECT credits FROM courses WHERE id = OLD.course_id),
+        total_weight = total_weight - (SELECT credits FROM courses WHERE id = OLD.course_id)
+    -- When the course itself is deleted its totals row goes with it
+    WHERE course_id = OLD.course_id AND EXISTS (SELECT 1 FROM courses WHERE id = OLD.course_id);
+    DELETE FROM course_grade_totals WHERE course_id = OLD.course_id AND graded_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_grade_totals_update
+AFTER UPDATE OF grade, course_id ON assignments
+BEGIN
+    UPDATE course_grade_totals
+    SET graded_count = graded_count - 1,
+        grade_sum = grade_sum - OLD.grade,
+        weighted_sum = weighted_sum - OLD.grade * (SELECT credits FROM courses WHERE id = OLD.course_id),
+        total_weight = total_weight - (SELECT credits FROM courses WHERE id = OLD.course_id)
+    WHERE course_id = OLD.course_id AND OLD.grade IS NOT NULL;
+    DELETE FROM course_grade_totals WHERE course_id = OLD.course_id AND graded_count <= 0;
+    INSERT INTO course_grade_totals (course_id, graded_count, grade_sum, weighted_sum, total_weight)
+    SELECT NEW.course_id, 1, NEW.grade, NEW.grade * credits, credits
+    FROM courses WHERE id = NEW.course_id AND NEW.grade IS NOT NULL
+    ON CONFLICT (course_id) DO UPDATE SET
+        graded_count = graded_count + 1,
+        grade_sum = grade_sum + excluded.grade_sum,
+        weighted_sum = weighted_sum + excluded.weighted_sum,
+        total_weight = total_weight + excluded.total_weight;
+END;
+
+-- Credit changes re-weight the course from its grade sum, so they never accumulate error
+CREATE TRIGGER IF NOT EXISTS trg_courses_grade_totals_credits
+AFTER UPDATE OF credits ON courses
+BEGIN
+    UPDATE course_grade_totals
+    SET weighted_sum = grade_sum * NEW.credits,
+        total_weight = graded_count * NEW.credits
+    WHERE course_id = NEW.id;
+END;
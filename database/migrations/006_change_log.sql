@@ -0,0 +1,75 @@
+-- Migration 006: change data capture log feeding incremental (delta) exports
+
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- Monotonic, never reused
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete')),
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+-- Last change_log sequence number included in each named delta export
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    name TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    exported_at TEXT NOT NULL
+);
+
+-- Seed the log with the existing rows so a delta export from 0 is a full export
+INSERT INTO change_log (table_name, row_id, operation) SELECT 'courses', id, 'insert' FROM courses;
+INSERT INTO change_log (table_name, row_id, operation) SELECT 'assignments', id, 'insert' FROM assignments;
+INSERT INTO change_log (table_name, row_id, operation) SELECT 'study_sessions', id, 'insert' FROM study_sessions;
+
+CREATE TRIGGER IF NOT EXISTS trg_courses_change_log_insert
+AFTER INSERT ON courses
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('courses', NEW.id, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_courses_change_log_update
+AFTER UPDATE ON courses
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('courses', NEW.id, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_courses_change_log_delete
+AFTER DELETE ON courses
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('courses', OLD.id, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_change_log_insert
+AFTER INSERT ON assignments
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('assignments', NEW.id, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_change_log_update
+AFTER UPDATE ON assignments
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('assignments', NEW.id, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_assignments_change_log_delete
+AFTER DELETE ON assignments
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('assignments', OLD.id, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_change_log_insert
+AFTER INSERT ON study_sessions
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('study_sessions', NEW.id, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_change_log_update
+AFTER UPDATE ON study_sessions
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('study_sessions', NEW.id, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_change_log_delete
+AFTER DELETE ON study_sessions
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('study_sessions', OLD.id, 'delete');
+END;
@@ -0,0 +1,34 @@
+-- Migration 007: catalog of per-term archive files holding old sessions and assignments
+
+CREATE TABLE IF NOT EXISTS archive_partitions (
+    term TEXT PRIMARY KEY,  -- e.g. 2024-fall
+    path TEXT NOT NULL,
+    first_day INTEGER NOT NULL,  -- Day numbers of the oldest and newest archived row
+    last_day INTEGER NOT NULL,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    assignment_count INTEGER NOT NULL DEFAULT 0,
+    archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Grades moved to archive files stay in course_grade_totals; this keeps their share
+-- so the totals can still be verified and rebuilt from the live assignments
+CREATE TABLE IF NOT EXISTS archived_grade_totals (
+    course_id INTEGER PRIMARY KEY,
+    graded_count INTEGER NOT NULL,
+    grade_sum REAL NOT NULL,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
+
+-- Per-course graded count and grade sum over live and archived assignments
+CREATE VIEW IF NOT EXISTS all_grade_totals AS
+SELECT course_id, SUM(graded_count) AS graded_count, SUM(grade_sum) AS grade_sum
+FROM (
+    SELECT course_id, COUNT(*) AS graded_count, SUM(grade) AS grade_sum
+    FROM assignments
+    WHERE grade IS NOT NULL
+    GROUP BY course_id
+    UNION ALL
+    SELECT course_id, graded_count, grade_sum
+    FROM archived_grade_totals
+)
+GROUP BY course_id;
@@ -0,0 +1,7 @@
+-- Migration 008: index study sessions by assignment
+
+-- Serves per-assignment study time (covering the duration sums) and the
+-- ON DELETE SET NULL lookup that runs for every deleted assignment
+CREATE INDEX IF NOT EXISTS idx_study_sessions_assignment
+ON study_sessions(assignment_id, duration_minutes)
+WHERE assignment_id IS NOT NULL;
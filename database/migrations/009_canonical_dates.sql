@@ -0,0 +1,23 @@
+-- Migration 009: zero-pad dates such as 2025-3-1, which julianday() and the day columns cannot read
+
+UPDATE study_sessions SET date = fixed.date
+FROM (
+    SELECT id, printf('%04d-%02d-%02d',
+                      CAST(substr(date, 1, instr(date, '-') - 1) AS INTEGER),
+                      CAST(substr(rest, 1, instr(rest, '-') - 1) AS INTEGER),
+                      CAST(substr(rest, instr(rest, '-') + 1) AS INTEGER)) AS date
+    FROM (SELECT id, date, substr(date, instr(date, '-') + 1) AS rest
+          FROM study_sessions WHERE julianday(date) IS NULL)
+) AS fixed
+WHERE study_sessions.id = fixed.id AND julianday(fixed.date) IS NOT NULL;
+
+UPDATE assignments SET due_date = fixed.due_date
+FROM (
+    SELECT id, printf('%04d-%02d-%02d',
+                      CAST(substr(due_date, 1, instr(due_date, '-') - 1) AS INTEGER),
+                      CAST(substr(rest, 1, instr(rest, '-') - 1) AS INTEGER),
+                      CAST(substr(rest, instr(rest, '-') + 1) AS INTEGER)) AS due_date
+    FROM (SELECT id, due_date, substr(due_date, instr(due_date, '-') + 1) AS rest
+          FROM assignments WHERE julianday(due_date) IS NULL)
+) AS fixed
+WHERE assignments.id = fixed.id AND julianday(fixed.due_date) IS NOT NULL;
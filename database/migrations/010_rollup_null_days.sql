@@ -0,0 +1,33 @@
+-- Migration 010: keep sessions without a day number out of the daily rollup
+-- The triggers of migration 003 insert a NULL day for dates julianday() cannot read
+
+DROP TRIGGER IF EXISTS trg_study_sessions_rollup_insert;
+DROP TRIGGER IF EXISTS trg_study_sessions_rollup_update;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup_insert
+AFTER INSERT ON study_sessions
+WHEN NEW.date_day IS NOT NULL
+BEGIN
+    INSERT INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+    VALUES (NEW.course_id, NEW.date_day, 1, NEW.duration_minutes)
+    ON CONFLICT (course_id, day) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_rollup_update
+AFTER UPDATE OF course_id, date, duration_minutes ON study_sessions
+BEGIN
+    UPDATE study_daily_rollup
+    SET session_count = session_count - 1,
+        total_minutes = total_minutes - OLD.duration_minutes
+    WHERE course_id = OLD.course_id AND day = OLD.date_day;
+    DELETE FROM study_daily_rollup
+    WHERE course_id = OLD.course_id AND day = OLD.date_day AND session_count <= 0;
+    INSERT INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+    SELECT NEW.course_id, NEW.date_day, 1, NEW.duration_minutes
+    WHERE NEW.date_day IS NOT NULL
+    ON CONFLICT (course_id, day) DO UPDATE SET
+        session_count = session_count + 1,
+        total_minutes = total_minutes + excluded.total_minutes;
+END;
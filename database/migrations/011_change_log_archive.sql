@@ -0,0 +1,28 @@
+-- Migration 011: log rows moved to archive files as 'archive' instead of 'delete'
+-- The CHECK constraint cannot be altered in place, so the log is copied to a new table
+
+CREATE TABLE change_log_new (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- Monotonic, never reused
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete', 'archive')),
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+INSERT INTO change_log_new (seq, table_name, row_id, operation, changed_at)
+SELECT seq, table_name, row_id, operation, changed_at FROM change_log;
+
+-- Keep numbering after the last sequence handed out, even if those entries were pruned
+INSERT INTO sqlite_sequence (name, seq)
+SELECT 'change_log_new', 0
+WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'change_log_new');
+UPDATE sqlite_sequence
+SET seq = (SELECT MAX(seq) FROM sqlite_sequence WHERE name IN ('change_log', 'change_log_new'))
+WHERE name = 'change_log_new';
+
+-- The change log triggers name change_log; legacy renaming leaves them alone
+-- instead of failing while change_log does not exist
+PRAGMA legacy_alter_table = ON;
+DROP TABLE change_log;
+ALTER TABLE change_log_new RENAME TO change_log;
+PRAGMA legacy_alter_table = OFF;
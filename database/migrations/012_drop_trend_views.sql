@@ -0,0 +1,6 @@
+-- Migration 012: drop the weekly and monthly rollup views
+-- Study trends group study_daily_rollup by period after a day range filter, which
+-- the views could not take, so nothing reads them any more
+
+DROP VIEW IF EXISTS study_weekly_rollup;
+DROP VIEW IF EXISTS study_monthly_rollup;
@@ -31,6 +31,5 @@ CREATE TABLE IF NOT EXISTS study_sessions (
 );
 
 -- Indexes for faster lookups
-CREATE INDEX IF NOT EXISTS idx_assignments_course_id ON assignments(course_id);
-CREATE INDEX IF NOT EXISTS idx_study_sessions_course_id ON study_sessions(course_id);
+-- Composite and covering indexes are added by the versioned scripts in database/migrations/
 CREATE INDEX IF NOT EXISTS idx_study_sessions_date ON study_sessions(date);
@@ -0,0 +1,166 @@
+import math
+from typing import Dict, List, Optional
+import numpy as np
+from studytracker.db import Database
+from studytracker.archive import archives_for_range
+from studytracker.columnar import ColumnarSnapshot, course_study_totals
+
+
+PERCENTILES = (0.25, 0.75, 0.9)
+
+GRADE_DTYPE = np.dtype([('course_id', np.int64), ('grade', np.float64)])
+
+
+def load_graded_assignments(db: Database, snapshot: Optional[ColumnarSnapshot] = None) -> np.ndarray:
+    """Graded assignments as (course_id, grade) records sorted by course, then grade.
+
+    The order comes straight from the partial index on graded assignments, so
+    the rows stream into the array without a sort or per-row Python objects.
+    Archived assignments are read one archive file at a time and merged in.
+    With a columnar ``snapshot`` the columns are read from it instead.
+    """
+    if snapshot is not None:
+        grades = snapshot.column('assignments', 'grade')
+        graded = ~np.isnan(grades)
+        records = np.empty(int(graded.sum()), dtype=GRADE_DTYPE)
+        records['course_id'] = snapshot.column('assignments', 'course_id')[graded]
+        records['grade'] = grades[graded]
+        records.sort(order=['course_id', 'grade'])
+        return records
+
+    cursor = db.connection.cursor()
+    cursor.row_factory = None
+    cursor.execute("""
+        SELECT course_id, grade
+        FROM assignments
+        WHERE grade IS NOT NULL
+        ORDER BY course_id, grade
+    """)
+    records = np.fromiter(cursor, dtype=GRADE_DTYPE)
+
+    archives = archives_for_range(db)
+    if not archives:
+        return records
+    chunks = [records]
+    for alias, path in archives.items():
+        db.attach({alias: path})
+        cursor.execute(f"""
+            SELECT course_id, grade
+            FROM {alias}.assignments
+            WHERE grade IS NOT NULL AND course_id IN (SELECT id FROM main.courses)
+        """)
+        chunks.append(np.fromiter(cursor, dtype=GRADE_DTYPE))
+    records = np.concatenate(chunks)
+    records.sort(order=['course_id', 'grade'])
+    return records
+
+
+def load_courses(db: Database, snapshot: Optional[ColumnarSnapshot] = None) -> Dict[int, dict]:
+    """Name, credits and total study minutes (from the daily rollups) per course"""
+    if snapshot is not None:
+        _, minutes = course_study_totals(snapshot)
+        return {
+            int(course_id): {'id': int(course_id), 'name': str(name), 'credits': int(credits),
+                             'study_minutes': int(study_minutes)}
+            for course_id, name, credits, study_minutes in zip(
+                snapshot.column('courses', 'id'), snapshot.text('courses', 'name'),
+                snapshot.column('courses', 'credits'), minutes)
+        }
+    query = """
+        SELECT c.id, c.name, c.credits, COALESCE(SUM(r.total_minutes), 0) AS study_minutes
+        FROM courses c
+        LEFT JOIN study_daily_rollup r ON r.course_id = c.id
+        GROUP BY c.id
+    """
+    return {row['id']: dict(row) for row in db.fetch_all(query)}
+
+
+def _clean(value) -> Optional[float]:
+    # JSON has no NaN; statistics that are undefined (e.g. std of one grade) become null
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
+
+
+def _group_percentile(grades: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    # Linear interpolation inside each sorted group, like np.percentile
+    position = starts + (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    return grades[lower] + (grades[upper] - grades[lower]) * (position - lower)
+
+
+def compute_grade_analytics(db: Database, snapshot: Optional[ColumnarSnapshot] = None) -> Dict[str, object]:
+    """Grade distribution statistics per course and overall, plus study time vs grade correlation.
+
+    The graded assignments are loaded once into NumPy arrays sorted by course,
+    and every per-course statistic is computed for all courses at once with
+    segmented reductions. ``weighted_gpa`` is the credit-weighted mean of the
+    course averages; ``weighted_final_grade`` weights every graded assignment
+    by its course credits, like ``ReportGenerator.calculate_weighted_final_grade``.
+    Pass a columnar ``snapshot`` to skip SQL entirely.
+    """
+    records = load_graded_assignments(db, snapshot)
+    if records.size == 0:
+        return {'courses': [], 'overall': None, 'study_grade_correlation': None}
+
+    course_ids = records['course_id']
+    grades = records['grade']
+    courses = load_courses(db, snapshot)
+
+    group_ids, starts, counts = np.unique(course_ids, return_index=True, return_counts=True)
+    sums = np.add.reduceat(grades, starts)
+    means = sums / counts
+    squares = np.add.reduceat(grades * grades, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variances = (squares - counts * means * means) / (counts - 1)
+    stds = np.where(counts > 1, np.sqrt(np.maximum(variances, 0.0)), np.nan)
+    medians = _group_percentile(grades, starts, counts, 0.5)
+    percentiles = {q: _group_percentile(grades, starts, counts, q) for q in PERCENTILES}
+    mins = grades[starts]
+    maxs = grades[starts + counts - 1]
+
+    course_credits = np.array([courses[int(cid)]['credits'] for cid in group_ids], dtype=np.float64)
+    study_minutes = np.array([courses[int(cid)]['study_minutes'] for cid in group_ids], dtype=np.float64)
+
+    correlation = None
+    if group_ids.size >= 2 and study_minutes.std() > 0 and means.std() > 0:
+        correlation = _clean(np.corrcoef(study_minutes, means)[0, 1])
+
+    overall = {
+        'graded_assignments': int(grades.size),
+        'mean': _clean(grades.mean()),
+        'median': _clean(np.median(grades)),
+        'std': _clean(grades.std(ddof=1)) if grades.size > 1 else None,
+        'weighted_gpa': _clean(np.average(means, weights=course_credits)),
+        'weighted_final_grade': _clean(np.dot(sums, course_credits) / np.dot(counts, course_credits)),
+    }
+    for q, value in zip(PERCENTILES, np.quantile(grades, PERCENTILES)):
+        overall[f'p{int(q * 100)}'] = _clean(value)
+
+    course_stats: List[dict] = []
+    for i, course_id in enumerate(group_ids):
+        course = courses[int(course_id)]
+        stats = {
+            'course_id': int(course_id),
+            'course_name': course['name'],
+            'credits': int(course['credits']),
+            'graded_count': int(counts[i]),
+            'mean': _clean(means[i]),
+            'median': _clean(medians[i]),
+            'std': _clean(stds[i]),
+            'min': _clean(mins[i]),
+            'max': _clean(maxs[i]),
+            'study_hours': _clean(study_minutes[i] / 60.0),
+        }
+        for q in PERCENTILES:
+            stats[f'p{int(q * 100)}'] = _clean(percentiles[q][i])
+        course_stats.append(stats)
+    course_stats.sort(key=lambda stats: stats['course_name'])
+
+    return {
+        'courses': course_stats,
+        'overall': overall,
+        'study_grade_correlation': correlation,
+    }
@@ -0,0 +1,320 @@
+import os
+import re
+from typing import Dict, Optional, Tuple
+from studytracker.db import Database
+from studytracker.dates import from_epoch_day, to_epoch_day, EPOCH_ORDINAL, MIN_DAY, MAX_DAY
+from datetime import date
+
+
+# Terms are half years: spring runs January to June, fall July to December
+TERM_PATTERN = re.compile(r'^(\d{4})-(spring|fall)$')
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS study_sessions (
+    id INTEGER PRIMARY KEY,
+    course_id INTEGER NOT NULL,
+    assignment_id INTEGER,
+    assignment_title TEXT,  -- Copied when archived; the assignment may be archived elsewhere
+    date TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    notes TEXT,
+    date_day INTEGER GENERATED ALWAYS AS (CAST(julianday(date) - 2440587.5 AS INTEGER)) VIRTUAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_study_sessions_date_day ON study_sessions(date_day);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_course_date ON study_sessions(course_id, date, duration_minutes);
+
+CREATE TABLE IF NOT EXISTS assignments (
+    id INTEGER PRIMARY KEY,
+    course_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    grade REAL,
+    due_day INTEGER GENERATED ALWAYS AS (CAST(julianday(due_date) - 2440587.5 AS INTEGER)) VIRTUAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_assignments_due_day ON assignments(due_day);
+CREATE INDEX IF NOT EXISTS idx_assignments_course_due ON assignments(course_id, due_date);
+"""
+
+SESSION_COLUMNS = "id, course_id, assignment_id, assignment_title, date, date_day, duration_minutes, notes"
+
+ASSIGNMENT_COLUMNS = "id, course_id, title, due_date, due_day, grade"
+
+ARCHIVE_ALIAS = 'archive_target'
+
+
+def term_of_day(day: int) -> str:
+    value = from_epoch_day(day)
+    return f"{value.year}-{'spring' if value.month <= 6 else 'fall'}"
+
+
+def term_bounds(term: str) -> Tuple[int, int]:
+    """First and last day number of a term such as ``2024-fall``"""
+    match = TERM_PATTERN.match(term)
+    if not match:
+        raise ValueError(f"Term must look like 2024-spring or 2024-fall: {term}")
+    year = int(match.group(1))
+    if match.group(2) == 'spring':
+        first, last = date(year, 1, 1), date(year, 6, 30)
+    else:
+        first, last = date(year, 7, 1), date(year, 12, 31)
+    return first.toordinal() - EPOCH_ORDINAL, last.toordinal() - EPOCH_ORDINAL
+
+
+def _next_term(term: str) -> str:
+    year, half = TERM_PATTERN.match(term).groups()
+    return f"{year}-fall" if half == 'spring' else f"{int(year) + 1}-spring"
+
+
+def archive_alias(term: str) -> str:
+    """Schema name an archive file is attached under, e.g. archive_2024_fall"""
+    term_bounds(term)
+    return 'archive_' + term.replace('-', '_')
+
+
+def archives_for_range(db: Database, start_day: int = MIN_DAY, end_day: int = MAX_DAY) -> Dict[str, str]:
+    """Archive files ({alias: path}) holding rows inside an inclusive day window"""
+    query = """
+        SELECT term, path
+        FROM archive_partitions
+        WHERE first_day <= ? AND last_day >= ?
+        ORDER BY first_day
+    """
+    archives = {}
+    for row in db.fetch_all(query, (end_day, start_day)):
+        if not os.path.isfile(row['path']):
+            raise FileNotFoundError(f"Archive file for {row['term']} not found: {row['path']}")
+        archives[archive_alias(row['term'])] = row['path']
+    return archives
+
+
+def session_source(db: Database, start_day: int = MIN_DAY,
+                   end_day: int = MAX_DAY) -> Tuple[str, Dict[str, str]]:
+    """FROM-clause source of study sessions in a day window, and the archives it needs.
+
+    The live sessions are always included; archive files are added with
+    UNION ALL only when their term overlaps the window. SQLite pushes the
+    outer WHERE clause into every branch, so each one still uses its own
+    date_day index.
+    """
+    archives = archives_for_range(db, start_day, end_day)
+    branches = ["""
+        SELECT s.id, s.course_id, s.assignment_id, a.title AS assignment_title,
+               s.date, s.date_day, s.duration_minutes, s.notes
+        FROM main.study_sessions s
+        LEFT JOIN main.assignments a ON s.assignment_id = a.id
+    """]
+    for alias in archives:
+        branches.append(f"SELECT {SESSION_COLUMNS} FROM {alias}.study_sessions")
+    return "(" + " UNION ALL ".join(branches) + ")", archives
+
+
+def assignment_source(db: Database, start_day: int = MIN_DAY,
+                      end_day: int = MAX_DAY) -> Tuple[str, Dict[str, str]]:
+    """FROM-clause source of assignments due in a day window, and the archives it needs"""
+    archives = archives_for_range(db, start_day, end_day)
+    if not archives:
+        return "assignments", archives
+    branches = [f"SELECT {ASSIGNMENT_COLUMNS} FROM main.assignments"]
+    for alias in archives:
+        branches.append(f"SELECT {ASSIGNMENT_COLUMNS} FROM {alias}.assignments")
+    return "(" + " UNION ALL ".join(branches) + ")", archives
+
+
+def default_archive_dir(db: Database) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db.db_path)), 'archive')
+
+
+def archive_before(db: Database, before_date: str, archive_dir: Optional[str] = None) -> Dict[str, dict]:
+    """Move sessions dated and assignments due before ``before_date`` into per-term archive files.
+
+    Every term gets its own database file in ``archive_dir`` (default: an
+    ``archive`` directory next to the database) and a row in
+    ``archive_partitions``. Study rollups and grade totals keep the archived
+    rows, so summaries, trends and the final grade do not change. Assignments
+    that live sessions still point to stay in the database.
+    """
+    cutoff = to_epoch_day(before_date)
+    archive_dir = archive_dir or default_archive_dir(db)
+    stem = os.path.splitext(os.path.basename(db.db_path))[0]
+
+    row = db.fetch_one("""
+        SELECT MIN(day) AS first_day FROM (
+            SELECT MIN(date_day) AS day FROM study_sessions
+            UNION ALL
+            SELECT MIN(due_day) FROM assignments
+        )
+    """)
+    if row is None or row['first_day'] is None or row['first_day'] >= cutoff:
+        print(f"Nothing to archive before {before_date}")
+        return {}
+
+    terms = []
+    term = term_of_day(row['first_day'])
+    while term_bounds(term)[0] < cutoff:
+        first_day, last_day = term_bounds(term)
+        terms.append((term, first_day, min(last_day, cutoff - 1)))
+        term = _next_term(term)
+
+    # A term archived before keeps adding to its existing file
+    paths = {row['term']: row['path'] for row in db.fetch_all("SELECT term, path FROM archive_partitions")}
+    for term, _, _ in terms:
+        paths.setdefault(term, os.path.abspath(os.path.join(archive_dir, f"{stem}_{term}.db")))
+
+    os.makedirs(archive_dir, exist_ok=True)
+    report = {}
+    # All sessions go first, so no assignment is archived while an older session still points to it
+    for term, first_day, last_day in terms:
+        path = paths[term]
+        moved = _archive_sessions(db, term, path, first_day, last_day)
+        if moved:
+            report.setdefault(term, {'path': path, 'sessions': 0, 'assignments': 0})['sessions'] = moved
+    for term, first_day, last_day in terms:
+        path = paths[term]
+        moved = _archive_assignments(db, term, path, first_day, last_day)
+        if moved:
+            report.setdefault(term, {'path': path, 'sessions': 0, 'assignments': 0})['assignments'] = moved
+
+    report = {term: report[term] for term, _, _ in terms if term in report}
+    for term, result in report.items():
+        print(f"Archived {result['sessions']} session(s) and {result['assignments']} assignment(s) "
+              f"of {term} to {result['path']}")
+    if not report:
+        print(f"Nothing to archive before {before_date}")
+    return report
+
+
+def _create_archive_file(path: str):
+    archive_db = Database(path)
+    archive_db.connect()
+    try:
+        archive_db.connection.executescript(ARCHIVE_SCHEMA)
+    finally:
+        archive_db.close()
+
+
+def _move_rows(db: Database, path: str, move):
+    # Copy and delete in one transaction spanning both files; rows are copied with
+    # INSERT OR REPLACE, so a run interrupted between the two files can be repeated
+    _create_archive_file(path)
+    db.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (path,))
+    try:
+        with db.transaction():
+            row = db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+            moved = move()
+            # The delete triggers logged the moved rows as deleted; delta exports must see them archived
+            db.execute("UPDATE change_log SET operation = 'archive' WHERE seq > ? AND operation = 'delete'",
+                       (row['seq'] if row else 0,))
+            return moved
+    finally:
+        db.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+
+
+def _record_partition(db: Database, term: str, path: str, first_day: int, last_day: int,
+                      session_count: int = 0, assignment_count: int = 0):
+    db.execute("""
+        INSERT INTO archive_partitions (term, path, first_day, last_day, session_count, assignment_count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (term) DO UPDATE SET
+            path = excluded.path,
+            first_day = MIN(first_day, excluded.first_day),
+            last_day = MAX(last_day, excluded.last_day),
+            session_count = session_count + excluded.session_count,
+            assignment_count = assignment_count + excluded.assignment_count,
+            archived_at = excluded.archived_at
+    """, (term, path, first_day, last_day, session_count, assignment_count))
+
+
+def _archive_sessions(db: Database, term: str, path: str, first_day: int, last_day: int) -> int:
+    bounds = db.fetch_one("""
+        SELECT COUNT(*) AS session_count, MIN(date_day) AS first_day, MAX(date_day) AS last_day
+        FROM study_sessions
+        WHERE date_day BETWEEN ? AND ?
+    """, (first_day, last_day))
+    if not bounds['session_count']:
+        return 0
+
+    def move():
+        db.execute(f"""
+            INSERT OR REPLACE INTO {ARCHIVE_ALIAS}.study_sessions
+                (id, course_id, assignment_id, assignment_title, date, duration_minutes, notes)
+            SELECT s.id, s.course_id, s.assignment_id, a.title, s.date, s.duration_minutes, s.notes
+            FROM study_sessions s
+            LEFT JOIN assignments a ON s.assignment_id = a.id
+            WHERE s.date_day BETWEEN ? AND ?
+        """, (first_day, last_day))
+        rollups = db.fetch_all("""
+            SELECT course_id, date_day, COUNT(*) AS session_count, SUM(duration_minutes) AS total_minutes
+            FROM study_sessions
+            WHERE date_day BETWEEN ? AND ?
+            GROUP BY course_id, date_day
+        """, (first_day, last_day))
+        cursor = db.execute("DELETE FROM study_sessions WHERE date_day BETWEEN ? AND ?", (first_day, last_day))
+        # The delete triggers took the sessions out of the daily rollups; archived days stay counted
+        db.executemany("""
+            INSERT INTO study_daily_rollup (course_id, day, session_count, total_minutes)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (course_id, day) DO UPDATE SET
+                session_count = session_count + excluded.session_count,
+                total_minutes = total_minutes + excluded.total_minutes
+        """, [tuple(row) for row in rollups])
+        _record_partition(db, term, path, bounds['first_day'], bounds['last_day'],
+                          session_count=cursor.rowcount)
+        return cursor.rowcount
+
+    return _move_rows(db, path, move)
+
+
+def _archive_assignments(db: Database, term: str, path: str, first_day: int, last_day: int) -> int:
+    selection = """
+        FROM assignments
+        WHERE due_day BETWEEN ? AND ?
+          AND id NOT IN (SELECT assignment_id FROM study_sessions WHERE assignment_id IS NOT NULL)
+    """
+    params = (first_day, last_day)
+    bounds = db.fetch_one(f"""
+        SELECT COUNT(*) AS assignment_count, MIN(due_day) AS first_day, MAX(due_day) AS last_day
+        {selection}
+    """, params)
+    if not bounds['assignment_count']:
+        return 0
+
+    def move():
+        db.execute(f"""
+            INSERT OR REPLACE INTO {ARCHIVE_ALIAS}.assignments (id, course_id, title, due_date, grade)
+            SELECT id, course_id, title, due_date, grade
+            {selection}
+        """, params)
+        totals = db.fetch_all(f"""
+            SELECT course_id, COUNT(*) AS graded_count, SUM(grade) AS grade_sum
+            {selection}
+              AND grade IS NOT NULL
+            GROUP BY course_id
+        """, params)
+        cursor = db.execute(f"DELETE FROM assignments WHERE id IN (SELECT id {selection})", params)
+        # The delete triggers took the grades out of the course totals; archived grades still count
+        for row in totals:
+            db.execute("""
+                INSERT INTO course_grade_totals (course_id, graded_count, grade_sum, weighted_sum, total_weight)
+                SELECT id, ?, ?, ? * credits, ? * credits
+                FROM courses WHERE id = ?
+                ON CONFLICT (course_id) DO UPDATE SET
+                    graded_count = graded_count + excluded.graded_count,
+                    grade_sum = grade_sum + excluded.grade_sum,
+                    weighted_sum = weighted_sum + excluded.weighted_sum,
+                    total_weight = total_weight + excluded.total_weight
+            """, (row['graded_count'], row['grade_sum'], row['grade_sum'], row['graded_count'],
+                  row['course_id']))
+            db.execute("""
+                INSERT INTO archived_grade_totals (course_id, graded_count, grade_sum)
+                VALUES (?, ?, ?)
+                ON CONFLICT (course_id) DO UPDATE SET
+                    graded_count = graded_count + excluded.graded_count,
+                    grade_sum = grade_sum + excluded.grade_sum
+            """, (row['course_id'], row['graded_count'], row['grade_sum']))
+        _record_partition(db, term, path, bounds['first_day'], bounds['last_day'],
+                          assignment_count=cursor.rowcount)
+        return cursor.rowcount
+
+    return _move_rows(db, path, move)
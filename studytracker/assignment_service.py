@@ -1,8 +1,14 @@
-from typing import List, Optional
-from studytracker.db import Database
-from datetime import datetime
+import csv
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from studytracker.db import Database, Record
+from studytracker.metrics import instrumented
+from studytracker.dates import canonical_date, day_range, today_epoch_day, MAX_DAY
+from studytracker.archive import assignment_source
 
 
+@instrumented
 class AssignmentService:
     
     def __init__(self, db: Database):
@@ -13,9 +19,9 @@ class AssignmentService:
         if not title or not title.strip():
             raise ValueError("Assignment title cannot be empty")
         
-        # Validate date format
+        # Validate date format; 2025-3-1 is stored as 2025-03-01
         try:
-            datetime.strptime(due_date, '%Y-%m-%d')
+            due_date = canonical_date(due_date)
         except ValueError:
             raise ValueError("Due date must be in YYYY-MM-DD format")
         
@@ -54,7 +60,72 @@ class AssignmentService:
             print(f"Assignment {assignment_id} not found.")
             return False
     
-    def get_all_assignments(self) -> List[dict]:
+    def update_grades(self, grades: Iterable[Tuple[int, float]]) -> Dict[str, object]:
+        """Apply many (assignment_id, grade) pairs in one transaction.
+
+        All grades are range-checked at once before anything is written; an
+        invalid grade rejects the whole batch. IDs that do not exist are found
+        with one set-based query and reported instead of updated. When an ID
+        appears more than once, its last grade wins.
+        """
+        pairs = list(grades)
+        if not pairs:
+            return {'updated': 0, 'missing_ids': []}
+        
+        try:
+            ids = np.array([pair[0] for pair in pairs], dtype=np.int64)
+            values = np.array([pair[1] for pair in pairs], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Assignment IDs must be integers and grades must be numbers")
+        
+        invalid = ~np.isfinite(values) | (values < 0) | (values > 100)
+        if invalid.any():
+            examples = ", ".join(f"{i}: {g}" for i, g in zip(ids[invalid][:5], values[invalid][:5]))
+            raise ValueError(f"{int(invalid.sum())} grade(s) not between 0 and 100 (e.g. {examples})")
+        
+        unique_ids = np.unique(ids)
+        missing_query = """
+            SELECT value AS id
+            FROM json_each(?)
+            WHERE value NOT IN (SELECT id FROM assignments)
+            ORDER BY value
+        """
+        rows = self.db.fetch_all(missing_query, (json.dumps(unique_ids.tolist()),))
+        missing_ids = [row['id'] for row in rows]
+        
+        keep = ~np.isin(ids, missing_ids) if missing_ids else np.ones(ids.size, dtype=bool)
+        updates = list(zip(values[keep].tolist(), ids[keep].tolist()))
+        with self.db.transaction():
+            self.db.executemany("UPDATE assignments SET grade = ? WHERE id = ?", updates)
+        
+        updated = int(np.unique(ids[keep]).size)
+        print(f"Updated grades for {updated} assignment(s)")
+        if missing_ids:
+            print(f"Skipped {len(missing_ids)} unknown assignment ID(s)")
+        return {'updated': updated, 'missing_ids': missing_ids}
+    
+    def import_grades(self, filename: str) -> Dict[str, object]:
+        """Bulk update grades from a CSV (assignment_id,grade header) or JSONL file"""
+        is_jsonl = filename.lower().endswith(('.jsonl', '.ndjson'))
+        pairs = []
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            # Errors name the line in the file, counting blank lines
+            if is_jsonl:
+                records = ((line_number, line) for line_number, line in enumerate(f, start=1) if line.strip())
+            else:
+                reader = csv.DictReader(f)
+                records = ((reader.line_num, record) for record in reader)
+            for line_number, record in records:
+                try:
+                    if is_jsonl:
+                        record = json.loads(record)
+                    pairs.append((int(record['assignment_id']), float(record['grade'])))
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"{filename}, line {line_number}: expected assignment_id and numeric grade")
+        
+        return self.update_grades(pairs)
+    
+    def get_all_assignments(self) -> List[Record]:
         query = """
             SELECT 
                 a.id,
@@ -67,43 +138,55 @@ class AssignmentService:
             JOIN courses c ON a.course_id = c.id
             ORDER BY a.due_date
         """
-        rows = self.db.fetch_all(query)
-        
-        assignments = []
-        for row in rows:
-            assignments.append({
-                'id': row['id'],
-                'course_id': row['course_id'],
-                'course_name': row['course_name'],
-                'title': row['title'],
-                'due_date': row['due_date'],
-                'grade': row['grade']
-            })
-        
-        return assignments
+        return self.db.fetch_records(query)
     
-    def get_assignments_by_course(self, course_id: int) -> List[dict]:
+    def get_assignments_by_course(self, course_id: int) -> List[Record]:
         query = """
             SELECT id, course_id, title, due_date, grade
             FROM assignments
             WHERE course_id = ?
             ORDER BY due_date
         """
-        rows = self.db.fetch_all(query, (course_id,))
-        
-        assignments = []
-        for row in rows:
-            assignments.append({
-                'id': row['id'],
-                'course_id': row['course_id'],
-                'title': row['title'],
-                'due_date': row['due_date'],
-                'grade': row['grade']
-            })
-        
-        return assignments
+        return self.db.fetch_records(query, (course_id,))
+    
+    def get_assignments_due_between(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                    course_id: Optional[int] = None) -> List[Record]:
+        """Get assignments due in an inclusive YYYY-MM-DD window; either end may be open"""
+        start_day, end_day = day_range(start_date, end_date)
+        return self._get_assignments_by_due_day(start_day, end_day, course_id)
+    
+    def get_upcoming_assignments(self, days: int = 7, course_id: Optional[int] = None) -> List[Record]:
+        """Get assignments due from today through the next ``days`` days"""
+        if days < 0:
+            raise ValueError("Days must not be negative")
+        today = today_epoch_day()
+        return self._get_assignments_by_due_day(today, min(today + days, MAX_DAY), course_id)
+    
+    def _get_assignments_by_due_day(self, start_day: int, end_day: int,
+                                    course_id: Optional[int]) -> List[Record]:
+        # Archived assignments are included when the window reaches into an archived term
+        source, archives = assignment_source(self.db, start_day, end_day)
+        query = f"""
+            SELECT 
+                a.id,
+                a.course_id,
+                c.name as course_name,
+                a.title,
+                a.due_date,
+                a.due_day,
+                a.grade
+            FROM {source} a
+            JOIN courses c ON a.course_id = c.id
+            WHERE a.due_day BETWEEN ? AND ?
+        """
+        params = [start_day, end_day]
+        if course_id is not None:
+            query += " AND a.course_id = ?"
+            params.append(course_id)
+        query += " ORDER BY a.due_day"
+        return self.db.fetch_records(query, tuple(params), archives)
     
-    def get_assignment_by_id(self, assignment_id: int) -> Optional[dict]:
+    def get_assignment_by_id(self, assignment_id: int) -> Optional[Record]:
         query = """
             SELECT 
                 a.id,
@@ -116,15 +199,4 @@ class AssignmentService:
             JOIN courses c ON a.course_id = c.id
             WHERE a.id = ?
         """
-        row = self.db.fetch_one(query, (assignment_id,))
-        
-        if row:
-            return {
-                'id': row['id'],
-                'course_id': row['course_id'],
-                'course_name': row['course_name'],
-                'title': row['title'],
-                'due_date': row['due_date'],
-                'grade': row['grade']
-            }
-        return None
+        return self.db.fetch_record(query, (assignment_id,))
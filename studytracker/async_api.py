@@ -0,0 +1,104 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from studytracker.db import Database
+from studytracker.course_service import CourseService
+from studytracker.assignment_service import AssignmentService
+from studytracker.study_session_service import StudySessionService
+from studytracker.reports import ReportGenerator
+
+
+class AsyncDatabase:
+    """Asyncio front end that runs blocking database work on a bounded thread pool.
+
+    The pool shares one thread-safe Database, so every worker thread keeps its
+    own connection and at most ``max_workers`` connections exist no matter how
+    many coroutines are waiting; excess calls queue in the executor instead of
+    blocking the loop.
+    """
+
+    def __init__(self, db_path: str, max_workers: int = 4, read_pool_size: int = 0):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be a positive number")
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.db = Database(db_path, thread_safe=True, read_pool_size=read_pool_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def connect(self):
+        if self._executor is None:
+            self.db.connect()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='studytracker-db')
+
+    async def close(self):
+        if self._executor is None:
+            return
+        executor = self._executor
+        self._executor = None
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        self.db.close()
+
+    async def __aenter__(self) -> 'AsyncDatabase':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run ``func(db, *args, **kwargs)`` on a pool thread against the shared Database"""
+        if self._executor is None:
+            raise RuntimeError("AsyncDatabase is not connected")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, self.db, *args, **kwargs))
+
+    async def fetch_all(self, query: str, params=()):
+        return await self.run(lambda db: db.fetch_all(query, params))
+
+    async def fetch_one(self, query: str, params=()):
+        return await self.run(lambda db: db.fetch_one(query, params))
+
+    async def execute(self, query: str, params=()) -> int:
+        """Execute a write and return the affected row count"""
+        return await self.run(lambda db: db.execute(query, params).rowcount)
+
+
+class _AsyncService:
+    """Exposes every public method of ``service_class`` as a coroutine"""
+
+    service_class = None
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    def __getattr__(self, name: str):
+        method = getattr(self.service_class, name, None)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        service_class = self.service_class
+
+        async def call(*args, **kwargs):
+            return await self.db.run(lambda db: getattr(service_class(db), name)(*args, **kwargs))
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+
+class AsyncCourseService(_AsyncService):
+    service_class = CourseService
+
+
+class AsyncAssignmentService(_AsyncService):
+    service_class = AssignmentService
+
+
+class AsyncStudySessionService(_AsyncService):
+    service_class = StudySessionService
+
+
+class AsyncReportGenerator(_AsyncService):
+    service_class = ReportGenerator
@@ -0,0 +1,408 @@
+import json
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from studytracker.db import Database
+from studytracker.archive import archives_for_range
+
+
+# Bumped whenever the file layout changes; older snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+META_FILE = 'meta.json'
+
+# Stored in assignment_id for sessions without an assignment
+NO_ASSIGNMENT = -1
+
+# Numeric columns per table, read straight from SQLite into NumPy
+TABLE_COLUMNS = {
+    'sessions': [
+        ('id', np.int64, 'id'),
+        ('course_id', np.int64, 'course_id'),
+        ('assignment_id', np.int64, f'COALESCE(assignment_id, {NO_ASSIGNMENT})'),
+        ('date_day', np.int32, 'date_day'),
+        ('duration_minutes', np.int32, 'duration_minutes'),
+    ],
+    'assignments': [
+        ('id', np.int64, 'id'),
+        ('course_id', np.int64, 'course_id'),
+        ('due_day', np.int32, 'due_day'),
+        # NULL grades become NaN
+        ('grade', np.float64, 'grade'),
+    ],
+}
+
+# Text columns, stored as int32 codes into a per-column dictionary of distinct values
+TEXT_COLUMNS = {
+    'sessions': [],
+    'assignments': ['title'],
+}
+
+SOURCE_TABLES = {
+    'sessions': 'study_sessions',
+    'assignments': 'assignments',
+}
+
+
+class ColumnarSnapshot:
+    """Read-only view of a snapshot directory written by ``refresh_snapshot``.
+
+    Every column is a ``.npy`` file opened with ``np.load(mmap_mode='r')``,
+    so reading one costs no SQL and creates no Python objects per row; the
+    operating system pages the data in as NumPy touches it. Rows of a table
+    are ordered by id and the ``archived`` column marks rows read from
+    archive files.
+    """
+
+    def __init__(self, directory: str):
+        path = os.path.join(directory, META_FILE)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"No columnar snapshot in {directory}; refresh it first")
+        with open(path, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.directory = directory
+
+    def count(self, table: str) -> int:
+        return self.meta['tables'][table]['count']
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """Memory-mapped column of ``table``; text columns return their codes"""
+        path = os.path.join(self.directory, table, f'{name}.npy')
+        # Files may hold rows past the count from an interrupted refresh
+        return np.load(path, mmap_mode='r')[:self.count(table)]
+
+    def dictionary(self, table: str, name: str) -> np.ndarray:
+        """Distinct values of a text column, indexed by the codes in ``column``"""
+        return np.load(os.path.join(self.directory, table, f'{name}.dict.npy'))
+
+    def text(self, table: str, name: str) -> np.ndarray:
+        return self.dictionary(table, name)[self.column(table, name)]
+
+    def course_slots(self, course_ids: np.ndarray) -> np.ndarray:
+        """Positions of course ids in the ``courses`` columns"""
+        return np.searchsorted(self.column('courses', 'id'), course_ids)
+
+
+def default_snapshot_dir(db: Database) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db.db_path)), 'columnar')
+
+
+def _read_meta(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == SNAPSHOT_VERSION else None
+
+
+def _write_meta(directory: str, meta: dict):
+    # Replaced atomically: readers see either the old counts or the new ones
+    path = os.path.join(directory, META_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _remove_meta(directory: str):
+    path = os.path.join(directory, META_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _save(path: str, values: np.ndarray):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+def _append(path: str, values: np.ndarray, count: int):
+    """Write ``values`` after the first ``count`` rows of a one-dimensional .npy file.
+
+    np.save leaves room in the header for the length to grow, so the shape
+    is rewritten in place and the existing rows are never copied.
+    """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            _, _, dtype = np.lib.format.read_array_header_1_0(f)
+            prefix = 10
+        else:
+            _, _, dtype = np.lib.format.read_array_header_2_0(f)
+            prefix = 12
+        offset = f.tell()
+        total = count + len(values)
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+            np.lib.format.dtype_to_descr(dtype), total)
+        if len(header) + 1 > offset - prefix:
+            f.close()
+            _save(path, np.concatenate([np.load(path)[:count], values.astype(dtype)]))
+            return
+        f.seek(offset + count * dtype.itemsize)
+        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        f.truncate()
+        f.seek(prefix)
+        f.write((header.ljust(offset - prefix - 1) + '\n').encode('latin1'))
+
+
+def _text_dictionary(values: List[str]) -> np.ndarray:
+    # Fixed-width unicode so the dictionary loads without pickle
+    width = max((len(value) for value in values), default=1)
+    return np.array(values, dtype=f'U{max(width, 1)}')
+
+
+def _encode(values: List[str], lookup: Dict[str, int]) -> np.ndarray:
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        codes[i] = code
+    return codes
+
+
+def _row_query(table: str, where: str = "id > ?") -> Tuple[str, str]:
+    # Numeric and text columns come from two queries over the same id-ordered rows
+    expressions = ", ".join(expression for _, _, expression in TABLE_COLUMNS[table])
+    source = SOURCE_TABLES[table]
+    numeric = f"SELECT {expressions} FROM {source} WHERE {where} ORDER BY id"
+    text = ", ".join(TEXT_COLUMNS[table]) or "NULL"
+    return numeric, f"SELECT {text} FROM {source} WHERE {where} ORDER BY id"
+
+
+def _read_rows(db: Database, table: str, after_id: int) -> Dict[str, object]:
+    numeric_query, text_query = _row_query(table)
+    dtype = np.dtype([(name, kind) for name, kind, _ in TABLE_COLUMNS[table]])
+    cursor = db.connection.cursor()
+    cursor.row_factory = None
+    cursor.execute(numeric_query, (after_id,))
+    rows = np.fromiter(cursor, dtype=dtype)
+    columns = {name: rows[name] for name in dtype.names}
+    if TEXT_COLUMNS[table]:
+        cursor.execute(text_query, (after_id,))
+        texts = cursor.fetchall()
+        for i, name in enumerate(TEXT_COLUMNS[table]):
+            columns[name] = [row[i] for row in texts]
+    cursor.close()
+    return columns
+
+
+def _read_archive(path: str, table: str, course_ids: np.ndarray) -> Dict[str, object]:
+    # Archive files are read on their own connection: nothing can be attached
+    # inside the read transaction the rest of the refresh runs in
+    archive_db = Database(path)
+    archive_db.connect()
+    try:
+        columns = _read_rows(archive_db, table, 0)
+    finally:
+        archive_db.close()
+    # Archived rows of courses deleted since are not part of any total
+    keep = np.isin(columns['course_id'], course_ids)
+    for name in list(columns):
+        if name in TEXT_COLUMNS[table]:
+            columns[name] = [value for value, kept in zip(columns[name], keep) if kept]
+        else:
+            columns[name] = columns[name][keep]
+    columns['archived'] = True
+    return columns
+
+
+def _combine(parts: List[Dict[str, object]], table: str) -> Dict[str, object]:
+    # Archive files and the live table each come sorted by id; restore one global order
+    columns = {}
+    for name, _, _ in TABLE_COLUMNS[table]:
+        columns[name] = np.concatenate([part[name] for part in parts])
+    columns['archived'] = np.concatenate([
+        np.full(len(part['id']), part['archived'], dtype=np.bool_) for part in parts
+    ])
+    order = np.argsort(columns['id'], kind='stable')
+    for name in list(columns):
+        columns[name] = columns[name][order]
+    for name in TEXT_COLUMNS[table]:
+        values = [value for part in parts for value in part[name]]
+        columns[name] = [values[i] for i in order]
+    return columns
+
+
+def _write_table(directory: str, table: str, columns: Dict[str, object]) -> int:
+    table_dir = os.path.join(directory, table)
+    os.makedirs(table_dir, exist_ok=True)
+    for name, values in columns.items():
+        if name in TEXT_COLUMNS[table]:
+            lookup: Dict[str, int] = {}
+            _save(os.path.join(table_dir, f'{name}.npy'), _encode(values, lookup))
+            _save(os.path.join(table_dir, f'{name}.dict.npy'), _text_dictionary(list(lookup)))
+        else:
+            _save(os.path.join(table_dir, f'{name}.npy'), values)
+    return len(columns['id'])
+
+
+def _append_table(directory: str, table: str, columns: Dict[str, object], count: int) -> int:
+    table_dir = os.path.join(directory, table)
+    columns['archived'] = np.zeros(len(columns['id']), dtype=np.bool_)
+    for name, values in columns.items():
+        path = os.path.join(table_dir, f'{name}.npy')
+        if name in TEXT_COLUMNS[table]:
+            dictionary_path = os.path.join(table_dir, f'{name}.dict.npy')
+            known = np.load(dictionary_path).tolist()
+            lookup = {value: code for code, value in enumerate(known)}
+            codes = _encode(values, lookup)
+            if len(lookup) > len(known):
+                _save(dictionary_path, _text_dictionary(list(lookup)))
+            _append(path, codes, count)
+        else:
+            _append(path, values, count)
+    return count + len(columns['id'])
+
+
+def _patch_table(db: Database, directory: str, table: str, ids: List[int], count: int):
+    """Overwrite updated rows in place; their positions are found by binary search on id"""
+    table_dir = os.path.join(directory, table)
+    snapshot_ids = np.load(os.path.join(table_dir, 'id.npy'), mmap_mode='r')[:count]
+    updated = np.array(sorted(ids), dtype=np.int64)
+    positions = np.searchsorted(snapshot_ids, updated)
+    found = (positions < count) & (snapshot_ids[np.minimum(positions, count - 1)] == updated)
+    if not found.any():
+        return
+
+    numeric_query, text_query = _row_query(table, "id IN (SELECT value FROM json_each(?))")
+    params = (json.dumps(updated[found].tolist()),)
+    cursor = db.connection.cursor()
+    cursor.row_factory = None
+    dtype = np.dtype([(name, kind) for name, kind, _ in TABLE_COLUMNS[table]])
+    rows = np.fromiter(cursor.execute(numeric_query, params), dtype=dtype)
+    # Rows updated and then deleted are handled by the rebuild a delete causes
+    slots = positions[found][np.isin(updated[found], rows['id'])]
+    for name in dtype.names:
+        column = np.load(os.path.join(table_dir, f'{name}.npy'), mmap_mode='r+')
+        column[slots] = rows[name]
+        column.flush()
+    for i, name in enumerate(TEXT_COLUMNS[table]):
+        values = [row[i] for row in cursor.execute(text_query, params)]
+        dictionary_path = os.path.join(table_dir, f'{name}.dict.npy')
+        known = np.load(dictionary_path).tolist()
+        lookup = {value: code for code, value in enumerate(known)}
+        codes = _encode(values, lookup)
+        if len(lookup) > len(known):
+            _save(dictionary_path, _text_dictionary(list(lookup)))
+        column = np.load(os.path.join(table_dir, f'{name}.npy'), mmap_mode='r+')
+        column[slots] = codes
+        column.flush()
+    cursor.close()
+
+
+def _write_courses(directory: str, rows: list) -> int:
+    # Few rows, so the course table is rewritten on every refresh
+    columns = {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'credits': np.array([row['credits'] for row in rows], dtype=np.int32),
+    }
+    lookup: Dict[str, int] = {}
+    columns['name'] = _encode([row['name'] for row in rows], lookup)
+    table_dir = os.path.join(directory, 'courses')
+    os.makedirs(table_dir, exist_ok=True)
+    for name, values in columns.items():
+        _save(os.path.join(table_dir, f'{name}.npy'), values)
+    _save(os.path.join(table_dir, 'name.dict.npy'), _text_dictionary(list(lookup)))
+    return len(rows)
+
+
+def _change_log_position(db: Database) -> Tuple[int, int]:
+    # Highest sequence number ever handed out, and the oldest one still in the log
+    row = db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+    last = row['seq'] if row else 0
+    row = db.fetch_one("SELECT MIN(seq) AS seq FROM change_log")
+    first = row['seq'] if row['seq'] is not None else last + 1
+    return last, first
+
+
+def refresh_snapshot(db: Database, directory: Optional[str] = None) -> Dict[str, object]:
+    """Bring the columnar snapshot in ``directory`` up to date with the database.
+
+    The first run exports sessions, assignments (archived ones included) and
+    courses to one .npy file per column. Later runs read the change log:
+    rows with ids above the last exported id are appended, updated rows are
+    overwritten in place and a table with deleted rows, or with changes
+    already pruned from the log, is exported again. Returns what was done
+    per table.
+    """
+    directory = directory or default_snapshot_dir(db)
+    meta = _read_meta(directory)
+    report = {}
+    tables = {}
+
+    with db.read_transaction():
+        last_seq, first_seq = _change_log_position(db)
+        # Pruned entries the snapshot never saw make the log useless for catching up
+        if meta is not None and first_seq > meta['seq'] + 1:
+            meta = None
+        if meta is None:
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.makedirs(directory)
+            changes = []
+        else:
+            changes = db.fetch_all("""
+                SELECT table_name, row_id, operation
+                FROM change_log
+                WHERE seq > ? AND seq <= ?
+            """, (meta['seq'], last_seq))
+        courses = db.fetch_all("SELECT id, credits, name FROM courses ORDER BY id")
+
+        for table, source in SOURCE_TABLES.items():
+            state = meta['tables'][table] if meta is not None else None
+            if state is not None:
+                deleted = any(c['table_name'] == source and c['operation'] in ('delete', 'archive')
+                              and c['row_id'] <= state['last_id'] for c in changes)
+                if not deleted:
+                    updated = {c['row_id'] for c in changes if c['table_name'] == source
+                               and c['operation'] == 'update' and c['row_id'] <= state['last_id']}
+                    if updated:
+                        _patch_table(db, directory, table, list(updated), state['count'])
+                    rows = _read_rows(db, table, state['last_id'])
+                    count = _append_table(directory, table, rows, state['count'])
+                    last_id = int(rows['id'][-1]) if len(rows['id']) else state['last_id']
+                    tables[table] = {'count': count, 'last_id': last_id}
+                    report[table] = {'action': 'append', 'appended': len(rows['id']), 'updated': len(updated)}
+                    continue
+                # The old counts no longer describe the files once a table is rewritten
+                _remove_meta(directory)
+
+            course_ids = np.array([row['id'] for row in courses], dtype=np.int64)
+            parts = [_read_archive(path, table, course_ids) for path in archives_for_range(db).values()]
+            live = _read_rows(db, table, 0)
+            live['archived'] = False
+            count = _write_table(directory, table, _combine(parts + [live], table))
+            last_id = int(live['id'][-1]) if len(live['id']) else 0
+            tables[table] = {'count': count, 'last_id': last_id}
+            report[table] = {'action': 'rebuild', 'rows': count}
+
+    tables['courses'] = {'count': _write_courses(directory, courses)}
+    report['courses'] = {'action': 'rebuild', 'rows': tables['courses']['count']}
+    _write_meta(directory, {'version': SNAPSHOT_VERSION, 'seq': last_seq, 'tables': tables})
+    return report
+
+
+def course_study_totals(snapshot: ColumnarSnapshot) -> Tuple[np.ndarray, np.ndarray]:
+    """Session count and total minutes per course, aligned with the ``courses`` columns"""
+    course_ids = snapshot.column('courses', 'id')
+    session_courses = snapshot.column('sessions', 'course_id')
+    size = int(course_ids.max()) + 1 if course_ids.size else 0
+    counts = np.bincount(session_courses, minlength=size)
+    minutes = np.bincount(session_courses, weights=snapshot.column('sessions', 'duration_minutes'),
+                          minlength=size)
+    return counts[course_ids], minutes[course_ids]
+
+
+def course_grade_totals(snapshot: ColumnarSnapshot) -> Tuple[np.ndarray, np.ndarray]:
+    """Graded assignment count and grade sum per course, aligned with the ``courses`` columns"""
+    course_ids = snapshot.column('courses', 'id')
+    grades = snapshot.column('assignments', 'grade')
+    graded = ~np.isnan(grades)
+    size = int(course_ids.max()) + 1 if course_ids.size else 0
+    assignment_courses = snapshot.column('assignments', 'course_id')[graded]
+    counts = np.bincount(assignment_courses, minlength=size)
+    sums = np.bincount(assignment_courses, weights=grades[graded], minlength=size)
+    return counts[course_ids], sums[course_ids]
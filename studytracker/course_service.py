@@ -1,7 +1,10 @@
+import sys
 from typing import List, Optional
-from studytracker.db import Database
+from studytracker.db import Database, Record, DELETE_BATCH_SIZE
+from studytracker.metrics import instrumented
 
 
+@instrumented
 class CourseService:
     
     def __init__(self, db: Database):
@@ -25,34 +28,31 @@ class CourseService:
         print(f"Course added successfully! ID: {course_id}")
         return course_id
     
-    def get_all_courses(self) -> List[dict]:
-        query = "SELECT * FROM courses ORDER BY name"
-        rows = self.db.fetch_all(query)
-        courses = []
-        for row in rows:
-            courses.append({
-                'id': row['id'],
-                'name': row['name'],
-                'teacher': row['teacher'],
-                'credits': row['credits']
-            })
-        
-        return courses
+    def get_all_courses(self) -> List[Record]:
+        query = "SELECT id, name, teacher, credits FROM courses ORDER BY name"
+        return self.db.fetch_records(query)
     
-    def get_course_by_id(self, course_id: int) -> Optional[dict]:
-        query = "SELECT * FROM courses WHERE id = ?"
-        row = self.db.fetch_one(query, (course_id,))
-        
-        if row:
-            return {
-                'id': row['id'],
-                'name': row['name'],
-                'teacher': row['teacher'],
-                'credits': row['credits']
-            }
-        return None
+    def get_course_by_id(self, course_id: int) -> Optional[Record]:
+        query = "SELECT id, name, teacher, credits FROM courses WHERE id = ?"
+        return self.db.fetch_record(query, (course_id,))
     
-    def delete_course(self, course_id: int) -> bool:
+    def delete_course(self, course_id: int, batch_size: int = DELETE_BATCH_SIZE,
+                      show_progress: bool = False) -> bool:
+        # Sessions first, so deleting assignments has no session references left to null out;
+        # each batch commits on its own instead of one long ON DELETE CASCADE
+        for table, label in (('study_sessions', 'sessions'), ('assignments', 'assignments')):
+            total = self.db.fetch_one(f"SELECT COUNT(*) FROM {table} WHERE course_id = ?", (course_id,))[0]
+            if not total:
+                continue
+
+            def progress(done: int):
+                if show_progress:
+                    print(f"\rDeleted {done}/{total} {label}", end='', file=sys.stderr, flush=True)
+
+            self.db.delete_in_batches(table, "course_id = ?", (course_id,), batch_size, progress)
+            if show_progress:
+                print(file=sys.stderr)
+        
         query = "DELETE FROM courses WHERE id = ?"
         cursor = self.db.execute(query, (course_id,))
         
@@ -0,0 +1,349 @@
+import json
+from datetime import datetime
+from typing import Dict
+from studytracker.db import Database
+
+
+# Monday on or before a day number; day 0 (1970-01-01) was a Thursday
+WEEK_START = "{day} - (({day} + 3) % 7 + 7) % 7"
+
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Study Tracker Dashboard</title>
+<style>
+  body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; margin: 0; background: #f4f5f7; color: #222; }
+  header { background: #2c3e50; color: #fff; padding: 16px 24px; }
+  header h1 { margin: 0; font-size: 20px; }
+  header p { margin: 4px 0 0; font-size: 12px; opacity: 0.8; }
+  main { display: grid; grid-template-columns: repeat(auto-fit, minmax(460px, 1fr)); gap: 16px; padding: 16px; }
+  section { background: #fff; border-radius: 6px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.12); padding: 12px 16px; }
+  section.wide { grid-column: 1 / -1; }
+  h2 { font-size: 14px; margin: 0 0 8px; }
+  .cards { display: flex; flex-wrap: wrap; gap: 24px; }
+  .card b { display: block; font-size: 22px; }
+  .card span { font-size: 12px; color: #666; }
+  svg text { font-size: 10px; fill: #333; }
+  .axis { stroke: #bbb; }
+  .empty { color: #888; font-style: italic; font-size: 12px; }
+  .legend { font-size: 11px; margin-top: 4px; }
+  .legend i { display: inline-block; width: 10px; height: 10px; margin: 0 4px 0 10px; }
+</style>
+</head>
+<body>
+<header>
+  <h1>Study Tracker Dashboard</h1>
+  <p>Generated __GENERATED_AT__</p>
+</header>
+<main>
+  <section class="wide"><h2>Summary</h2><div id="summary" class="cards"></div></section>
+  <section><h2>Average Grade per Course</h2><div id="grades"></div></section>
+  <section><h2>Study Time per Course</h2><div id="study"></div></section>
+  <section class="wide"><h2>Study Time per Week</h2><div id="weekly"></div></section>
+  <section class="wide"><h2>Weekly Workload</h2><div id="workload"></div></section>
+  <section class="wide"><h2>Assignment Timeline</h2><div id="timeline"></div></section>
+</main>
+<script type="application/json" id="dashboard-data">__DATA__</script>
+<script>
+const data = JSON.parse(document.getElementById('dashboard-data').textContent);
+const NS = 'http://www.w3.org/2000/svg';
+const COLORS = ['#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f',
+                '#edc948', '#b07aa1', '#ff9da7', '#9c755f', '#bab0ac'];
+const courses = data.courses;
+
+function el(name, attrs, parent) {
+  const node = document.createElementNS(NS, name);
+  for (const key in attrs) node.setAttribute(key, attrs[key]);
+  if (parent) parent.appendChild(node);
+  return node;
+}
+function label(parent, x, y, value, attrs) {
+  el('text', Object.assign({x: x, y: y}, attrs || {}), parent).textContent = value;
+}
+function tip(node, value) {
+  el('title', {}, node).textContent = value;
+}
+function chart(id, width, height) {
+  return el('svg', {viewBox: '0 0 ' + width + ' ' + height, width: '100%'}, document.getElementById(id));
+}
+function empty(id, message) {
+  const node = document.getElementById(id);
+  node.className = 'empty';
+  node.textContent = message;
+}
+function scale(d0, d1, r0, r1) {
+  return v => d1 === d0 ? (r0 + r1) / 2 : r0 + (v - d0) * (r1 - r0) / (d1 - d0);
+}
+function day(value) {
+  return new Date(value * 86400000).toISOString().slice(0, 10);
+}
+function color(index) {
+  return COLORS[index % COLORS.length];
+}
+function legend(id, names) {
+  const node = document.createElement('div');
+  node.className = 'legend';
+  names.forEach((name, i) => {
+    const swatch = document.createElement('i');
+    swatch.style.background = color(i);
+    node.appendChild(swatch);
+    node.appendChild(document.createTextNode(name));
+  });
+  document.getElementById(id).appendChild(node);
+}
+
+function summary() {
+  const s = data.summary;
+  const items = [
+    [s.courses, 'courses'],
+    [s.assignments, 'assignments'],
+    [s.graded, 'graded'],
+    [s.study_hours, 'study hours'],
+    [s.weighted_final_grade === null ? '-' : s.weighted_final_grade, 'weighted final grade'],
+  ];
+  const node = document.getElementById('summary');
+  items.forEach(([value, name]) => {
+    const card = document.createElement('div');
+    card.className = 'card';
+    card.innerHTML = '<b></b><span></span>';
+    card.firstChild.textContent = value;
+    card.lastChild.textContent = name;
+    node.appendChild(card);
+  });
+}
+
+function grades() {
+  const rows = courses.name.map((name, i) => [name, courses.avg_grade[i], courses.graded_count[i]])
+    .filter(row => row[1] !== null).sort((a, b) => b[1] - a[1]);
+  if (!rows.length) return empty('grades', 'No graded assignments.');
+  const width = 460, height = 240, left = 30, bottom = 60, step = (width - left) / rows.length;
+  const svg = chart('grades', width, height);
+  const y = scale(0, 100, height - bottom, 10);
+  el('line', {x1: left, y1: y(0), x2: width, y2: y(0), class: 'axis'}, svg);
+  [0, 50, 100].forEach(v => label(svg, left - 4, y(v) + 3, v, {'text-anchor': 'end'}));
+  const most = Math.max(...rows.map(row => row[2]));
+  rows.forEach(([name, grade, count], i) => {
+    const x = left + i * step + step * 0.15;
+    const bar = el('rect', {x: x, y: y(grade), width: step * 0.7, height: y(0) - y(grade),
+                            fill: '#4e79a7', 'fill-opacity': 0.35 + 0.65 * count / most}, svg);
+    tip(bar, name + ': ' + grade.toFixed(1) + ' (' + count + ' graded)');
+    if (step >= 14) {
+      label(svg, x + step * 0.35, y(grade) - 3, grade.toFixed(1), {'text-anchor': 'middle'});
+      label(svg, 0, 0, name.slice(0, 18), {'text-anchor': 'end',
+            transform: 'translate(' + (x + step * 0.35) + ',' + (y(0) + 10) + ') rotate(-35)'});
+    }
+  });
+}
+
+function study() {
+  const rows = courses.name.map((name, i) => [name, courses.study_minutes[i] / 60, courses.session_count[i]])
+    .filter(row => row[1] > 0).sort((a, b) => b[1] - a[1]);
+  if (!rows.length) return empty('study', 'No study sessions.');
+  const rowHeight = 20, left = 130, width = 460, height = rows.length * rowHeight + 10;
+  const svg = chart('study', width, height);
+  const x = scale(0, rows[0][1], left, width - 90);
+  rows.forEach(([name, hours, count], i) => {
+    const bar = el('rect', {x: left, y: i * rowHeight + 4, width: x(hours) - left, height: rowHeight - 6,
+                            fill: '#59a14f'}, svg);
+    tip(bar, name + ': ' + hours.toFixed(2) + 'h in ' + count + ' sessions');
+    label(svg, left - 4, i * rowHeight + 16, name.slice(0, 22), {'text-anchor': 'end'});
+    label(svg, x(hours) + 4, i * rowHeight + 16, hours.toFixed(1) + 'h (' + count + ')');
+  });
+}
+
+function weekly() {
+  const w = data.weekly_study;
+  if (!w.week.length) return empty('weekly', 'No study sessions.');
+  const weeks = Array.from(new Set(w.week)).sort((a, b) => a - b);
+  const width = 940, height = 240, left = 40, bottom = 40;
+  const series = new Map();
+  w.week.forEach((week, i) => {
+    if (!series.has(w.course[i])) series.set(w.course[i], new Map());
+    series.get(w.course[i]).set(week, w.minutes[i] / 60);
+  });
+  const top = Math.max(...w.minutes) / 60;
+  const svg = chart('weekly', width, height);
+  const x = scale(weeks[0], weeks[weeks.length - 1], left, width - 10);
+  const y = scale(0, top, height - bottom, 10);
+  el('line', {x1: left, y1: y(0), x2: width, y2: y(0), class: 'axis'}, svg);
+  label(svg, left - 4, y(top) + 3, top.toFixed(1) + 'h', {'text-anchor': 'end'});
+  const every = Math.max(1, Math.ceil(weeks.length / 12));
+  weeks.forEach((week, i) => {
+    if (i % every === 0) label(svg, x(week), y(0) + 14, day(week), {'text-anchor': 'middle'});
+  });
+  const names = [];
+  Array.from(series.keys()).sort((a, b) => a - b).forEach((course, i) => {
+    const hours = series.get(course);
+    const points = weeks.map(week => x(week) + ',' + y(hours.get(week) || 0)).join(' ');
+    const line = el('polyline', {points: points, fill: 'none', stroke: color(i), 'stroke-width': 1.5}, svg);
+    tip(line, courses.name[course]);
+    names.push(courses.name[course]);
+  });
+  if (names.length <= 12) legend('weekly', names);
+}
+
+function workload() {
+  const w = data.workload;
+  if (!w.week.length) return empty('workload', 'No assignments.');
+  const width = 940, height = 200, left = 30, bottom = 40, step = (width - left) / w.week.length;
+  const svg = chart('workload', width, height);
+  const y = scale(0, Math.max(...w.total), height - bottom, 10);
+  el('line', {x1: left, y1: y(0), x2: width, y2: y(0), class: 'axis'}, svg);
+  label(svg, left - 4, y(Math.max(...w.total)) + 3, Math.max(...w.total), {'text-anchor': 'end'});
+  const every = Math.max(1, Math.ceil(w.week.length / 12));
+  w.week.forEach((week, i) => {
+    const x = left + i * step + step * 0.1, graded = w.graded[i], open = w.total[i] - graded;
+    tip(el('rect', {x: x, y: y(graded), width: step * 0.8, height: y(0) - y(graded), fill: '#2ecc71'}, svg),
+        'Week of ' + day(week) + ': ' + graded + ' graded');
+    tip(el('rect', {x: x, y: y(w.total[i]), width: step * 0.8, height: y(graded) - y(w.total[i]), fill: '#e74c3c'}, svg),
+        'Week of ' + day(week) + ': ' + open + ' not graded');
+    if (i % every === 0) label(svg, x + step * 0.4, y(0) + 14, day(week), {'text-anchor': 'middle'});
+  });
+  const node = document.createElement('div');
+  node.className = 'legend';
+  node.innerHTML = '<i style="background:#2ecc71"></i>Graded<i style="background:#e74c3c"></i>Not graded';
+  document.getElementById('workload').appendChild(node);
+}
+
+function timeline() {
+  const t = data.timeline;
+  if (!t.due_day.length) return empty('timeline', 'No assignments.');
+  const rows = Array.from(new Set(t.course)).sort((a, b) => courses.name[a].localeCompare(courses.name[b]));
+  const rowOf = new Map(rows.map((course, i) => [course, i]));
+  const rowHeight = 22, left = 150, width = 940, height = rows.length * rowHeight + 30;
+  const svg = chart('timeline', width, height);
+  const first = t.due_day[0], last = t.due_day[t.due_day.length - 1];
+  const x = scale(first, last, left + 10, width - 10);
+  rows.forEach((course, i) => {
+    label(svg, left - 4, i * rowHeight + 15, courses.name[course].slice(0, 26), {'text-anchor': 'end'});
+    el('line', {x1: left, y1: i * rowHeight + 11, x2: width, y2: i * rowHeight + 11, class: 'axis',
+                'stroke-dasharray': '2,3'}, svg);
+  });
+  const axis = rows.length * rowHeight + 16;
+  const ticks = Math.min(8, last - first + 1);
+  for (let i = 0; i < ticks; i++) {
+    const value = Math.round(first + (last - first) * i / Math.max(1, ticks - 1));
+    label(svg, x(value), axis, day(value), {'text-anchor': 'middle'});
+  }
+  t.due_day.forEach((due, i) => {
+    const graded = t.grade[i] !== null;
+    const dot = el('circle', {cx: x(due), cy: rowOf.get(t.course[i]) * rowHeight + 11, r: graded ? 5 : 4,
+                              fill: graded ? '#2ecc71' : '#e74c3c', 'fill-opacity': 0.75}, svg);
+    tip(dot, t.title[i] + ' (' + courses.name[t.course[i]] + ')\\nDue ' + day(due) +
+        (graded ? '\\nGrade ' + t.grade[i] : '\\nNot graded'));
+  });
+}
+
+summary();
+grades();
+study();
+weekly();
+workload();
+timeline();
+</script>
+</body>
+</html>
+"""
+
+
+def build_dashboard_data(db: Database) -> Dict[str, object]:
+    """Aggregates behind the dashboard, as compact column lists.
+
+    Course totals come from the running grade totals and daily study
+    rollups, so archived rows count, and so do the summary counts; the
+    timeline and weekly workload show live assignments, like
+    ``plot-timeline``. Courses are referenced by
+    their position in ``courses``.
+    """
+    with db.read_transaction():
+        course_rows = db.fetch_all("""
+            SELECT
+                c.id,
+                c.name,
+                c.credits,
+                COALESCE(t.graded_count, 0) AS graded_count,
+                t.grade_sum AS grade_sum,
+                ROUND(t.grade_sum / t.graded_count, 2) AS avg_grade,
+                COALESCE(s.session_count, 0) AS session_count,
+                COALESCE(s.total_minutes, 0) AS study_minutes
+            FROM courses c
+            LEFT JOIN course_grade_totals t ON t.course_id = c.id
+            LEFT JOIN (
+                SELECT course_id, SUM(session_count) AS session_count, SUM(total_minutes) AS total_minutes
+                FROM study_daily_rollup
+                GROUP BY course_id
+            ) s ON s.course_id = c.id
+            ORDER BY c.name
+        """)
+        weekly_rows = db.fetch_all(f"""
+            SELECT course_id, {WEEK_START.format(day='day')} AS week, SUM(total_minutes) AS minutes
+            FROM study_daily_rollup
+            GROUP BY course_id, week
+            ORDER BY week, course_id
+        """)
+        workload_rows = db.fetch_all(f"""
+            SELECT {WEEK_START.format(day='due_day')} AS week, COUNT(*) AS total, COUNT(grade) AS graded
+            FROM assignments
+            GROUP BY week
+            ORDER BY week
+        """)
+        timeline_rows = db.fetch_all("""
+            SELECT course_id, title, due_day, grade
+            FROM assignments
+            ORDER BY due_day, id
+        """)
+        archived_assignments = db.fetch_one(
+            "SELECT COALESCE(SUM(assignment_count), 0) FROM archive_partitions"
+        )[0]
+
+    position = {row['id']: i for i, row in enumerate(course_rows)}
+    courses = {name: [row[name] for row in course_rows]
+               for name in ('id', 'name', 'credits', 'graded_count', 'avg_grade', 'session_count', 'study_minutes')}
+
+    weighted_points = sum(row['grade_sum'] * row['credits'] for row in course_rows if row['graded_count'])
+    weighted_count = sum(row['graded_count'] * row['credits'] for row in course_rows)
+    summary = {
+        'courses': len(course_rows),
+        # Counted like the grade and hours, with the archived assignments
+        'assignments': len(timeline_rows) + archived_assignments,
+        'graded': sum(courses['graded_count']),
+        'study_hours': round(sum(courses['study_minutes']) / 60.0, 1),
+        'weighted_final_grade': round(weighted_points / weighted_count, 2) if weighted_count else None,
+    }
+
+    return {
+        'summary': summary,
+        'courses': courses,
+        'weekly_study': {
+            'week': [row['week'] for row in weekly_rows],
+            'course': [position[row['course_id']] for row in weekly_rows],
+            'minutes': [row['minutes'] for row in weekly_rows],
+        },
+        'workload': {
+            'week': [row['week'] for row in workload_rows],
+            'total': [row['total'] for row in workload_rows],
+            'graded': [row['graded'] for row in workload_rows],
+        },
+        'timeline': {
+            'course': [position[row['course_id']] for row in timeline_rows],
+            'title': [row['title'] for row in timeline_rows],
+            'due_day': [row['due_day'] for row in timeline_rows],
+            'grade': [row['grade'] for row in timeline_rows],
+        },
+    }
+
+
+def write_dashboard(db: Database, filename: str) -> str:
+    """Write a self-contained HTML dashboard; the charts are drawn in the browser"""
+    data = build_dashboard_data(db)
+    # Compact JSON; "</" is escaped so a title cannot close the script element
+    payload = json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
+    html = (DASHBOARD_TEMPLATE
+            .replace('__GENERATED_AT__', datetime.now().strftime('%Y-%m-%d %H:%M'))
+            .replace('__DATA__', payload))
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"Dashboard saved to {filename}")
+    return filename
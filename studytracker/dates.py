@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+
+# Day numbers count days since 1970-01-01, matching the date_day/due_day columns
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Open ends of a range query, well outside any real date
+MIN_DAY = -(10 ** 7)
+MAX_DAY = 10 ** 7
+
+
+def to_epoch_day(value: str) -> int:
+    """Convert a YYYY-MM-DD string to its day number"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        raise ValueError(f"Date must be in YYYY-MM-DD format: {value}")
+
+
+def canonical_date(value: str) -> str:
+    """Zero-padded YYYY-MM-DD form of a date; julianday() and the day columns need it"""
+    return from_epoch_day(to_epoch_day(value)).isoformat()
+
+
+def from_epoch_day(day: int) -> date:
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def today_epoch_day() -> int:
+    return date.today().toordinal() - EPOCH_ORDINAL
+
+
+def day_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+    """Inclusive day number bounds for an optional YYYY-MM-DD date window"""
+    start_day = to_epoch_day(start_date) if start_date else MIN_DAY
+    end_day = to_epoch_day(end_date) if end_date else MAX_DAY
+    if start_day > end_day:
+        raise ValueError("Start date must not be after end date")
+    return start_day, end_day
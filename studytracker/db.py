@@ -1,55 +1,474 @@
+import os
+import queue
+import re
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
+from studytracker.query_cache import QueryCache
+
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_.*\.sql$')
+
+SCHEMA_ALIAS_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# SQLite's default limit on databases attached to one connection
+MAX_ATTACHED = 10
+
+# Rows per transaction in delete_in_batches; with the change log, rollup and
+# FTS triggers this keeps each write lock around a tenth of a second
+DELETE_BATCH_SIZE = 1000
+
+
+class Record(Mapping):
+    """Read-only, dict-compatible result row.
+
+    A record keeps only the value tuple returned by sqlite3; the column names
+    and their positions live once on a class shared by every row of the same
+    shape (see ``record_class``), so a row costs a fraction of a dict.
+    """
+    __slots__ = ('_values',)
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+    
+    def __init__(self, values: tuple):
+        self._values = values
+    
+    def __getitem__(self, key: str):
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            raise KeyError(key) from None
+    
+    def __contains__(self, key) -> bool:
+        return key in self._index
+    
+    def __iter__(self):
+        return iter(self._fields)
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+    
+    def __reduce__(self):
+        # Record classes are created at runtime, so pickle by shape and values
+        return _make_record, (self._fields, self._values)
+    
+    def to_dict(self) -> dict:
+        return dict(zip(self._fields, self._values))
+
+
+_record_classes: Dict[Tuple[str, ...], type] = {}
+
+
+def record_class(fields: Tuple[str, ...]) -> type:
+    """Record subclass for one tuple of column names, created once and reused"""
+    cls = _record_classes.get(fields)
+    if cls is None:
+        cls = type('Record', (Record,), {
+            '__slots__': (),
+            '_fields': fields,
+            '_index': {name: i for i, name in enumerate(fields)},
+        })
+        _record_classes[fields] = cls
+    return cls
+
+
+def _make_record(fields: Tuple[str, ...], values: tuple) -> Record:
+    return record_class(fields)(values)
 
 
 class Database:
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, check_same_thread: bool = True,
+                 thread_safe: bool = False, read_pool_size: int = 0,
+                 cache_size: int = 0, cache_max_rows: int = 10000):
+        """Open with ``thread_safe=True`` to share one instance between threads.
+
+        In thread-safe mode every thread transparently gets its own connection
+        the first time it touches ``connection``. ``read_pool_size`` adds a
+        bounded pool of read-only connections used by ``fetch_all`` and
+        ``fetch_one``; callers block while all of them are busy.
+        ``cache_size`` keeps that many query results in an LRU cache that
+        writes through ``execute`` invalidate per table; results longer than
+        ``cache_max_rows`` are never cached.
+        """
+        if read_pool_size < 0:
+            raise ValueError("read_pool_size cannot be negative")
+        if cache_size < 0:
+            raise ValueError("cache_size cannot be negative")
         self.db_path = db_path
-        self.connection = None
+        self.check_same_thread = check_same_thread and not thread_safe
+        self.thread_safe = thread_safe
+        self.read_pool_size = read_pool_size
+        self._connection = None
+        self._connected = False
+        self._local = threading.local()
+        self._thread_connections: List[sqlite3.Connection] = []
+        self._read_pool: Optional[queue.Queue] = None
+        self._read_connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._cache = QueryCache(cache_size, cache_max_rows) if cache_size else None
     
-    def connect(self):
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        if not self.thread_safe:
+            return self._connection
+        if not self._connected:
+            return None
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._open_connection()
+            self._local.connection = connection
+            with self._lock:
+                self._thread_connections.append(connection)
+        return connection
+    
+    @connection.setter
+    def connection(self, connection: Optional[sqlite3.Connection]):
+        self._connection = connection
+    
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            connection = sqlite3.connect(self.db_path, check_same_thread=self.check_same_thread)
             # Enable foreign key support
-            self.connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA foreign_keys = ON")
+            if read_only:
+                connection.execute("PRAGMA query_only = ON")
             # Return rows as dictionaries for easier access
-            self.connection.row_factory = sqlite3.Row
+            connection.row_factory = sqlite3.Row
+            return connection
         except sqlite3.Error as e:
             raise RuntimeError(f"Failed to connect to database: {e}")
     
+    def connect(self):
+        if not self.thread_safe:
+            self.connection = self._open_connection()
+        else:
+            self._connected = True
+            # Open the calling thread's connection now so errors surface here
+            self.connection
+        
+        if self.read_pool_size and self._read_pool is None:
+            self._read_pool = queue.Queue()
+            for _ in range(self.read_pool_size):
+                connection = self._open_connection(read_only=True)
+                self._read_connections.append(connection)
+                self._read_pool.put(connection)
+    
     def close(self):
-        if self.connection:
+        with self._lock:
+            connections = self._thread_connections + self._read_connections
+            self._thread_connections = []
+            self._read_connections = []
+        if self._connection:
+            connections.append(self._connection)
+        
+        for connection in connections:
+            if self._cache is not None:
+                self._cache.forget_connection(connection)
             try:
-                self.connection.close()
-                self.connection = None
+                connection.close()
             except sqlite3.Error as e:
                 print(f"Warning: Error closing database connection: {e}")
+        
+        self._connection = None
+        self._connected = False
+        self._local = threading.local()
+        self._read_pool = None
+    
+    @contextmanager
+    def _read_connection(self):
+        if self._read_pool is None:
+            yield self.connection
+            return
+        
+        # Reads inside this thread's open transaction must see its view of the data
+        local = self.connection if not self.thread_safe else getattr(self._local, 'connection', None)
+        if local is not None and local.in_transaction:
+            yield local
+            return
+        
+        connection = self._read_pool.get()
+        try:
+            yield connection
+        finally:
+            self._read_pool.put(connection)
+    
+    def _attach(self, connection: sqlite3.Connection, attachments: Optional[Dict[str, str]]):
+        # Attach {alias: path} databases the connection does not have yet; ones no longer
+        # needed are detached first so long-lived connections stay under the attach limit
+        if not attachments:
+            return
+        attached = [row[1] for row in connection.execute("PRAGMA database_list")
+                    if row[1] not in ('main', 'temp')]
+        missing = [alias for alias in attachments if alias not in attached]
+        if not missing:
+            return
+        if len(attachments) > MAX_ATTACHED:
+            raise ValueError(f"A query can use at most {MAX_ATTACHED} attached databases, "
+                             f"{len(attachments)} are needed; narrow the date range")
+        if connection.in_transaction:
+            raise RuntimeError("Cannot attach databases inside a transaction")
+        
+        unused = [alias for alias in attached if alias not in attachments]
+        while unused and len(attached) + len(missing) > MAX_ATTACHED:
+            alias = unused.pop()
+            connection.execute(f"DETACH DATABASE {alias}")
+            attached.remove(alias)
+        for alias in missing:
+            if not SCHEMA_ALIAS_PATTERN.match(alias):
+                raise ValueError(f"Invalid schema name: {alias}")
+            connection.execute(f"ATTACH DATABASE ? AS {alias}", (attachments[alias],))
+    
+    def attach(self, attachments: Dict[str, str]):
+        """Attach {alias: path} databases to this thread's connection before a transaction"""
+        try:
+            self._attach(self.connection, attachments)
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to attach database: {e}")
+    
+    def set_journal_mode(self, mode: str) -> str:
+        try:
+            row = self.connection.execute(f"PRAGMA journal_mode = {mode}").fetchone()
+            return row[0]
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to set journal mode: {e}")
+    
+    def snapshot(self, pages: int = 256) -> 'Database':
+        """Copy the database into memory with the online backup API.
+
+        The copy runs in steps of ``pages`` pages so writers on the live file
+        can commit between steps; the result is a consistent point-in-time
+        copy that can be read without holding locks on the live file.
+        """
+        snapshot_db = Database(':memory:')
+        snapshot_db.connect()
+        try:
+            self.connection.backup(snapshot_db.connection, pages=pages)
+        except sqlite3.Error as e:
+            snapshot_db.close()
+            raise RuntimeError(f"Failed to snapshot database: {e}")
+        return snapshot_db
+    
+    @contextmanager
+    def read_transaction(self):
+        """Run several reads against the same point-in-time view of the database"""
+        if self.connection.in_transaction:
+            yield self
+            return
+        
+        self.connection.execute("BEGIN")
+        self._local.read_transaction = True
+        try:
+            yield self
+        finally:
+            self._local.read_transaction = False
+            if self.connection.in_transaction:
+                self.connection.commit()
+    
+    @contextmanager
+    def transaction(self):
+        """Group several writes into one transaction that commits or rolls back as a whole.
+
+        ``execute`` does not commit inside the block; nested blocks join the
+        outermost transaction. Starting one inside ``read_transaction()``
+        raises RuntimeError, since committing the read would end its snapshot.
+        """
+        depth = getattr(self._local, 'transaction_depth', 0)
+        if depth == 0:
+            if getattr(self._local, 'read_transaction', False):
+                raise RuntimeError("Cannot start a write transaction inside read_transaction()")
+            if self.connection.in_transaction:
+                self.connection.commit()
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._local.pending_tables = set()
+        self._local.transaction_depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self._local.transaction_depth = depth
+            if depth == 0 and self.connection.in_transaction:
+                self.connection.rollback()
+            raise
+        self._local.transaction_depth = depth
+        if depth == 0:
+            self.connection.commit()
+            self._invalidate(self._local.pending_tables)
+    
+    def _written(self, query: str):
+        # Tables to invalidate now, or after the enclosing transaction commits
+        if self._cache is None:
+            return
+        self._cache.load_schema(self.connection)
+        tables = self._cache.tables_written(query)
+        if getattr(self._local, 'transaction_depth', 0):
+            pending = self._local.pending_tables
+            if tables is None or pending is None:
+                self._local.pending_tables = None
+            else:
+                pending |= tables
+        else:
+            self._invalidate(tables)
+    
+    def _invalidate(self, tables: Optional[set]):
+        if self._cache is None:
+            return
+        if tables is None:
+            # DDL, PRAGMA or anything else the cache cannot attribute to tables
+            self._cache.clear(schema_changed=True)
+        elif tables:
+            self._cache.invalidate(tables)
     
     def execute(self, query: str, params: Tuple = ()) -> sqlite3.Cursor:
         try:
             cursor = self.connection.cursor()
             cursor.execute(query, params)
-            self.connection.commit()
+            if not getattr(self._local, 'transaction_depth', 0):
+                self.connection.commit()
+            self._written(query)
             return cursor
         except sqlite3.IntegrityError as e:
             raise ValueError(f"Database integrity error: {e}")
         except sqlite3.Error as e:
             raise RuntimeError(f"Database error: {e}")
     
-    def fetch_all(self, query: str, params: Tuple = ()) -> List[sqlite3.Row]:
+    def executemany(self, query: str, seq_of_params: Iterable[Tuple]) -> sqlite3.Cursor:
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+            cursor.executemany(query, seq_of_params)
+            if not getattr(self._local, 'transaction_depth', 0):
+                self.connection.commit()
+            self._written(query)
+            return cursor
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Database integrity error: {e}")
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database error: {e}")
+    
+    def delete_in_batches(self, table: str, where: str, params: Tuple = (),
+                          batch_size: int = DELETE_BATCH_SIZE,
+                          progress: Optional[Callable[[int], None]] = None) -> int:
+        """Delete the rows of ``table`` matching ``where``, ``batch_size`` rows per transaction.
+
+        One DELETE of a million rows holds the write lock and grows the journal
+        until it finishes. Committing after every batch lets other writers in
+        between batches. ``progress`` is called with the running total after
+        each one. Inside ``transaction()`` the batches commit together.
+        """
+        if batch_size <= 0:
+            raise ValueError("Batch size must be a positive number")
+        query = f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {where} LIMIT ?)"
+        deleted = 0
+        while True:
+            count = self.execute(query, (*params, batch_size)).rowcount
+            deleted += count
+            if progress is not None and count:
+                progress(deleted)
+            if count < batch_size:
+                return deleted
+    
+    def cache_info(self) -> Optional[Dict[str, int]]:
+        """Hit, miss and invalidation counters of the query cache, or None when it is off"""
+        return self._cache.info() if self._cache is not None else None
+    
+    def _cached(self, kind: str, query: str, params: Tuple,
+                attachments: Optional[Dict[str, str]], run):
+        # Serve a read from the cache, or run it and remember the result. Reads inside a
+        # transaction may see uncommitted writes, so they bypass the cache entirely.
+        cache = self._cache
+        if cache is None or self.connection.in_transaction:
+            return run()
+        cache.load_schema(self.connection)
+        cache.check_data_version(self.connection)
+        try:
+            key = (kind, query, tuple(params),
+                   tuple(sorted(attachments.items())) if attachments else None)
+            hash(key)
+        except TypeError:
+            # Unhashable parameters such as dicts for named placeholders
+            return run()
+        
+        found, value = cache.get(key)
+        if not found:
+            generation = cache.generation
+            value = run()
+            cache.put(key, value, cache.tables_read(query), generation)
+        # Rows are immutable, the list holding them is not
+        return list(value) if isinstance(value, list) else value
+    
+    def fetch_all(self, query: str, params: Tuple = (),
+                  attachments: Optional[Dict[str, str]] = None) -> List[sqlite3.Row]:
+        """``attachments`` maps schema names used in the query to database files to attach"""
+        return self._cached('all', query, params, attachments,
+                            lambda: self._fetch_all(query, params, attachments))
+    
+    def _fetch_all(self, query: str, params: Tuple, attachments: Optional[Dict[str, str]]):
+        try:
+            with self._read_connection() as connection:
+                self._attach(connection, attachments)
+                cursor = connection.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchall()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database query error: {e}")
     
-    def fetch_one(self, query: str, params: Tuple = ()) -> Optional[sqlite3.Row]:
+    def fetch_one(self, query: str, params: Tuple = (),
+                  attachments: Optional[Dict[str, str]] = None) -> Optional[sqlite3.Row]:
+        return self._cached('one', query, params, attachments,
+                            lambda: self._fetch_one(query, params, attachments))
+    
+    def _fetch_one(self, query: str, params: Tuple, attachments: Optional[Dict[str, str]]):
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchone()
+            with self._read_connection() as connection:
+                self._attach(connection, attachments)
+                cursor = connection.cursor()
+                cursor.execute(query, params)
+                row = cursor.fetchone()
+                # Release the statement before the connection goes back to the pool
+                cursor.close()
+                return row
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database query error: {e}")
+    
+    def fetch_records(self, query: str, params: Tuple = (),
+                      attachments: Optional[Dict[str, str]] = None) -> List[Record]:
+        """Like ``fetch_all`` but returns compact, dict-compatible ``Record`` rows"""
+        return self._cached('records', query, params, attachments,
+                            lambda: self._fetch_records(query, params, attachments))
+    
+    def _fetch_records(self, query: str, params: Tuple, attachments: Optional[Dict[str, str]]):
+        try:
+            with self._read_connection() as connection:
+                self._attach(connection, attachments)
+                cursor = connection.cursor()
+                # Plain tuples from sqlite3, wrapped without building a Row per result
+                cursor.row_factory = None
+                cursor.execute(query, params)
+                cls = record_class(tuple(column[0] for column in cursor.description))
+                return list(map(cls, cursor))
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database query error: {e}")
+    
+    def fetch_record(self, query: str, params: Tuple = (),
+                     attachments: Optional[Dict[str, str]] = None) -> Optional[Record]:
+        return self._cached('record', query, params, attachments,
+                            lambda: self._fetch_record(query, params, attachments))
+    
+    def _fetch_record(self, query: str, params: Tuple, attachments: Optional[Dict[str, str]]):
+        try:
+            with self._read_connection() as connection:
+                self._attach(connection, attachments)
+                cursor = connection.cursor()
+                cursor.row_factory = None
+                cursor.execute(query, params)
+                row = cursor.fetchone()
+                fields = tuple(column[0] for column in cursor.description)
+                cursor.close()
+                return record_class(fields)(row) if row is not None else None
         except sqlite3.Error as e:
             raise RuntimeError(f"Database query error: {e}")
     
@@ -61,8 +480,53 @@ class Database:
             # Execute the schema
             self.connection.executescript(schema_sql)
             self.connection.commit()
+            self._invalidate(None)
             print(f"Database schema initialized from {schema_path}")
         except FileNotFoundError:
             raise FileNotFoundError(f"Schema file not found: {schema_path}")
         except sqlite3.Error as e:
             raise RuntimeError(f"Failed to initialize schema: {e}")
+
+    def get_schema_version(self) -> int:
+        row = self.connection.execute("PRAGMA user_version").fetchone()
+        return row[0]
+    
+    def list_migrations(self, migrations_dir: str) -> List[Tuple[int, str]]:
+        """Return (version, path) pairs for the migration scripts, ordered by version"""
+        migrations = []
+        for filename in os.listdir(migrations_dir):
+            match = MIGRATION_FILE_PATTERN.match(filename)
+            if match:
+                migrations.append((int(match.group(1)), os.path.join(migrations_dir, filename)))
+        migrations.sort()
+        return migrations
+    
+    def apply_migrations(self, migrations_dir: str) -> int:
+        """Apply pending migrations in order, tracking progress in PRAGMA user_version"""
+        if not os.path.isdir(migrations_dir):
+            raise FileNotFoundError(f"Migrations directory not found: {migrations_dir}")
+        
+        current_version = self.get_schema_version()
+        applied = 0
+        for version, path in self.list_migrations(migrations_dir):
+            if version <= current_version:
+                continue
+            with open(path, 'r') as f:
+                migration_sql = f.read()
+            
+            # Each migration and its version bump commit atomically
+            try:
+                self.connection.executescript(
+                    f"BEGIN;\n{migration_sql}\nPRAGMA user_version = {version};\nCOMMIT;"
+                )
+            except sqlite3.Error as e:
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                raise RuntimeError(f"Failed to apply migration {os.path.basename(path)}: {e}")
+            self._invalidate(None)
+            
+            current_version = version
+            applied += 1
+            print(f"Applied migration {os.path.basename(path)}")
+        
+        return applied
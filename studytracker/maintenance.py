@@ -0,0 +1,145 @@
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from studytracker.db import Database
+from studytracker.course_service import CourseService
+from studytracker.assignment_service import AssignmentService
+from studytracker.study_session_service import StudySessionService
+from studytracker.reports import ReportGenerator
+
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+
+def get_storage_stats(db: Database) -> Dict[str, object]:
+    """Page level statistics of the database file"""
+    page_size = db.fetch_one("PRAGMA page_size")[0]
+    page_count = db.fetch_one("PRAGMA page_count")[0]
+    freelist_count = db.fetch_one("PRAGMA freelist_count")[0]
+    auto_vacuum = db.fetch_one("PRAGMA auto_vacuum")[0]
+    return {
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist_count,
+        'file_bytes': page_size * page_count,
+        'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+    }
+
+
+def get_object_stats(db: Database) -> Optional[List[Dict[str, object]]]:
+    """Pages and bytes of every table and index, largest first.
+
+    dbstat reads every page of every b-tree, even in aggregate mode, so this
+    costs one pass over the whole file; ``get_storage_stats`` only reads the
+    header. Row counts are the estimates the last ANALYZE (run by
+    ``maintain``) stored in sqlite_stat1, None before that. Returns None when
+    SQLite was built without the dbstat virtual table.
+    """
+    try:
+        rows = db.fetch_all("""
+            SELECT s.name, COALESCE(m.type, 'table') AS type, COALESCE(m.tbl_name, s.name) AS tbl_name,
+                   s.pageno AS pages, s.pgsize AS bytes, s.unused AS unused_bytes
+            FROM dbstat s
+            LEFT JOIN sqlite_master m ON m.name = s.name
+            WHERE s.aggregate = TRUE
+            ORDER BY s.pgsize DESC, s.name
+        """)
+    except sqlite3.OperationalError:
+        return None
+
+    estimates = {}
+    if db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"):
+        # The first number of every stat row is the row count of the table
+        for row in db.fetch_all("SELECT tbl, MAX(CAST(stat AS INTEGER)) AS row_count FROM sqlite_stat1 GROUP BY tbl"):
+            estimates[row['tbl']] = row['row_count']
+
+    return [{
+        'name': row['name'],
+        'type': row['type'],
+        'table': row['tbl_name'],
+        'pages': row['pages'],
+        'bytes': row['bytes'],
+        'unused_bytes': row['unused_bytes'],
+        'rows': estimates.get(row['name']) if row['type'] == 'table' else None,
+    } for row in rows]
+
+
+def time_service_queries(db: Database, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-N wall time in milliseconds of the main service queries"""
+    course_service = CourseService(db)
+    assignment_service = AssignmentService(db)
+    session_service = StudySessionService(db)
+    report_gen = ReportGenerator(db)
+
+    queries = [
+        ('get_all_courses', course_service.get_all_courses),
+        ('get_all_assignments', assignment_service.get_all_assignments),
+        ('get_all_sessions', session_service.get_all_sessions),
+        ('get_study_summary_by_course', session_service.get_study_summary_by_course),
+        ('calculate_weighted_final_grade', report_gen.calculate_weighted_final_grade),
+    ]
+
+    timings = {}
+    for name, query in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = round(best, 3)
+    return timings
+
+
+def check_integrity(db: Database) -> List[str]:
+    rows = db.fetch_all("PRAGMA integrity_check")
+    return [row[0] for row in rows]
+
+
+def prune_change_log(db: Database) -> int:
+    """Delete change log entries that every stored delta export watermark has passed.
+
+    Only watermarks that exist count, so a consumer that has never exported
+    loses the pruned changes; its next delta export falls back to all rows.
+    """
+    row = db.fetch_one("SELECT MIN(seq) AS seq FROM export_watermarks")
+    if row is None or row['seq'] is None:
+        # Nobody has exported yet; keep everything so a first delta export is complete
+        return 0
+    cursor = db.execute("DELETE FROM change_log WHERE seq <= ?", (row['seq'],))
+    return cursor.rowcount
+
+
+def run_maintenance(db: Database, vacuum_pages: Optional[int] = None,
+                    prune_changes: bool = False) -> Dict[str, object]:
+    """Refresh planner statistics, reclaim free pages and verify the database.
+
+    Switching a database to incremental auto-vacuum needs one full VACUUM to
+    rebuild the file; after that only free pages are released, either all of
+    them or at most ``vacuum_pages`` per run. The change log is only pruned
+    with ``prune_changes``.
+    """
+    report = {
+        'before': get_storage_stats(db),
+        'timings_before': time_service_queries(db),
+    }
+
+    report['change_log_pruned'] = prune_change_log(db) if prune_changes else None
+
+    if report['before']['auto_vacuum'] != 'incremental':
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.execute("VACUUM")
+        report['vacuum'] = 'full (enabled incremental auto-vacuum)'
+    else:
+        pages = vacuum_pages if vacuum_pages is not None else report['before']['freelist_count']
+        # incremental_vacuum frees one page per step; executescript runs it to completion
+        db.connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        report['vacuum'] = f'incremental ({int(pages)} pages)'
+
+    db.execute("ANALYZE")
+    db.execute("PRAGMA optimize")
+
+    report['integrity'] = check_integrity(db)
+    report['after'] = get_storage_stats(db)
+    report['timings_after'] = time_service_queries(db)
+    return report
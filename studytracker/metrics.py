@@ -0,0 +1,244 @@
+import functools
+import inspect
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on Windows; concurrent writers may then lose an update
+    fcntl = None
+
+
+# Upper bounds in seconds; +Inf is added when the histogram is written
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# name -> (type, help) of the families recorded by the CLI and the services
+FAMILIES = {
+    'studytracker_commands_total': ('counter', 'CLI commands run, by exit status'),
+    'studytracker_command_duration_seconds': ('histogram', 'Wall time of CLI commands'),
+    'studytracker_command_last_run_timestamp_seconds': ('gauge', 'Unix time a CLI command last finished'),
+    'studytracker_operation_duration_seconds': ('histogram', 'Wall time of service and report methods'),
+    'studytracker_operation_errors_total': ('counter', 'Service and report methods that raised'),
+}
+
+SAMPLE_PATTERN = re.compile(r'^([A-Za-z_:][A-Za-z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+\S+)?$')
+LABEL_PATTERN = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)="((?:[^"\\]|\\.)*)"')
+HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), value)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Counters, gauges and latency histograms in the Prometheus text format.
+
+    Samples are kept per family as ``{(sample name, labels): value}``, which
+    is also how they appear in the file, so merging with what earlier runs
+    wrote is a matter of adding counters and histograms and replacing gauges.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, kind: Optional[str] = None, help_text: Optional[str] = None) -> dict:
+        family = self._families.get(name)
+        if family is None:
+            default_kind, default_help = FAMILIES.get(name, (kind or 'untyped', help_text or ''))
+            family = {'type': kind or default_kind, 'help': help_text or default_help, 'samples': {}}
+            self._families[name] = family
+        return family
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            samples = self._family(name, 'counter')['samples']
+            samples[(name, labels)] = samples.get((name, labels), 0) + amount
+
+    def set(self, name: str, labels: Labels, value: float, help_text: Optional[str] = None):
+        with self._lock:
+            self._family(name, 'gauge', help_text)['samples'][(name, labels)] = value
+
+    def observe(self, name: str, labels: Labels, value: float):
+        with self._lock:
+            samples = self._family(name, 'histogram')['samples']
+            for bound in LATENCY_BUCKETS + (float('inf'),):
+                key = (f"{name}_bucket", labels + (('le', _format_value(bound)),))
+                samples[key] = samples.get(key, 0) + (1 if value <= bound else 0)
+            samples[(f"{name}_sum", labels)] = samples.get((f"{name}_sum", labels), 0) + value
+            samples[(f"{name}_count", labels)] = samples.get((f"{name}_count", labels), 0) + 1
+
+    def merge(self, other: 'MetricsRegistry', replace: bool = False):
+        """Add ``other``'s counters and histograms to ours; its gauges win.
+
+        With ``replace`` its families take the place of ours entirely, so
+        samples it no longer has (a dropped index) disappear.
+        """
+        with self._lock:
+            for name, theirs in other._families.items():
+                if replace:
+                    self._families[name] = {'type': theirs['type'], 'help': theirs['help'],
+                                            'samples': dict(theirs['samples'])}
+                    continue
+                family = self._family(name, theirs['type'], theirs['help'])
+                samples = family['samples']
+                for key, value in theirs['samples'].items():
+                    if theirs['type'] in ('counter', 'histogram'):
+                        samples[key] = samples.get(key, 0) + value
+                    else:
+                        samples[key] = value
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._families):
+                family = self._families[name]
+                if family['help']:
+                    lines.append(f"# HELP {name} {family['help']}")
+                lines.append(f"# TYPE {name} {family['type']}")
+                for (sample, labels), value in family['samples'].items():
+                    label_text = ','.join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                    label_text = '{' + label_text + '}' if label_text else ''
+                    lines.append(f"{sample}{label_text} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def parse(cls, text: str) -> 'MetricsRegistry':
+        """Read back a file written by ``render``"""
+        registry = cls()
+        helps = {}
+        current = None
+        for line in text.splitlines():
+            if line.startswith('# HELP '):
+                name, _, help_text = line[7:].partition(' ')
+                helps[name] = help_text
+            elif line.startswith('# TYPE '):
+                current, _, kind = line[7:].partition(' ')
+                registry._family(current, kind.strip(), helps.get(current))
+            elif line.strip() and not line.startswith('#'):
+                match = SAMPLE_PATTERN.match(line.strip())
+                if not match:
+                    raise ValueError(f"Malformed metrics line: {line}")
+                sample, label_text, value = match.groups()
+                labels = tuple((key, _unescape(val)) for key, val in LABEL_PATTERN.findall(label_text or ''))
+                if current is None or sample not in [current] + [current + s for s in HISTOGRAM_SUFFIXES]:
+                    # A sample without its own TYPE line
+                    current = sample
+                registry._family(current)['samples'][(sample, labels)] = float(value)
+        return registry
+
+
+# Set by enable(); None keeps the instrumented methods at one global lookup of overhead
+_registry: Optional[MetricsRegistry] = None
+
+
+def enable() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def _timed(operation: str, method):
+    labels = (('operation', operation),)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        registry = _registry
+        if registry is None:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            registry.inc('studytracker_operation_errors_total', labels)
+            raise
+        finally:
+            registry.observe('studytracker_operation_duration_seconds', labels, time.perf_counter() - start)
+
+    return wrapper
+
+
+def instrumented(cls):
+    """Class decorator timing every public method as ``ClassName.method`` while metrics are enabled"""
+    for name, attribute in list(vars(cls).items()):
+        if inspect.isfunction(attribute) and not name.startswith('_'):
+            setattr(cls, name, _timed(f"{cls.__name__}.{name}", attribute))
+    return cls
+
+
+def record_command(command: str, status: str, seconds: float):
+    registry = enable()
+    registry.inc('studytracker_commands_total', (('command', command), ('status', status)))
+    registry.observe('studytracker_command_duration_seconds', (('command', command),), seconds)
+    registry.set('studytracker_command_last_run_timestamp_seconds', (('command', command),), round(time.time(), 3))
+
+
+def storage_registry(db_path: str, storage: Dict[str, object],
+                     objects: Optional[List[Dict[str, object]]]) -> MetricsRegistry:
+    """Gauges for the file, page and per-object statistics from the maintenance module"""
+    registry = MetricsRegistry()
+    registry.set('studytracker_database_file_bytes', (('file', 'database'),), os.path.getsize(db_path),
+                 'Size of the database file and its write-ahead log')
+    if os.path.exists(db_path + '-wal'):
+        registry.set('studytracker_database_file_bytes', (('file', 'wal'),), os.path.getsize(db_path + '-wal'))
+    registry.set('studytracker_database_pages', (('state', 'total'),), storage['page_count'],
+                 'Pages in the database file')
+    registry.set('studytracker_database_pages', (('state', 'free'),), storage['freelist_count'])
+    registry.set('studytracker_database_page_size_bytes', (), storage['page_size'], 'Database page size')
+    for item in objects or ():
+        labels = (('name', item['name']), ('type', item['type']), ('table', item['table']))
+        registry.set('studytracker_object_bytes', labels, item['bytes'],
+                     'Bytes in the pages of each table and index')
+        registry.set('studytracker_object_pages', labels, item['pages'], 'Pages of each table and index')
+        registry.set('studytracker_object_unused_bytes', labels, item['unused_bytes'],
+                     'Unused bytes in the pages of each table and index')
+        if item['rows'] is not None:
+            registry.set('studytracker_table_rows_estimate', (('table', item['name']),), item['rows'],
+                         'Rows per table as estimated by the last ANALYZE')
+    return registry
+
+
+def write_textfile(path: str, registry: Optional[MetricsRegistry] = None, replace: bool = False):
+    """Merge ``registry`` (default: the enabled one) into the textfile at ``path``.
+
+    Each CLI run only sees its own counts, so the totals live in the file:
+    it is read back under a lock, this run is added on top, and the result
+    replaces the file with an atomic rename so a scraper never reads half of it.
+    """
+    registry = registry if registry is not None else _registry
+    if registry is None:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path + '.lock', 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        merged = MetricsRegistry()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                merged = MetricsRegistry.parse(f.read())
+        merged.merge(registry, replace)
+        # The collector only reads *.prom files, so the temporary name is skipped
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(merged.render())
+        os.replace(temp_path, path)
@@ -0,0 +1,166 @@
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, List, Optional
+from studytracker.db import Database
+
+
+# Files submitted to the pool ahead of the results, per worker
+QUEUED_PER_WORKER = 2
+
+COMBINED_HEADER = ['Database', 'Course', 'Teacher', 'Credits', 'Assignments', 'Graded',
+                   'Average Grade', 'Weighted Grade', 'Study Hours']
+
+
+def discover_databases(pattern: str) -> List[str]:
+    """Database files in a directory (``*.db``) or matching a glob pattern"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.db')
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def summarize_database(db_path: str) -> Dict[str, object]:
+    """Per-course aggregates of one tracker file; runs inside a worker process.
+
+    Files at any schema version can be combined. Where the archive-aware
+    sources exist, grades moved to archive files are counted through
+    ``archived_grade_totals`` and study time is read from the daily rollups,
+    matching ``final-grade`` and the study summaries; older files fall back
+    to the base tables. Archived assignments are counted by their grades.
+    The weighted sums are returned rather than grades so the results of many
+    files can be merged exactly.
+    """
+    db = Database(db_path)
+    db.connect()
+    try:
+        with db.read_transaction():
+            objects = {row['name'] for row in db.fetch_all("SELECT name FROM sqlite_master")}
+            archived_source = ("SELECT course_id, graded_count, grade_sum FROM archived_grade_totals"
+                               if 'archived_grade_totals' in objects
+                               else "SELECT NULL AS course_id, 0 AS graded_count, 0 AS grade_sum WHERE 0")
+            course_query = f"""
+                SELECT
+                    c.id,
+                    c.name,
+                    c.teacher,
+                    c.credits,
+                    COUNT(a.id) + COALESCE(g.graded_count, 0) AS assignment_count,
+                    COUNT(a.grade) + COALESCE(g.graded_count, 0) AS graded_count,
+                    COALESCE(SUM(a.grade), 0) + COALESCE(g.grade_sum, 0) AS grade_sum
+                FROM courses c
+                LEFT JOIN assignments a ON a.course_id = c.id
+                LEFT JOIN ({archived_source}) g ON g.course_id = c.id
+                GROUP BY c.id
+                ORDER BY c.name
+            """
+            if 'study_daily_rollup' in objects:
+                study_query = """
+                    SELECT course_id, SUM(total_minutes) AS total_minutes
+                    FROM study_daily_rollup
+                    GROUP BY course_id
+                """
+            else:
+                study_query = """
+                    SELECT course_id, SUM(duration_minutes) AS total_minutes
+                    FROM study_sessions
+                    GROUP BY course_id
+                """
+            courses = [dict(row) for row in db.fetch_all(course_query)]
+            study_minutes = {row['course_id']: row['total_minutes'] for row in db.fetch_all(study_query)}
+    finally:
+        db.close()
+
+    for course in courses:
+        graded = course['graded_count']
+        course['avg_grade'] = course['grade_sum'] / graded if graded else None
+        course['weighted_sum'] = course.pop('grade_sum') * course['credits']
+        course['total_weight'] = graded * course['credits']
+        course['study_minutes'] = study_minutes.get(course['id'], 0)
+
+    return {
+        'path': db_path,
+        'courses': courses,
+        'weighted_sum': sum(course['weighted_sum'] for course in courses),
+        'total_weight': sum(course['total_weight'] for course in courses),
+        'study_minutes': sum(course['study_minutes'] for course in courses),
+    }
+
+
+def _weighted_grade(weighted_sum: float, total_weight: float) -> Optional[float]:
+    return round(weighted_sum / total_weight, 2) if total_weight else None
+
+
+def _combined_rows(summary: Dict[str, object]) -> List[list]:
+    name = os.path.basename(summary['path'])
+    rows = []
+    for course in summary['courses']:
+        avg_grade = round(course['avg_grade'], 2) if course['avg_grade'] is not None else ''
+        weighted = _weighted_grade(course['weighted_sum'], course['total_weight'])
+        rows.append([name, course['name'], course['teacher'], course['credits'],
+                     course['assignment_count'], course['graded_count'], avg_grade,
+                     weighted if weighted is not None else '',
+                     round(course['study_minutes'] / 60.0, 2)])
+    final_grade = _weighted_grade(summary['weighted_sum'], summary['total_weight'])
+    rows.append([name, 'WEIGHTED_FINAL_GRADE', '', '', '', '', '',
+                 final_grade if final_grade is not None else '',
+                 round(summary['study_minutes'] / 60.0, 2)])
+    return rows
+
+
+def export_combined_report(paths: List[str], filename: str, workers: Optional[int] = None,
+                           show_progress: bool = True) -> Dict[str, object]:
+    """Summarize many tracker files in a process pool and stream one combined CSV.
+
+    At most two files per worker are queued at a time, and each result is
+    written and dropped as soon as its file finishes, so memory stays flat
+    however many files there are. Files that cannot be read are reported and
+    skipped.
+    """
+    if not paths:
+        raise ValueError("No database files to report on")
+
+    weighted_sum = 0.0
+    total_weight = 0.0
+    study_minutes = 0
+    failed = {}
+    done = 0
+
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.writer(csvfile)
+        writer.writerow(COMBINED_HEADER)
+        queued = iter(paths)
+        pending = {}
+        for path in islice(queued, (workers or os.cpu_count() or 1) * QUEUED_PER_WORKER):
+            pending[executor.submit(summarize_database, path)] = path
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = pending.pop(future)
+                done += 1
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    failed[path] = str(e)
+                else:
+                    writer.writerows(_combined_rows(summary))
+                    weighted_sum += summary['weighted_sum']
+                    total_weight += summary['total_weight']
+                    study_minutes += summary['study_minutes']
+                for next_path in islice(queued, 1):
+                    pending[executor.submit(summarize_database, next_path)] = next_path
+            if show_progress:
+                print(f"\rProcessed {done}/{len(paths)} databases", end='', file=sys.stderr, flush=True)
+    if show_progress:
+        print(file=sys.stderr)
+
+    print(f"Combined report exported to {filename}")
+    return {
+        'databases': len(paths) - len(failed),
+        'failed': failed,
+        'weighted_final_grade': _weighted_grade(weighted_sum, total_weight),
+        'study_hours': round(study_minutes / 60.0, 2),
+    }
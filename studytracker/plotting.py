@@ -1,6 +1,9 @@
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import List, Optional
+from datetime import timedelta
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
 
 try:
     MATPLOTLIB_AVAILABLE = True
@@ -8,26 +11,78 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
 from studytracker.db import Database
+from studytracker.dates import from_epoch_day
+from studytracker.study_session_service import StudySessionService
+from studytracker.columnar import ColumnarSnapshot, course_grade_totals, course_study_totals
 
 
-def plot_average_grade_per_course(db: Database, filename: str) -> Optional[str]:
+# Row builders for the plots below when they read a columnar snapshot instead
+# of SQL; they return the same per-course (or per-assignment) rows as the queries
+
+def _snapshot_grade_rows(snapshot: ColumnarSnapshot) -> List[dict]:
+    counts, sums = course_grade_totals(snapshot)
+    graded = counts > 0
+    averages = sums[graded] / counts[graded]
+    order = np.argsort(-averages, kind='stable')
+    names = snapshot.text('courses', 'name')[graded]
+    return [{'course_name': str(names[i]), 'avg_grade': float(averages[i]),
+             'graded_count': int(counts[graded][i])} for i in order]
+
+
+def _snapshot_timeline_rows(snapshot: ColumnarSnapshot) -> List[dict]:
+    # The timeline shows live assignments only, like its query
+    live = ~snapshot.column('assignments', 'archived')
+    due_days = snapshot.column('assignments', 'due_day')[live]
+    order = np.argsort(due_days, kind='stable')
+    course_ids = snapshot.column('assignments', 'course_id')[live][order]
+    names = snapshot.text('courses', 'name')[snapshot.course_slots(course_ids)]
+    titles = snapshot.text('assignments', 'title')[live][order]
+    grades = snapshot.column('assignments', 'grade')[live][order]
+    return [{'course_name': str(name), 'title': str(title), 'due_day': int(day),
+             'grade': None if np.isnan(grade) else float(grade), 'course_id': int(course_id)}
+            for name, title, day, grade, course_id in zip(names, titles, due_days[order], grades, course_ids)]
+
+
+def _snapshot_study_rows(snapshot: ColumnarSnapshot) -> List[dict]:
+    counts, minutes = course_study_totals(snapshot)
+    studied = minutes > 0
+    hours = np.round(minutes[studied] / 60.0, 2)
+    order = np.argsort(-hours, kind='stable')
+    names = snapshot.text('courses', 'name')[studied]
+    return [{'course_name': str(names[i]), 'session_count': int(counts[studied][i]),
+             'total_minutes': int(minutes[studied][i]), 'total_hours': float(hours[i])} for i in order]
+
+
+def _snapshot_efficiency_rows(snapshot: ColumnarSnapshot) -> List[dict]:
+    _, minutes = course_study_totals(snapshot)
+    counts, sums = course_grade_totals(snapshot)
+    averages = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    names = snapshot.text('courses', 'name')
+    order = np.argsort(names, kind='stable')
+    course_ids = snapshot.column('courses', 'id')
+    return [{'id': int(course_ids[i]), 'course_name': str(names[i]),
+             'total_hours': float(np.round(minutes[i] / 60.0, 2)), 'avg_grade': float(averages[i]),
+             'assignment_count': int(counts[i])} for i in order]
+
+
+def plot_average_grade_per_course(db: Database, filename: str,
+                                  snapshot: Optional[ColumnarSnapshot] = None) -> Optional[str]:
     if not MATPLOTLIB_AVAILABLE:
         print("Error: matplotlib is not installed. Run: pip install matplotlib")
         return None
 
+    # Running grade totals cover archived assignments too
     query = """
         SELECT c.name AS course_name,
-               AVG(a.grade) AS avg_grade,
-               COUNT(a.id) AS graded_count
-        FROM courses c
-        LEFT JOIN assignments a ON a.course_id = c.id
-        WHERE a.grade IS NOT NULL
-        GROUP BY c.id
-        HAVING graded_count > 0
+               t.grade_sum / t.graded_count AS avg_grade,
+               t.graded_count
+        FROM course_grade_totals t
+        JOIN courses c ON t.course_id = c.id
+        WHERE t.graded_count > 0
         ORDER BY avg_grade DESC
     """
 
-    rows = db.fetch_all(query)
+    rows = _snapshot_grade_rows(snapshot) if snapshot is not None else db.fetch_all(query)
     if not rows:
         print("No graded assignments found to plot.")
         return None
@@ -61,7 +116,8 @@ def plot_average_grade_per_course(db: Database, filename: str) -> Optional[str]:
     return filename
 
 
-def plot_assignment_timeline(db: Database, filename: str) -> Optional[str]:
+def plot_assignment_timeline(db: Database, filename: str,
+                             snapshot: Optional[ColumnarSnapshot] = None) -> Optional[str]:
 
     if not MATPLOTLIB_AVAILABLE:
         print("Error: matplotlib is not installed. Run: pip install matplotlib")
@@ -71,24 +127,23 @@ def plot_assignment_timeline(db: Database, filename: str) -> Optional[str]:
         SELECT 
             c.name AS course_name,
             a.title,
-            a.due_date,
+            a.due_day,
             a.grade,
             c.id AS course_id
         FROM assignments a
         JOIN courses c ON a.course_id = c.id
-        ORDER BY a.due_date ASC
+        ORDER BY a.due_day ASC
     """
 
-    rows = db.fetch_all(query)
+    rows = _snapshot_timeline_rows(snapshot) if snapshot is not None else db.fetch_all(query)
     if not rows:
         print("No assignments found to plot.")
         return None
 
     assignments = []
     for row in rows:
-        due_date = datetime.strptime(row["due_date"], "%Y-%m-%d")
         assignments.append({
-            'date': due_date,
+            'date': from_epoch_day(row["due_day"]),
             'title': row["title"],
             'course': row["course_name"],
             'grade': row["grade"],
@@ -166,7 +221,8 @@ def plot_assignment_timeline(db: Database, filename: str) -> Optional[str]:
     return filename
 
 
-def plot_study_time_per_course(db: Database, filename: str) -> Optional[str]:
+def plot_study_time_per_course(db: Database, filename: str,
+                               snapshot: Optional[ColumnarSnapshot] = None) -> Optional[str]:
     """Plot total study time per course as a horizontal bar chart"""
     if not MATPLOTLIB_AVAILABLE:
         print("Error: matplotlib is not installed. Run: pip install matplotlib")
@@ -175,17 +231,17 @@ def plot_study_time_per_course(db: Database, filename: str) -> Optional[str]:
     query = """
         SELECT 
             c.name AS course_name,
-            COUNT(s.id) AS session_count,
-            SUM(s.duration_minutes) AS total_minutes,
-            ROUND(SUM(s.duration_minutes) / 60.0, 2) AS total_hours
+            SUM(r.session_count) AS session_count,
+            SUM(r.total_minutes) AS total_minutes,
+            ROUND(SUM(r.total_minutes) / 60.0, 2) AS total_hours
         FROM courses c
-        LEFT JOIN study_sessions s ON c.id = s.course_id
+        JOIN study_daily_rollup r ON c.id = r.course_id
         GROUP BY c.id, c.name
         HAVING total_minutes > 0
         ORDER BY total_hours DESC
     """
     
-    rows = db.fetch_all(query)
+    rows = _snapshot_study_rows(snapshot) if snapshot is not None else db.fetch_all(query)
     if not rows:
         print("No study sessions found to plot.")
         return None
@@ -218,27 +274,29 @@ def plot_study_time_per_course(db: Database, filename: str) -> Optional[str]:
     return filename
 
 
-def plot_study_efficiency(db: Database, filename: str) -> Optional[str]:
+def plot_study_efficiency(db: Database, filename: str,
+                          snapshot: Optional[ColumnarSnapshot] = None) -> Optional[str]:
     """Plot study time vs average grade per course to identify where more studying is needed"""
     if not MATPLOTLIB_AVAILABLE:
         print("Error: matplotlib is not installed. Run: pip install matplotlib")
         return None
     
+    # Study minutes and grades come from their own per-course aggregates, so
+    # sessions are not multiplied by graded assignments in a join
     query = """
         SELECT 
             c.id,
             c.name AS course_name,
-            COALESCE(ROUND(SUM(s.duration_minutes) / 60.0, 2), 0) AS total_hours,
-            COALESCE(AVG(a.grade), 0) AS avg_grade,
-            COUNT(a.id) AS assignment_count
+            COALESCE((SELECT ROUND(SUM(r.total_minutes) / 60.0, 2)
+                      FROM study_daily_rollup r WHERE r.course_id = c.id), 0) AS total_hours,
+            COALESCE(t.grade_sum / t.graded_count, 0) AS avg_grade,
+            COALESCE(t.graded_count, 0) AS assignment_count
         FROM courses c
-        LEFT JOIN study_sessions s ON c.id = s.course_id
-        LEFT JOIN assignments a ON c.id = a.course_id AND a.grade IS NOT NULL
-        GROUP BY c.id, c.name
+        LEFT JOIN course_grade_totals t ON t.course_id = c.id
         ORDER BY c.name
     """
     
-    rows = db.fetch_all(query)
+    rows = _snapshot_efficiency_rows(snapshot) if snapshot is not None else db.fetch_all(query)
     if not rows:
         print("No data found to plot.")
         return None
@@ -295,3 +353,216 @@ def plot_study_efficiency(db: Database, filename: str) -> Optional[str]:
     plt.close()
     print(f"Plot saved to {filename}")
     return filename
+
+
+def plot_study_trend(db: Database, filename: str, period: str = 'week',
+                     start_date: Optional[str] = None, end_date: Optional[str] = None,
+                     course_id: Optional[int] = None) -> Optional[str]:
+    """Plot study hours per course and week or month from the daily rollups"""
+    if not MATPLOTLIB_AVAILABLE:
+        print("Error: matplotlib is not installed. Run: pip install matplotlib")
+        return None
+
+    trend = StudySessionService(db).get_study_trend(period, start_date, end_date, course_id)
+    if not trend:
+        print("No study sessions found to plot.")
+        return None
+
+    periods = sorted({row['period_start'] for row in trend})
+    period_index = {p: i for i, p in enumerate(periods)}
+    hours_by_course = {}
+    for row in trend:
+        hours = hours_by_course.setdefault(row['course_name'], [0.0] * len(periods))
+        hours[period_index[row['period_start']]] = row['total_hours']
+
+    plt.figure(figsize=(12, 5))
+    x_pos = range(len(periods))
+    for course_name, hours in sorted(hours_by_course.items()):
+        plt.plot(x_pos, hours, marker='o', linewidth=1.5, markersize=4, label=course_name)
+
+    # Keep the axis readable when there are many periods
+    step = max(1, len(periods) // 20)
+    plt.xticks(list(x_pos)[::step], periods[::step], rotation=30, ha='right', fontsize=8)
+    plt.ylabel('Study Time (hours)', fontsize=11)
+    plt.title(f"Study Time per {period.capitalize()}", fontsize=13, fontweight='bold')
+    plt.grid(axis='y', linestyle='--', alpha=0.4)
+    plt.legend(loc='upper left', fontsize=8)
+
+    plt.tight_layout()
+    plt.savefig(filename, dpi=120)
+    plt.close()
+    print(f"Plot saved to {filename}")
+    return filename
+
+
+def plot_study_time_vs_grade(db: Database, filename: str, course_id: Optional[int] = None) -> Optional[str]:
+    """Scatter plot of hours studied per graded assignment against its grade, one color per course"""
+    if not MATPLOTLIB_AVAILABLE:
+        print("Error: matplotlib is not installed. Run: pip install matplotlib")
+        return None
+
+    rows = StudySessionService(db).get_study_time_by_assignment(course_id=course_id, graded_only=True)
+    if not rows:
+        print("No graded assignments found to plot.")
+        return None
+
+    points_by_course = {}
+    for row in rows:
+        hours, grades = points_by_course.setdefault(row['course_name'], ([], []))
+        hours.append(row['total_hours'])
+        grades.append(row['grade'])
+
+    plt.figure(figsize=(10, 6))
+    for course_name, (hours, grades) in sorted(points_by_course.items()):
+        plt.scatter(hours, grades, s=40, alpha=0.7, edgecolors='black', linewidth=0.5, label=course_name)
+
+    plt.xlabel('Study Time (hours)', fontsize=11)
+    plt.ylabel('Grade', fontsize=11)
+    plt.ylim(0, 105)
+    plt.title('Study Time vs Grade per Assignment', fontsize=13, fontweight='bold')
+    plt.grid(linestyle='--', alpha=0.4)
+    # A legend with hundreds of courses would cover the plot
+    if len(points_by_course) <= 12:
+        plt.legend(loc='lower right', fontsize=8)
+
+    plt.tight_layout()
+    plt.savefig(filename, dpi=120)
+    plt.close()
+    print(f"Plot saved to {filename}")
+    return filename
+
+
+# Per-course queries for paginated output: (select, value order, name order).
+# Each row is (course name, value, detail), and the count query uses the same FROM/WHERE.
+PAGED_CHARTS = {
+    'grades': ("""
+        SELECT c.name, t.grade_sum / t.graded_count AS value, t.graded_count
+        FROM course_grade_totals t
+        JOIN courses c ON t.course_id = c.id
+        WHERE t.graded_count > 0
+    """, "value DESC, c.name", "c.name"),
+    'study-time': ("""
+        SELECT c.name, ROUND(SUM(r.total_minutes) / 60.0, 2) AS value, SUM(r.session_count)
+        FROM courses c
+        JOIN study_daily_rollup r ON c.id = r.course_id
+        GROUP BY c.id
+        HAVING SUM(r.total_minutes) > 0
+    """, "value DESC, c.name", "c.name"),
+    'efficiency': ("""
+        SELECT c.name,
+               COALESCE((SELECT ROUND(SUM(r.total_minutes) / 60.0, 2)
+                         FROM study_daily_rollup r WHERE r.course_id = c.id), 0) AS value,
+               COALESCE(t.grade_sum / t.graded_count, 0)
+        FROM courses c
+        LEFT JOIN course_grade_totals t ON t.course_id = c.id
+    """, "value DESC, c.name", "c.name"),
+}
+
+PAGE_TITLES = {
+    'grades': 'Average Grade per Course',
+    'study-time': 'Study Time per Course',
+    'efficiency': 'Study Time vs Performance',
+}
+
+
+def _draw_grade_page(figure: Figure, rows: list):
+    ax = figure.subplots()
+    names = [row[0] for row in rows]
+    grades = [row[1] for row in rows]
+    bars = ax.bar(range(len(rows)), grades, color='#4e79a7')
+    ax.set_xticks(range(len(rows)))
+    ax.set_xticklabels(names, rotation=35, ha='right', fontsize=8)
+    ax.set_ylabel('Average Grade')
+    ax.set_ylim(0, 105)
+    ax.grid(axis='y', linestyle='--', alpha=0.4)
+    for bar, (_, grade, count) in zip(bars, rows):
+        ax.text(bar.get_x() + bar.get_width() / 2, grade + 1, f"{grade:.1f}\n({count})",
+                ha='center', va='bottom', fontsize=7)
+
+
+def _draw_study_page(figure: Figure, rows: list):
+    ax = figure.subplots()
+    names = [row[0] for row in rows]
+    hours = [row[1] for row in rows]
+    # First row at the top
+    positions = range(len(rows) - 1, -1, -1)
+    ax.barh(list(positions), hours, color='#59a14f', edgecolor='black', linewidth=0.5)
+    ax.set_yticks(list(positions))
+    ax.set_yticklabels(names, fontsize=8)
+    ax.set_xlabel('Total Study Time (hours)')
+    ax.grid(axis='x', linestyle='--', alpha=0.4)
+    for position, (_, value, count) in zip(positions, rows):
+        ax.text(value, position, f" {value}h ({count} sessions)", va='center', fontsize=7)
+
+
+def _draw_efficiency_page(figure: Figure, rows: list):
+    hours_ax, grades_ax = figure.subplots(1, 2)
+    names = [row[0] for row in rows]
+    x_pos = range(len(rows))
+    hours_ax.bar(x_pos, [row[1] for row in rows], color='#3498db', edgecolor='black', linewidth=0.5)
+    hours_ax.set_ylabel('Study Time (hours)')
+    grades_ax.bar(x_pos, [row[2] for row in rows], color='#e74c3c', edgecolor='black', linewidth=0.5)
+    grades_ax.set_ylabel('Average Grade')
+    grades_ax.set_ylim(0, 100)
+    for ax in (hours_ax, grades_ax):
+        ax.set_xticks(list(x_pos))
+        ax.set_xticklabels(names, rotation=35, ha='right', fontsize=8)
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+
+
+PAGE_DRAWERS = {
+    'grades': _draw_grade_page,
+    'study-time': _draw_study_page,
+    'efficiency': _draw_efficiency_page,
+}
+
+
+def plot_course_pages(db: Database, filename: str, chart: str, page_size: int = 25,
+                      sort_by: str = 'value', limit: Optional[int] = None) -> Optional[str]:
+    """Write a per-course chart as a multi-page PDF with ``page_size`` courses per page.
+
+    ``sort_by='value'`` puts the highest grades or most studied courses
+    first (so ``limit`` keeps the top N); ``sort_by='name'`` is alphabetical.
+    Rows are read from a cursor one page at a time and every page is drawn
+    on the same figure and written to the PDF before the next one is read,
+    so memory and time per page do not grow with the number of courses.
+    """
+    if not MATPLOTLIB_AVAILABLE:
+        print("Error: matplotlib is not installed. Run: pip install matplotlib")
+        return None
+    if chart not in PAGED_CHARTS:
+        raise ValueError(f"Chart must be one of: {', '.join(PAGED_CHARTS)}")
+    if sort_by not in ('value', 'name'):
+        raise ValueError("Sort order must be 'value' or 'name'")
+    if page_size <= 0:
+        raise ValueError("Page size must be a positive number")
+
+    select, value_order, name_order = PAGED_CHARTS[chart]
+    total = db.fetch_one(f"SELECT COUNT(*) FROM ({select})")[0]
+    if limit is not None:
+        total = min(total, limit)
+    if not total:
+        print("No data found to plot.")
+        return None
+    pages = (total + page_size - 1) // page_size
+
+    query = f"{select} ORDER BY {value_order if sort_by == 'value' else name_order} LIMIT ?"
+    cursor = db.connection.cursor()
+    cursor.row_factory = None
+    cursor.execute(query, (total,))
+
+    figure = Figure(figsize=(11, 6.5))
+    with PdfPages(filename) as pdf:
+        for page in range(1, pages + 1):
+            rows = cursor.fetchmany(page_size)
+            figure.clear()
+            PAGE_DRAWERS[chart](figure, rows)
+            first = (page - 1) * page_size + 1
+            figure.suptitle(f"{PAGE_TITLES[chart]} - courses {first}-{first + len(rows) - 1} of {total}",
+                            fontsize=12, fontweight='bold')
+            figure.text(0.99, 0.01, f"Page {page} of {pages}", ha='right', fontsize=8, color='gray')
+            figure.subplots_adjust(left=0.08, right=0.97, top=0.9, bottom=0.25)
+            pdf.savefig(figure)
+    cursor.close()
+    print(f"Plot saved to {filename} ({pages} page(s))")
+    return filename
@@ -0,0 +1,195 @@
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Set
+
+
+WORD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# Target table of INSERT/REPLACE/UPDATE/DELETE, with or without a schema name
+WRITE_TARGET_PATTERN = re.compile(
+    r'\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+'
+    r'(?:[A-Za-z_]\w*\.)?["`\[]?([A-Za-z_]\w*)',
+    re.IGNORECASE
+)
+
+# Statements that change rows; anything else that is not a SELECT clears the whole cache
+DML_KEYWORDS = ('insert', 'replace', 'update', 'delete', 'with')
+
+
+class QueryCache:
+    """LRU cache of query results with per-table invalidation.
+
+    Every entry remembers the tables its query reads (views are expanded to
+    their tables). A write invalidates the tables it names plus everything
+    their triggers and ON DELETE/UPDATE actions reach, so a new session also
+    drops cached rollups and a deleted course drops its assignments.
+    Commits by other connections or processes are caught with
+    ``PRAGMA data_version``, which clears the whole cache.
+    """
+
+    def __init__(self, max_entries: int = 256, max_rows: int = 10000):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive number")
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._keys_by_table: Dict[str, Set[Hashable]] = {}
+        self._generation = 0
+        self._data_versions: Dict[int, int] = {}
+        self._names: Optional[Set[str]] = None
+        self._reads: Dict[str, Set[str]] = {}
+        self._effects: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def load_schema(self, connection: sqlite3.Connection):
+        """Learn table, view, trigger and foreign key dependencies from sqlite_master"""
+        with self._lock:
+            if self._names is not None:
+                return
+            objects = connection.execute(
+                "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'trigger')"
+            ).fetchall()
+            names = {row[1].lower() for row in objects if row[0] in ('table', 'view')}
+
+            reads = {name: {name} for name in names}
+            effects = {name: {name} for name in names}
+            for kind, name, table, sql in objects:
+                if kind == 'view':
+                    reads[name.lower()] |= self._words(sql or '') & names
+                elif kind == 'trigger':
+                    effects.setdefault(table.lower(), {table.lower()}).update(self._targets(sql or '') & names)
+                else:
+                    for fk in connection.execute(f"PRAGMA foreign_key_list({name})").fetchall():
+                        # (id, seq, table, from, to, on_update, on_delete, match)
+                        if fk[5] != 'NO ACTION' or fk[6] != 'NO ACTION':
+                            effects.setdefault(fk[2].lower(), {fk[2].lower()}).add(name.lower())
+
+            self._reads = {name: self._closure(name, reads) for name in reads}
+            self._effects = {name: self._closure(name, effects) for name in effects}
+            self._names = names
+
+    def _closure(self, start: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        seen = set()
+        pending = [start]
+        while pending:
+            name = pending.pop()
+            if name not in seen:
+                seen.add(name)
+                pending.extend(edges.get(name, ()))
+        return seen
+
+    def _words(self, query: str) -> Set[str]:
+        return {word.lower() for word in WORD_PATTERN.findall(query)}
+
+    def _targets(self, query: str) -> Set[str]:
+        return {match.lower() for match in WRITE_TARGET_PATTERN.findall(query)}
+
+    def tables_read(self, query: str) -> FrozenSet[str]:
+        # Every schema name in the text counts; reading too much only invalidates more often
+        tables = set()
+        for name in self._words(query) & (self._names or set()):
+            tables |= self._reads.get(name, {name})
+        return frozenset(tables)
+
+    def tables_written(self, query: str) -> Optional[Set[str]]:
+        """Tables a statement may change, or None when it is not plain DML"""
+        statement = query.lstrip().lower()
+        if statement.startswith('select'):
+            return set()
+        if not statement.startswith(DML_KEYWORDS) or self._names is None:
+            return None
+        targets = self._targets(query)
+        if not targets:
+            return None
+        tables = set()
+        for name in targets & self._names:
+            tables |= self._effects.get(name, {name})
+        return tables
+
+    def check_data_version(self, connection: sqlite3.Connection):
+        """Clear the cache when another connection has committed since this one last looked"""
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            previous = self._data_versions.get(id(connection))
+            self._data_versions[id(connection)] = version
+            if previous is not None and previous != version:
+                self._clear_entries()
+
+    def get(self, key: Hashable):
+        """Return (True, value) on a hit and (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, value, tables: FrozenSet[str], generation: int):
+        """Store a result unless an invalidation ran since ``generation`` was read"""
+        if isinstance(value, (list, tuple)) and len(value) > self.max_rows:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, tables)
+            self._entries.move_to_end(key)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (_, old_tables) = self._entries.popitem(last=False)
+                self._forget(old_key, old_tables)
+
+    def _forget(self, key: Hashable, tables: Iterable[str]):
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def invalidate(self, tables: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            for table in tables:
+                for key in self._keys_by_table.pop(table, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._forget(key, entry[1])
+
+    def _clear_entries(self):
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+        self._keys_by_table.clear()
+
+    def clear(self, schema_changed: bool = False):
+        with self._lock:
+            self._clear_entries()
+            if schema_changed:
+                self._names = None
+
+    def forget_connection(self, connection: sqlite3.Connection):
+        with self._lock:
+            self._data_versions.pop(id(connection), None)
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
@@ -0,0 +1,208 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence
+
+try:
+    # The object-oriented API on the Agg canvas: no pyplot state, no GUI backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.dates import AutoDateLocator, DateFormatter
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+from studytracker.db import Database
+
+
+# Courses handed to a worker at a time; one round of queries per chunk
+CHUNK_SIZE = 64
+
+# Keeps the summary labels readable over bars and lines
+LABEL_BOX = {'facecolor': 'white', 'alpha': 0.8, 'edgecolor': 'none', 'pad': 1.5}
+
+
+class CourseChart:
+    """One report card figure whose artists are updated for every course.
+
+    Building a figure, its axes, tick machinery and text objects costs far
+    more than drawing it, so the layout is fixed once and ``render`` only
+    swaps the data, limits and labels before saving. Day numbers are used
+    directly as x values; they match matplotlib's date numbers (days since
+    1970-01-01).
+    """
+
+    def __init__(self, dpi: int = 100):
+        self.figure = Figure(figsize=(9, 3.2), dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        # A fixed layout replaces tight_layout, which measures every label on each save
+        self.figure.subplots_adjust(left=0.06, right=0.98, top=0.82, bottom=0.14, wspace=0.18)
+        self.grades_ax, self.study_ax = self.figure.subplots(1, 2)
+        self.title = self.figure.suptitle('', fontsize=12, fontweight='bold')
+
+        ax = self.grades_ax
+        ax.set_title('Grades by Due Date', fontsize=10)
+        ax.set_ylim(0, 100)
+        ax.grid(axis='y', linestyle='--', alpha=0.4)
+        self.grade_bars = LineCollection([], linewidths=6, colors='#4e79a7')
+        ax.add_collection(self.grade_bars)
+        self.average_line = ax.axhline(0, color='#e15759', linestyle='--', linewidth=1)
+        self.average_text = ax.text(0.01, 0.04, '', transform=ax.transAxes, fontsize=8, bbox=LABEL_BOX)
+        self.grades_empty = ax.text(0.5, 0.5, 'No graded assignments', transform=ax.transAxes,
+                                    ha='center', va='center', color='gray', style='italic')
+
+        ax = self.study_ax
+        ax.set_title('Study Hours per Week', fontsize=10)
+        ax.grid(axis='y', linestyle='--', alpha=0.4)
+        self.study_line, = ax.plot([], [], drawstyle='steps-post', color='#59a14f', linewidth=1.5)
+        self.study_text = ax.text(0.01, 0.92, '', transform=ax.transAxes, fontsize=8, bbox=LABEL_BOX)
+        self.study_empty = ax.text(0.5, 0.5, 'No study sessions', transform=ax.transAxes,
+                                   ha='center', va='center', color='gray', style='italic')
+
+        for ax in (self.grades_ax, self.study_ax):
+            ax.xaxis.set_major_locator(AutoDateLocator(maxticks=6))
+            # A plain format; ConciseDateFormatter re-measures an offset label on every draw
+            ax.xaxis.set_major_formatter(DateFormatter('%b %d'))
+            ax.tick_params(labelsize=8)
+
+    def render(self, filename: str, name: str, grade_days: Sequence[int], grades: Sequence[float],
+               average: Optional[float], graded_count: int,
+               study_weeks: Sequence[int], study_minutes: Sequence[int]):
+        self.title.set_text(name)
+
+        has_grades = len(grades) > 0
+        self.grade_bars.set_segments([[(day, 0), (day, grade)] for day, grade in zip(grade_days, grades)])
+        self.grades_empty.set_visible(not has_grades)
+        self.average_line.set_visible(average is not None)
+        if average is not None:
+            self.average_line.set_ydata([average, average])
+            self.average_text.set_text(f"Course average {average:.1f} ({graded_count} graded)")
+        else:
+            self.average_text.set_text('')
+        if has_grades:
+            self.grades_ax.set_xlim(grade_days[0] - 7, grade_days[-1] + 7)
+
+        has_study = len(study_weeks) > 0
+        self.study_empty.set_visible(not has_study)
+        if has_study:
+            # Repeat the last week so the step covers it
+            hours = [minutes / 60.0 for minutes in study_minutes]
+            self.study_line.set_data(list(study_weeks) + [study_weeks[-1] + 7], hours + hours[-1:])
+            self.study_ax.set_xlim(study_weeks[0], study_weeks[-1] + 7)
+            self.study_ax.set_ylim(0, max(hours) * 1.15)
+            self.study_text.set_text(f"{sum(hours):.1f} hours in total")
+        else:
+            self.study_line.set_data([], [])
+            self.study_text.set_text('')
+
+        # Fast zlib level: most of the remaining time would go to compressing the PNG
+        self.figure.savefig(filename, pil_kwargs={'compress_level': 1})
+
+
+def load_course_data(db: Database, course_ids: List[int]) -> Dict[int, dict]:
+    """Report card data for a chunk of courses, read with one query per kind"""
+    params = (json.dumps(course_ids),)
+    courses = {}
+    with db.read_transaction():
+        for row in db.fetch_all("""
+            SELECT c.id, c.name, t.graded_count, t.grade_sum / t.graded_count AS avg_grade
+            FROM courses c
+            LEFT JOIN course_grade_totals t ON t.course_id = c.id
+            WHERE c.id IN (SELECT value FROM json_each(?))
+        """, params):
+            courses[row['id']] = {
+                'name': row['name'],
+                'average': row['avg_grade'],
+                'graded_count': row['graded_count'] or 0,
+                'grade_days': [], 'grades': [], 'study_weeks': [], 'study_minutes': [],
+            }
+        for row in db.fetch_all("""
+            SELECT course_id, due_day, grade
+            FROM assignments
+            WHERE grade IS NOT NULL AND course_id IN (SELECT value FROM json_each(?))
+            ORDER BY course_id, due_day
+        """, params):
+            course = courses[row['course_id']]
+            course['grade_days'].append(row['due_day'])
+            course['grades'].append(row['grade'])
+        # Weeks start on Monday; day 0 (1970-01-01) was a Thursday
+        for row in db.fetch_all("""
+            SELECT course_id, day - ((day + 3) % 7 + 7) % 7 AS week, SUM(total_minutes) AS minutes
+            FROM study_daily_rollup
+            WHERE course_id IN (SELECT value FROM json_each(?))
+            GROUP BY course_id, week
+            ORDER BY course_id, week
+        """, params):
+            course = courses[row['course_id']]
+            course['study_weeks'].append(row['week'])
+            course['study_minutes'].append(row['minutes'])
+    return courses
+
+
+def report_card_filename(output_dir: str, course_id: int) -> str:
+    return os.path.join(output_dir, f"course_{course_id}.png")
+
+
+# Per-process state, created once by _init_worker
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(db_path: str, output_dir: str, dpi: int):
+    db = Database(db_path)
+    db.connect()
+    _worker.update(db=db, chart=CourseChart(dpi), output_dir=output_dir)
+
+
+def _render_chunk(course_ids: List[int]) -> int:
+    chart = _worker['chart']
+    courses = load_course_data(_worker['db'], course_ids)
+    for course_id, course in courses.items():
+        chart.render(report_card_filename(_worker['output_dir'], course_id), course['name'],
+                     course['grade_days'], course['grades'], course['average'], course['graded_count'],
+                     course['study_weeks'], course['study_minutes'])
+    return len(courses)
+
+
+def plot_per_course(db: Database, output_dir: str, course_ids: Optional[List[int]] = None,
+                    workers: Optional[int] = None, dpi: int = 100,
+                    show_progress: bool = True) -> Optional[Dict[str, object]]:
+    """Render one report card PNG per course into ``output_dir``, fanned out over a process pool.
+
+    Every worker opens its own connection and keeps one ``CourseChart`` for
+    all the courses it renders. Courses are handed out in chunks of
+    ``CHUNK_SIZE`` so the data for a chunk comes from a few queries.
+    """
+    if not MATPLOTLIB_AVAILABLE:
+        print("Error: matplotlib is not installed. Run: pip install matplotlib")
+        return None
+
+    if course_ids is None:
+        course_ids = [row['id'] for row in db.fetch_all("SELECT id FROM courses ORDER BY id")]
+    if not course_ids:
+        print("No courses found to plot.")
+        return None
+    os.makedirs(output_dir, exist_ok=True)
+
+    chunks = [course_ids[i:i + CHUNK_SIZE] for i in range(0, len(course_ids), CHUNK_SIZE)]
+    start = time.perf_counter()
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db.db_path, output_dir, dpi)) as executor:
+        futures = [executor.submit(_render_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            rendered += future.result()
+            if show_progress:
+                print(f"\rRendered {rendered}/{len(course_ids)} courses", end='', file=sys.stderr, flush=True)
+    if show_progress:
+        print(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    print(f"Saved {rendered} report card(s) to {output_dir}")
+    return {
+        'rendered': rendered,
+        'seconds': round(elapsed, 2),
+        'per_second': round(rendered / elapsed, 1) if elapsed else None,
+    }
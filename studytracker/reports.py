@@ -1,7 +1,10 @@
 import csv
-from typing import List, Dict
+import json
+from typing import List, Dict, Optional
 import pandas as pd
 from studytracker.db import Database
+from studytracker.metrics import instrumented
+from studytracker.study_session_service import StudySessionService
 
 try:
     from openpyxl import Workbook, load_workbook
@@ -12,6 +15,15 @@ except ImportError:
     EXCEL_AVAILABLE = False
 
 
+# Columns emitted for each table in delta exports
+CHANGE_LOG_COLUMNS = {
+    'courses': ['id', 'name', 'teacher', 'credits'],
+    'assignments': ['id', 'course_id', 'title', 'due_date', 'grade'],
+    'study_sessions': ['id', 'course_id', 'assignment_id', 'date', 'duration_minutes', 'notes'],
+}
+
+
+@instrumented
 class ReportGenerator:
     
     def __init__(self, db: Database):
@@ -53,6 +65,21 @@ class ReportGenerator:
         
         print(f"Assignments exported to {filename}")
     
+    def export_study_time_by_assignment_to_csv(self, filename: str, course_id: Optional[int] = None):
+        """Minutes studied per assignment next to its grade"""
+        rows = StudySessionService(self.db).get_study_time_by_assignment(course_id=course_id)
+
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Assignment ID', 'Course', 'Assignment', 'Due Date', 'Grade',
+                             'Sessions', 'Study Minutes', 'Study Hours'])
+            for row in rows:
+                grade = row['grade'] if row['grade'] is not None else 'Not graded'
+                writer.writerow([row['assignment_id'], row['course_name'], row['title'], row['due_date'],
+                                 grade, row['session_count'], row['total_minutes'], row['total_hours']])
+
+        print(f"Study time by assignment exported to {filename}")
+    
     def export_full_report_to_csv(self, filename: str):
         query = """
             SELECT 
@@ -145,17 +172,7 @@ class ReportGenerator:
         # Create workbook
         wb = Workbook()
         
-        # Sheet 1: Courses
-        ws_courses = wb.active
-        ws_courses.title = "Courses"
         courses_query = "SELECT id, name, teacher, credits FROM courses ORDER BY name"
-        courses = self.db.fetch_all(courses_query)
-        ws_courses.append(['ID', 'Course Name', 'Teacher', 'Credits'])
-        for row in courses:
-            ws_courses.append([row['id'], row['name'], row['teacher'], row['credits']])
-        
-        # Sheet 2: Assignments
-        ws_assignments = wb.create_sheet("Assignments")
         assignments_query = """
             SELECT 
                 a.id,
@@ -167,7 +184,20 @@ class ReportGenerator:
             JOIN courses c ON a.course_id = c.id
             ORDER BY a.due_date
         """
-        assignments = self.db.fetch_all(assignments_query)
+        # Read every sheet from the same point-in-time view of the database
+        with self.db.read_transaction():
+            courses = self.db.fetch_all(courses_query)
+            assignments = self.db.fetch_all(assignments_query)
+        
+        # Sheet 1: Courses
+        ws_courses = wb.active
+        ws_courses.title = "Courses"
+        ws_courses.append(['ID', 'Course Name', 'Teacher', 'Credits'])
+        for row in courses:
+            ws_courses.append([row['id'], row['name'], row['teacher'], row['credits']])
+        
+        # Sheet 2: Assignments
+        ws_assignments = wb.create_sheet("Assignments")
         ws_assignments.append(['ID', 'Course', 'Assignment', 'Due Date', 'Grade'])
         for row in assignments:
             grade = row['grade'] if row['grade'] is not None else 'Not graded'
@@ -180,6 +210,22 @@ class ReportGenerator:
         print(f"Full report exported to {filename}")
 
     def calculate_weighted_final_grade(self) -> float:
+        """Credit-weighted final grade from the running per-course totals.
+
+        The totals are kept current by triggers on assignments and courses, so
+        this reads one row per course instead of every graded assignment.
+        """
+        query = """
+            SELECT SUM(weighted_sum) AS weighted_sum, SUM(total_weight) AS total_weight
+            FROM course_grade_totals
+        """
+        row = self.db.fetch_one(query)
+        if not row or not row["total_weight"]:
+            return 0.0
+        return round(row["weighted_sum"] / row["total_weight"], 2)
+
+    def recalculate_weighted_final_grade(self) -> float:
+        """Credit-weighted final grade recomputed from every graded assignment, archived ones included"""
         query = """
             SELECT a.grade, c.credits
             FROM assignments a
@@ -187,8 +233,6 @@ class ReportGenerator:
             WHERE a.grade IS NOT NULL
         """
         rows = self.db.fetch_all(query)
-        if not rows:
-            return 0.0
 
         total_weighted = 0.0
         total_credits = 0
@@ -196,8 +240,74 @@ class ReportGenerator:
             total_weighted += row["grade"] * row["credits"]
             total_credits += row["credits"]
 
+        # Grades moved to archive files are kept as per-course sums
+        archived_query = """
+            SELECT g.graded_count, g.grade_sum, c.credits
+            FROM archived_grade_totals g
+            JOIN courses c ON g.course_id = c.id
+        """
+        for row in self.db.fetch_all(archived_query):
+            total_weighted += row["grade_sum"] * row["credits"]
+            total_credits += row["graded_count"] * row["credits"]
+
         return round(total_weighted / total_credits, 2) if total_credits else 0.0
 
+    def verify_grade_totals(self, tolerance: float = 1e-6) -> Dict[str, object]:
+        """Compare the running per-course totals with a full recomputation"""
+        query = """
+            SELECT
+                c.id AS course_id,
+                c.name AS course_name,
+                COALESCE(r.graded_count, 0) AS expected_count,
+                COALESCE(r.weighted_sum, 0) AS expected_weighted_sum,
+                COALESCE(r.total_weight, 0) AS expected_total_weight,
+                COALESCE(t.graded_count, 0) AS graded_count,
+                COALESCE(t.weighted_sum, 0) AS weighted_sum,
+                COALESCE(t.total_weight, 0) AS total_weight
+            FROM courses c
+            LEFT JOIN (
+                SELECT g.course_id,
+                       g.graded_count,
+                       g.grade_sum * cc.credits AS weighted_sum,
+                       g.graded_count * cc.credits AS total_weight
+                FROM all_grade_totals g
+                JOIN courses cc ON g.course_id = cc.id
+            ) r ON r.course_id = c.id
+            LEFT JOIN course_grade_totals t ON t.course_id = c.id
+            ORDER BY c.name
+        """
+        with self.db.read_transaction():
+            rows = self.db.fetch_all(query)
+            running = self.calculate_weighted_final_grade()
+            recomputed = self.recalculate_weighted_final_grade()
+
+        mismatched = []
+        for row in rows:
+            if (row["graded_count"] != row["expected_count"]
+                    or abs(row["weighted_sum"] - row["expected_weighted_sum"]) > tolerance
+                    or abs(row["total_weight"] - row["expected_total_weight"]) > tolerance):
+                mismatched.append(row["course_name"])
+
+        return {
+            "running": running,
+            "recomputed": recomputed,
+            "mismatched_courses": mismatched,
+            # Both grades are rounded to 2 decimals, which may differ by one step
+            "ok": not mismatched and abs(running - recomputed) <= 0.01,
+        }
+
+    def rebuild_grade_totals(self):
+        """Recompute the running per-course totals from the live and archived assignments"""
+        with self.db.transaction():
+            self.db.execute("DELETE FROM course_grade_totals")
+            self.db.execute("""
+                INSERT INTO course_grade_totals (course_id, graded_count, grade_sum, weighted_sum, total_weight)
+                SELECT g.course_id, g.graded_count, g.grade_sum, g.grade_sum * c.credits, g.graded_count * c.credits
+                FROM all_grade_totals g
+                JOIN courses c ON g.course_id = c.id
+            """)
+        print("Grade totals rebuilt from assignments")
+
     def export_full_report_with_pandas(self, filename: str, file_format: str = "csv"):
         query = """
             SELECT 
@@ -211,14 +321,15 @@ class ReportGenerator:
             LEFT JOIN assignments a ON c.id = a.course_id
             ORDER BY c.name, a.due_date
         """
-        rows = self.db.fetch_all(query)
+        with self.db.read_transaction():
+            rows = self.db.fetch_all(query)
+            final_grade = self.calculate_weighted_final_grade()
         if not rows:
             print("No data to export.")
             return
 
         df = pd.DataFrame(rows, columns=rows[0].keys())
 
-        final_grade = self.calculate_weighted_final_grade()
         summary_row = {
             "course_name": "WEIGHTED_FINAL_GRADE",
             "teacher": "",
@@ -252,6 +363,102 @@ class ReportGenerator:
 
         print(f"Pandas report exported to {filename}")
 
+    def get_export_watermark(self, name: str = "default") -> int:
+        row = self.db.fetch_one("SELECT seq FROM export_watermarks WHERE name = ?", (name,))
+        return row["seq"] if row else 0
+
+    def export_changes(self, filename: str, since: Optional[int] = None, file_format: str = "csv",
+                       tables: Optional[List[str]] = None, watermark_name: str = "default") -> int:
+        """Export only the rows changed after change_log sequence ``since``.
+
+        Each changed row is written once with its latest operation and, unless it
+        was deleted or moved to an archive file, its current values. ``since`` defaults to the stored
+        watermark for ``watermark_name``; the new watermark is stored and
+        returned, so the next run picks up where this one stopped. When the
+        change log was pruned past ``since`` the changes in between are gone,
+        so every current row is written instead, with the operation ``full``.
+        """
+        if file_format not in ("csv", "ndjson"):
+            raise ValueError("Delta exports support the csv and ndjson formats")
+        tables = tables or list(CHANGE_LOG_COLUMNS)
+        for table in tables:
+            if table not in CHANGE_LOG_COLUMNS:
+                raise ValueError(f"Unknown table: {table}")
+        if since is None:
+            since = self.get_export_watermark(watermark_name)
+
+        changes_query = f"""
+            SELECT l.seq, l.table_name, l.row_id, l.operation
+            FROM change_log l
+            JOIN (
+                SELECT MAX(seq) AS seq
+                FROM change_log
+                WHERE seq > ? AND seq <= ?
+                GROUP BY table_name, row_id
+            ) latest ON latest.seq = l.seq
+            WHERE l.table_name IN ({", ".join("?" for _ in tables)})
+            ORDER BY l.seq
+        """
+        with self.db.read_transaction():
+            row = self.db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+            last = row["seq"] if row else 0
+            first = self.db.fetch_one("SELECT MIN(seq) AS seq FROM change_log")["seq"]
+            watermark = max(last, since)
+            current = {}
+            if last > since and (first is None or first > since + 1):
+                print(f"Change log was pruned past {since}; exporting every current row")
+                changes = []
+                for table in tables:
+                    columns = ", ".join(CHANGE_LOG_COLUMNS[table])
+                    for data in self.db.fetch_all(f"SELECT {columns} FROM {table} ORDER BY id"):
+                        changes.append({"seq": watermark, "table_name": table,
+                                        "row_id": data["id"], "operation": "full"})
+                        current[(table, data["id"])] = dict(data)
+            else:
+                changes = self.db.fetch_all(changes_query, (since, watermark, *tables))
+
+                # Current values of every changed row, one query per table
+                for table in tables:
+                    ids = [c["row_id"] for c in changes
+                           if c["table_name"] == table and c["operation"] not in ("delete", "archive")]
+                    if not ids:
+                        continue
+                    columns = ", ".join(CHANGE_LOG_COLUMNS[table])
+                    rows = self.db.fetch_all(
+                        f"SELECT {columns} FROM {table} WHERE id IN (SELECT value FROM json_each(?))",
+                        (json.dumps(ids),)
+                    )
+                    for data in rows:
+                        current[(table, data["id"])] = dict(data)
+
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f) if file_format == "csv" else None
+            if writer:
+                writer.writerow(["seq", "table", "operation", "id", "data"])
+            for change in changes:
+                data = current.get((change["table_name"], change["row_id"]))
+                record = {
+                    "seq": change["seq"],
+                    "table": change["table_name"],
+                    "operation": change["operation"],
+                    "id": change["row_id"],
+                    "data": data,
+                }
+                if writer:
+                    writer.writerow([record["seq"], record["table"], record["operation"], record["id"],
+                                     json.dumps(data) if data is not None else ""])
+                else:
+                    f.write(json.dumps(record) + "\n")
+
+        self.db.execute("""
+            INSERT INTO export_watermarks (name, seq, exported_at)
+            VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+            ON CONFLICT (name) DO UPDATE SET seq = excluded.seq, exported_at = excluded.exported_at
+        """, (watermark_name, watermark))
+
+        print(f"Exported {len(changes)} changed row(s) since {since} to {filename} (watermark {watermark})")
+        return watermark
+
     def _apply_grade_conditional_formatting(self, ws, grade_col: str, last_row: int):
         if not EXCEL_AVAILABLE or last_row < 2:
             return
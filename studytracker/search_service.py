@@ -0,0 +1,87 @@
+from typing import List, Optional
+from studytracker.db import Database, Record
+from studytracker.metrics import instrumented
+from studytracker.dates import day_range
+
+
+SEARCH_KINDS = ('session', 'assignment')
+
+
+@instrumented
+class SearchService:
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def search(self, text: str, course_id: Optional[int] = None, start_date: Optional[str] = None,
+               end_date: Optional[str] = None, kind: Optional[str] = None, limit: int = 20,
+               raw: bool = False) -> List[Record]:
+        """Full-text search over session notes and assignment titles, best matches first.
+
+        Every word in ``text`` must match (word stems are matched, so "review"
+        finds "reviewed"). Pass ``raw=True`` to use FTS5 query syntax directly.
+        The date window applies to session dates and assignment due dates.
+        """
+        if not text or not text.strip():
+            raise ValueError("Search text cannot be empty")
+        if kind is not None and kind not in SEARCH_KINDS:
+            raise ValueError(f"Kind must be one of: {', '.join(SEARCH_KINDS)}")
+        if limit <= 0:
+            raise ValueError("Limit must be a positive number")
+
+        match = text if raw else self._quote_terms(text)
+        start_day, end_day = day_range(start_date, end_date)
+
+        parts = []
+        params = []
+        if kind in (None, 'session'):
+            parts.append("""
+                SELECT
+                    'session' as kind,
+                    s.id,
+                    s.course_id,
+                    c.name as course_name,
+                    s.date,
+                    snippet(study_sessions_fts, 0, '[', ']', '...', 12) as snippet,
+                    bm25(study_sessions_fts) as rank
+                FROM study_sessions_fts
+                JOIN study_sessions s ON s.id = study_sessions_fts.rowid
+                JOIN courses c ON s.course_id = c.id
+                WHERE study_sessions_fts MATCH ?
+                  AND s.date_day BETWEEN ? AND ?
+            """ + (" AND s.course_id = ?" if course_id is not None else ""))
+            params.extend([match, start_day, end_day])
+            if course_id is not None:
+                params.append(course_id)
+        if kind in (None, 'assignment'):
+            parts.append("""
+                SELECT
+                    'assignment' as kind,
+                    a.id,
+                    a.course_id,
+                    c.name as course_name,
+                    a.due_date as date,
+                    snippet(assignments_fts, 0, '[', ']', '...', 12) as snippet,
+                    bm25(assignments_fts) as rank
+                FROM assignments_fts
+                JOIN assignments a ON a.id = assignments_fts.rowid
+                JOIN courses c ON a.course_id = c.id
+                WHERE assignments_fts MATCH ?
+                  AND a.due_day BETWEEN ? AND ?
+            """ + (" AND a.course_id = ?" if course_id is not None else ""))
+            params.extend([match, start_day, end_day])
+            if course_id is not None:
+                params.append(course_id)
+
+        query = " UNION ALL ".join(parts) + " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        try:
+            return self.db.fetch_records(query, tuple(params))
+        except RuntimeError as e:
+            if raw and 'fts5' in str(e):
+                raise ValueError(f"Invalid search query: {text}")
+            raise
+
+    def _quote_terms(self, text: str) -> str:
+        # Quote each word so characters like "+" or ":" are searched literally
+        return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
@@ -0,0 +1,91 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+MINUTES_PER_DAY = 24 * 60
+
+# Sessions are compared as (date, course_id, assignment_id or -1, duration_minutes, notes or ''),
+# followed by a reference (session id or import line number) and whether the row is being imported
+SessionRow = Tuple[str, int, int, int, str, int, bool]
+
+# Streams live sessions in sweep order; NULLs sort first in SQLite, where -1 and '' sort in Python
+AUDIT_QUERY = """
+    SELECT date, course_id, COALESCE(assignment_id, -1), duration_minutes, COALESCE(notes, ''), id, 0
+    FROM study_sessions
+    WHERE {where}
+    ORDER BY date_day, course_id, assignment_id, duration_minutes, notes
+"""
+
+FETCH_SIZE = 10000
+
+
+def sweep_key(row: SessionRow) -> tuple:
+    return row[:5]
+
+
+def sweep_sessions(rows: Iterable[SessionRow], max_minutes: int = MINUTES_PER_DAY,
+                   drop_imported_duplicates: bool = False) -> Iterator[Dict[str, object]]:
+    """Find duplicate sessions and overfull days in one pass over rows sorted by ``sweep_key``.
+
+    Sorting puts identical sessions next to each other and groups every day,
+    so each row is only compared with the one before it and a running day
+    total is checked when the date changes. This is O(n) after the
+    O(n log n) sort, and memory does not depend on the number of sessions.
+    A duplicate yields ``{'kind': 'duplicate', ...}`` naming the first copy
+    in ``duplicate_of``; a day over ``max_minutes`` yields
+    ``{'kind': 'overfull_day', ...}``. With ``drop_imported_duplicates``,
+    imported duplicates are marked as dropped and left out of the day totals.
+    """
+    day = None
+    minutes = 0
+    sessions = 0
+    previous = None
+    first = None
+    for row in rows:
+        if row[0] != day:
+            if day is not None and minutes > max_minutes:
+                yield {'kind': 'overfull_day', 'date': day, 'minutes': minutes, 'sessions': sessions}
+            day = row[0]
+            minutes = 0
+            sessions = 0
+            previous = None
+
+        key = row[:5]
+        if key == previous:
+            dropped = drop_imported_duplicates and bool(row[6])
+            yield {
+                'kind': 'duplicate',
+                'date': row[0],
+                'course_id': row[1],
+                'duration_minutes': row[3],
+                'ref': row[5],
+                'imported': bool(row[6]),
+                'duplicate_of': first[5],
+                'duplicate_of_imported': bool(first[6]),
+                'dropped': dropped,
+            }
+            if dropped:
+                continue
+        else:
+            previous = key
+            first = row
+        minutes += row[3]
+        sessions += 1
+
+    if day is not None and minutes > max_minutes:
+        yield {'kind': 'overfull_day', 'date': day, 'minutes': minutes, 'sessions': sessions}
+
+
+def stream_sessions(cursor) -> Iterator[SessionRow]:
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def split_findings(findings: Iterable[Dict[str, object]]) -> Tuple[List[dict], List[dict]]:
+    duplicates = []
+    overfull_days = []
+    for finding in findings:
+        (duplicates if finding['kind'] == 'duplicate' else overfull_days).append(finding)
+    return duplicates, overfull_days
@@ -1,8 +1,31 @@
-from typing import List, Optional
-from studytracker.db import Database
-from datetime import datetime
+import csv
+import heapq
+import json
+import sys
+from typing import Dict, List, Optional
+from studytracker.db import Database, Record, DELETE_BATCH_SIZE
+from studytracker.metrics import instrumented
+from studytracker.dates import canonical_date, day_range, to_epoch_day
+from studytracker.session_audit import (
+    AUDIT_QUERY,
+    MINUTES_PER_DAY,
+    split_findings,
+    stream_sessions,
+    sweep_key,
+    sweep_sessions,
+)
+from studytracker.archive import assignment_source, session_source
+from datetime import datetime, timedelta
 
 
+# period -> first day of the period of a study_daily_rollup day, as in the rollup views
+TREND_PERIODS = {
+    'week': "date((r.day - ((r.day + 3) % 7 + 7) % 7) * 86400, 'unixepoch')",
+    'month': "date(r.day * 86400, 'unixepoch', 'start of month')",
+}
+
+
+@instrumented
 class StudySessionService:
     
     def __init__(self, db: Database):
@@ -14,9 +37,9 @@ class StudySessionService:
         if duration_minutes <= 0:
             raise ValueError("Duration must be a positive number of minutes")
         
-        # Validate date format
+        # Validate date format; 2025-3-1 is stored as 2025-03-01
         try:
-            datetime.strptime(date, '%Y-%m-%d')
+            date = canonical_date(date)
         except ValueError:
             raise ValueError("Date must be in YYYY-MM-DD format")
         
@@ -33,6 +56,16 @@ class StudySessionService:
             if not assignment:
                 raise ValueError(f"Assignment with ID {assignment_id} does not exist")
         
+        # A day has 24 hours however many courses share it; like import_sessions and
+        # audit_sessions this counts the live sessions
+        day_total = self.db.fetch_one(
+            "SELECT COALESCE(SUM(duration_minutes), 0) FROM study_sessions WHERE date_day = ?",
+            (to_epoch_day(date),)
+        )[0]
+        if day_total + duration_minutes > MINUTES_PER_DAY:
+            raise ValueError(f"Sessions on {date} would add up to {day_total + duration_minutes} minutes, "
+                             f"more than 24 hours")
+        
         query = """
             INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes)
             VALUES (?, ?, ?, ?, ?)
@@ -42,7 +75,7 @@ class StudySessionService:
         print(f"Study session added successfully! ID: {session_id}")
         return session_id
     
-    def get_all_sessions(self) -> List[dict]:
+    def get_all_sessions(self) -> List[Record]:
         query = """
             SELECT 
                 s.id,
@@ -58,24 +91,9 @@ class StudySessionService:
             LEFT JOIN assignments a ON s.assignment_id = a.id
             ORDER BY s.date DESC
         """
-        rows = self.db.fetch_all(query)
-        
-        sessions = []
-        for row in rows:
-            sessions.append({
-                'id': row['id'],
-                'course_id': row['course_id'],
-                'course_name': row['course_name'],
-                'assignment_id': row['assignment_id'],
-                'assignment_title': row['assignment_title'],
-                'date': row['date'],
-                'duration_minutes': row['duration_minutes'],
-                'notes': row['notes']
-            })
-        
-        return sessions
+        return self.db.fetch_records(query)
     
-    def get_sessions_by_course(self, course_id: int) -> List[dict]:
+    def get_sessions_by_course(self, course_id: int) -> List[Record]:
         query = """
             SELECT 
                 s.id,
@@ -90,50 +108,166 @@ class StudySessionService:
             WHERE s.course_id = ?
             ORDER BY s.date DESC
         """
-        rows = self.db.fetch_all(query, (course_id,))
-        
-        sessions = []
-        for row in rows:
-            sessions.append({
-                'id': row['id'],
-                'course_id': row['course_id'],
-                'assignment_id': row['assignment_id'],
-                'assignment_title': row['assignment_title'],
-                'date': row['date'],
-                'duration_minutes': row['duration_minutes'],
-                'notes': row['notes']
-            })
-        
-        return sessions
+        return self.db.fetch_records(query, (course_id,))
     
-    def get_study_summary_by_course(self) -> List[dict]:
-        """Get total study time per course"""
+    def get_sessions_between(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                             course_id: Optional[int] = None) -> List[Record]:
+        """Get sessions in an inclusive YYYY-MM-DD window; either end may be open.
+
+        Archived sessions are included when the window reaches into an archived term.
+        """
+        start_day, end_day = day_range(start_date, end_date)
+        source, archives = session_source(self.db, start_day, end_day)
+        query = f"""
+            SELECT 
+                s.id,
+                s.course_id,
+                c.name as course_name,
+                s.assignment_id,
+                s.assignment_title,
+                s.date,
+                s.date_day,
+                s.duration_minutes,
+                s.notes
+            FROM {source} s
+            JOIN courses c ON s.course_id = c.id
+            WHERE s.date_day BETWEEN ? AND ?
+        """
+        params = [start_day, end_day]
+        if course_id is not None:
+            query += " AND s.course_id = ?"
+            params.append(course_id)
+        query += " ORDER BY s.date_day DESC"
+        return self.db.fetch_records(query, tuple(params), archives)
+    
+    def get_study_summary_by_course(self) -> List[Record]:
+        """Get total study time per course from the daily rollups, archived sessions included"""
         query = """
             SELECT 
-                c.id,
-                c.name,
-                COUNT(s.id) as session_count,
-                SUM(s.duration_minutes) as total_minutes,
-                ROUND(SUM(s.duration_minutes) / 60.0, 2) as total_hours
+                c.id as course_id,
+                c.name as course_name,
+                SUM(r.session_count) as session_count,
+                SUM(r.total_minutes) as total_minutes,
+                ROUND(SUM(r.total_minutes) / 60.0, 2) as total_hours
             FROM courses c
-            LEFT JOIN study_sessions s ON c.id = s.course_id
+            JOIN study_daily_rollup r ON c.id = r.course_id
             GROUP BY c.id, c.name
             HAVING total_minutes > 0
             ORDER BY total_minutes DESC
         """
-        rows = self.db.fetch_all(query)
-        
-        summaries = []
-        for row in rows:
-            summaries.append({
-                'course_id': row['id'],
-                'course_name': row['name'],
-                'session_count': row['session_count'],
-                'total_minutes': row['total_minutes'],
-                'total_hours': row['total_hours']
-            })
-        
-        return summaries
+        return self.db.fetch_records(query)
+    
+    def get_study_time_by_assignment(self, assignment_id: Optional[int] = None,
+                                     course_id: Optional[int] = None,
+                                     graded_only: bool = False) -> List[Record]:
+        """Get minutes studied per assignment next to the grade it received.
+
+        Each assignment's live sessions are summed with a range lookup on the
+        assignment index, so one assignment costs the same at any number of
+        sessions. Assignments and sessions moved to archive files are
+        included; the archived sessions are summed once per assignment_id.
+        Assignments without sessions are included with zero minutes.
+        """
+        assignments, archives = assignment_source(self.db)
+        archived_count = archived_minutes = archived_join = ""
+        if archives:
+            archived_sessions = " UNION ALL ".join(
+                f"SELECT assignment_id, duration_minutes FROM {alias}.study_sessions" for alias in archives
+            )
+            archived_count = " + COALESCE(x.session_count, 0)"
+            archived_minutes = " + COALESCE(x.total_minutes, 0)"
+            archived_join = f"""
+            LEFT JOIN (
+                SELECT assignment_id, COUNT(*) AS session_count, SUM(duration_minutes) AS total_minutes
+                FROM ({archived_sessions})
+                WHERE assignment_id IS NOT NULL
+                GROUP BY assignment_id
+            ) x ON x.assignment_id = a.id"""
+        query = f"""
+            SELECT 
+                a.id as assignment_id,
+                a.title,
+                a.course_id,
+                c.name as course_name,
+                a.due_date,
+                a.grade,
+                (SELECT COUNT(*) FROM main.study_sessions s
+                 WHERE s.assignment_id = a.id){archived_count} as session_count,
+                (SELECT COALESCE(SUM(s.duration_minutes), 0) FROM main.study_sessions s
+                 WHERE s.assignment_id = a.id){archived_minutes} as total_minutes
+            FROM {assignments} a
+            JOIN courses c ON a.course_id = c.id{archived_join}
+            WHERE 1 = 1
+        """
+        params = []
+        if assignment_id is not None:
+            query += " AND a.id = ?"
+            params.append(assignment_id)
+        if course_id is not None:
+            query += " AND a.course_id = ?"
+            params.append(course_id)
+        if graded_only:
+            query += " AND a.grade IS NOT NULL"
+        query = f"""
+            SELECT *, ROUND(total_minutes / 60.0, 2) as total_hours
+            FROM ({query})
+            ORDER BY due_date, assignment_id
+        """
+        return self.db.fetch_records(query, tuple(params), archives)
+    
+    def get_study_trend(self, period: str = 'week', start_date: Optional[str] = None,
+                        end_date: Optional[str] = None, course_id: Optional[int] = None) -> List[Record]:
+        """Get study time per course and week or month from the daily rollups.
+
+        Reads the per-day rollups instead of the sessions, so the cost depends on
+        the number of days and courses, not on the number of sessions. The date
+        window is widened to whole periods and applied to ``day`` before
+        grouping, so only those days are read. Periods overlapping the window
+        are returned whole.
+        """
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Period must be one of: {', '.join(TREND_PERIODS)}")
+        # Validates both dates and their order
+        start_day, end_day = day_range(start_date, end_date)
+        if start_date:
+            start_day = to_epoch_day(self._period_start(period, start_date))
+        if end_date:
+            end_day = to_epoch_day(self._next_period_start(period, end_date)) - 1
+        
+        query = f"""
+            SELECT 
+                r.course_id,
+                c.name as course_name,
+                {TREND_PERIODS[period]} as period_start,
+                SUM(r.session_count) as session_count,
+                SUM(r.total_minutes) as total_minutes,
+                ROUND(SUM(r.total_minutes) / 60.0, 2) as total_hours
+            FROM study_daily_rollup r
+            JOIN courses c ON r.course_id = c.id
+            WHERE r.day BETWEEN ? AND ?
+        """
+        params = [start_day, end_day]
+        if course_id is not None:
+            query += " AND r.course_id = ?"
+            params.append(course_id)
+        query += " GROUP BY r.course_id, period_start ORDER BY period_start, c.name"
+        return self.db.fetch_records(query, tuple(params))
+    
+    def _period_start(self, period: str, date: str) -> str:
+        day = datetime.strptime(date, '%Y-%m-%d').date()
+        if period == 'week':
+            day -= timedelta(days=day.weekday())
+        else:
+            day = day.replace(day=1)
+        return day.isoformat()
+    
+    def _next_period_start(self, period: str, date: str) -> str:
+        day = datetime.strptime(self._period_start(period, date), '%Y-%m-%d').date()
+        if period == 'week':
+            day += timedelta(days=7)
+        else:
+            day = (day + timedelta(days=31)).replace(day=1)
+        return day.isoformat()
     
     def delete_session(self, session_id: int) -> bool:
         query = "DELETE FROM study_sessions WHERE id = ?"
@@ -145,3 +279,140 @@ class StudySessionService:
         else:
             print(f"Study session {session_id} not found.")
             return False
+    
+    def purge_sessions(self, before: Optional[str] = None, course_id: Optional[int] = None,
+                       batch_size: int = DELETE_BATCH_SIZE, show_progress: bool = False) -> int:
+        """Delete live sessions dated before ``before`` and/or of one course, in batches"""
+        if before is None and course_id is None:
+            raise ValueError("Give a date, a course or both to purge sessions")
+        
+        conditions = []
+        params = []
+        if course_id is not None:
+            conditions.append("course_id = ?")
+            params.append(course_id)
+        if before is not None:
+            # Compared as a day number: an unpadded 2025-3-1 would sort after
+            # 2025-10-10 as text. Every batch is a range scan on the date_day index
+            conditions.append("date_day < ?")
+            params.append(to_epoch_day(before))
+        where = " AND ".join(conditions)
+        
+        total = self.db.fetch_one(f"SELECT COUNT(*) FROM study_sessions WHERE {where}", tuple(params))[0]
+        
+        def progress(done: int):
+            if show_progress:
+                print(f"\rDeleted {done}/{total} sessions", end='', file=sys.stderr, flush=True)
+        
+        deleted = self.db.delete_in_batches('study_sessions', where, tuple(params), batch_size, progress)
+        if show_progress and deleted:
+            print(file=sys.stderr)
+        print(f"Purged {deleted} study session(s)")
+        return deleted
+    
+    def _sweep_cursor(self, where: str, params: tuple):
+        cursor = self.db.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(AUDIT_QUERY.format(where=where), params)
+        return cursor
+    
+    def audit_sessions(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       max_minutes_per_day: int = MINUTES_PER_DAY) -> Dict[str, object]:
+        """Find duplicate sessions and days over ``max_minutes_per_day`` with one sorted pass.
+
+        SQLite streams the live sessions in date order from the date index and
+        sorts only within each day, so memory stays flat however many sessions
+        there are (see ``session_audit.sweep_sessions``).
+        """
+        start_day, end_day = day_range(start_date, end_date)
+        cursor = self._sweep_cursor("date_day BETWEEN ? AND ?", (start_day, end_day))
+        duplicates, overfull_days = split_findings(
+            sweep_sessions(stream_sessions(cursor), max_minutes_per_day)
+        )
+        cursor.close()
+        return {
+            'duplicates': duplicates,
+            'duplicate_minutes': sum(d['duration_minutes'] for d in duplicates),
+            'overfull_days': overfull_days,
+        }
+    
+    def import_sessions(self, filename: str, skip_duplicates: bool = False, allow_overfull: bool = False,
+                        max_minutes_per_day: int = MINUTES_PER_DAY) -> Dict[str, object]:
+        """Bulk add sessions from a CSV (course_id,date,duration_minutes[,assignment_id,notes]) or JSONL file.
+
+        The file is sorted and swept together with the live sessions on the
+        same days, so copies of sessions already stored or repeated in the
+        file, and days that would exceed ``max_minutes_per_day``, are found
+        without pairwise comparisons. Either rejects the whole file unless
+        ``skip_duplicates`` drops the copies or ``allow_overfull`` accepts the
+        days; everything else is inserted in one transaction.
+        """
+        is_jsonl = filename.lower().endswith(('.jsonl', '.ndjson'))
+        rows = []
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            # Errors name the line in the file, counting blank lines
+            if is_jsonl:
+                records = ((line_number, line) for line_number, line in enumerate(f, start=1) if line.strip())
+            else:
+                reader = csv.DictReader(f)
+                records = ((reader.line_num, record) for record in reader)
+            for line_number, record in records:
+                try:
+                    if is_jsonl:
+                        record = json.loads(record)
+                    # Dates are stored in canonical YYYY-MM-DD form so they sort as text
+                    date = canonical_date(record['date'])
+                    duration = int(record['duration_minutes'])
+                    assignment_id = record.get('assignment_id')
+                    assignment_id = int(assignment_id) if assignment_id not in (None, '') else -1
+                    if duration <= 0:
+                        raise ValueError
+                    rows.append((date, int(record['course_id']), assignment_id, duration,
+                                 record.get('notes') or '', line_number, 1))
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"{filename}, line {line_number}: expected course_id, a YYYY-MM-DD date "
+                                     f"and a positive duration_minutes")
+        if not rows:
+            return {'imported': 0, 'duplicates': [], 'overfull_days': []}
+        
+        for table, column, ids in (('courses', 'course_id', {row[1] for row in rows}),
+                                   ('assignments', 'assignment_id', {row[2] for row in rows} - {-1})):
+            missing = self.db.fetch_all(
+                f"SELECT value FROM json_each(?) WHERE value NOT IN (SELECT id FROM {table}) ORDER BY value",
+                (json.dumps(sorted(ids)),)
+            )
+            if missing:
+                raise ValueError(f"Unknown {column}(s): {', '.join(str(row[0]) for row in missing[:10])}")
+        
+        rows.sort(key=sweep_key)
+        days = sorted({to_epoch_day(row[0]) for row in rows})
+        cursor = self._sweep_cursor("date_day IN (SELECT value FROM json_each(?))", (json.dumps(days),))
+        # heapq.merge is stable, so a stored session comes before an identical imported one
+        merged = heapq.merge(stream_sessions(cursor), rows, key=sweep_key)
+        duplicates, overfull_days = split_findings(
+            sweep_sessions(merged, max_minutes_per_day, drop_imported_duplicates=skip_duplicates)
+        )
+        cursor.close()
+        duplicates = [d for d in duplicates if d['imported']]
+        # Days are only read for the file's dates, so every overfull day involves imported sessions
+        report = {'imported': 0, 'duplicates': duplicates, 'overfull_days': overfull_days}
+        
+        if (duplicates and not skip_duplicates) or (overfull_days and not allow_overfull):
+            print(f"Rejected {filename}: {len(duplicates)} duplicate session(s), "
+                  f"{len(overfull_days)} day(s) over {max_minutes_per_day} minutes; nothing was imported")
+            return report
+        
+        dropped = {d['ref'] for d in duplicates if d['dropped']}
+        inserts = [(row[1], None if row[2] == -1 else row[2], row[0], row[3], row[4] or None)
+                   for row in sorted(rows, key=lambda row: row[5]) if row[5] not in dropped]
+        with self.db.transaction():
+            self.db.executemany("""
+                INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes)
+                VALUES (?, ?, ?, ?, ?)
+            """, inserts)
+        
+        report['imported'] = len(inserts)
+        print(f"Imported {len(inserts)} study session(s)")
+        if dropped:
+            print(f"Skipped {len(dropped)} duplicate session(s)")
+        return report
@@ -0,0 +1,166 @@
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from studytracker.dashboard import write_dashboard
+from studytracker.db import Database
+from studytracker.plotting import (
+    plot_assignment_timeline,
+    plot_average_grade_per_course,
+    plot_study_efficiency,
+    plot_study_time_per_course,
+)
+from studytracker.reports import ReportGenerator
+
+
+ALL_TABLES = frozenset({'courses', 'assignments', 'study_sessions'})
+
+# name -> (file name, tables whose change log entries make it stale, writer(db, path)).
+# Rollups and grade totals are maintained by triggers on these three tables,
+# so the base tables stand in for them.
+WATCHED_ARTIFACTS: Dict[str, Tuple[str, FrozenSet[str], Callable[[Database, str], object]]] = {
+    'courses-csv': ('courses.csv', frozenset({'courses'}),
+                    lambda db, path: ReportGenerator(db).export_courses_to_csv(path)),
+    'assignments-csv': ('assignments.csv', frozenset({'courses', 'assignments'}),
+                        lambda db, path: ReportGenerator(db).export_assignments_to_csv(path)),
+    'full-csv': ('full_report.csv', frozenset({'courses', 'assignments'}),
+                 lambda db, path: ReportGenerator(db).export_full_report_to_csv(path)),
+    'study-by-assignment-csv': ('study_by_assignment.csv', ALL_TABLES,
+                                lambda db, path: ReportGenerator(db).export_study_time_by_assignment_to_csv(path)),
+    'grades-plot': ('grades.png', frozenset({'courses', 'assignments'}), plot_average_grade_per_course),
+    'timeline-plot': ('timeline.png', frozenset({'courses', 'assignments'}), plot_assignment_timeline),
+    'study-time-plot': ('study_time.png', frozenset({'courses', 'study_sessions'}), plot_study_time_per_course),
+    'efficiency-plot': ('study_efficiency.png', ALL_TABLES, plot_study_efficiency),
+    'dashboard': ('dashboard.html', ALL_TABLES, write_dashboard),
+}
+
+
+class ArtifactWatcher:
+    """Regenerate exports and plots when, and only when, their tables change.
+
+    The watcher keeps one connection open and polls ``PRAGMA data_version``,
+    which only reads a counter from the database header and changes when
+    another connection commits. After a change it waits until the writers
+    have been quiet for ``debounce`` seconds (but never longer than
+    ``max_delay``), reads the change log past the last sequence it handled
+    to find the touched tables, and rewrites just the artifacts that read
+    them.
+    """
+
+    def __init__(self, db: Database, output_dir: str, artifacts: Optional[List[str]] = None,
+                 interval: float = 1.0, debounce: float = 2.0, max_delay: float = 30.0):
+        for name in artifacts or ():
+            if name not in WATCHED_ARTIFACTS:
+                raise ValueError(f"Unknown artifact: {name}")
+        if interval <= 0:
+            raise ValueError("interval must be a positive number")
+        if debounce < 0 or max_delay < debounce:
+            raise ValueError("debounce must be between 0 and max_delay")
+        self.db = db
+        self.output_dir = output_dir
+        self.artifacts = list(artifacts or WATCHED_ARTIFACTS)
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.seq = 0
+        self._data_version: Optional[int] = None
+
+    def data_version(self) -> int:
+        return self.db.fetch_one("PRAGMA data_version")[0]
+
+    def poll(self) -> bool:
+        """True when another connection has committed since the last poll"""
+        version = self.data_version()
+        changed = self._data_version is not None and version != self._data_version
+        self._data_version = version
+        return changed
+
+    def _last_seq(self) -> int:
+        row = self.db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        return row['seq'] if row else 0
+
+    def changed_tables(self) -> Tuple[Optional[Set[str]], int]:
+        """Tables touched after ``self.seq`` and the sequence number they were read up to.
+
+        None means the change log was pruned past ``self.seq`` and everything
+        has to be regenerated.
+        """
+        with self.db.read_transaction():
+            last = self._last_seq()
+            first = self.db.fetch_one("SELECT MIN(seq) AS seq FROM change_log")['seq']
+            if last > self.seq and (first is None or first > self.seq + 1):
+                return None, last
+            rows = self.db.fetch_all(
+                "SELECT DISTINCT table_name FROM change_log WHERE seq > ? AND seq <= ?", (self.seq, last)
+            )
+        return {row['table_name'] for row in rows}, last
+
+    def stale_artifacts(self, tables: Optional[Set[str]]) -> List[str]:
+        if tables is None:
+            return list(self.artifacts)
+        return [name for name in self.artifacts if WATCHED_ARTIFACTS[name][1] & tables]
+
+    def regenerate(self, names: List[str]) -> Dict[str, float]:
+        """Rewrite the named artifacts; returns seconds spent per artifact that succeeded"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        timings = {}
+        for name in names:
+            filename, _, writer = WATCHED_ARTIFACTS[name]
+            start = time.perf_counter()
+            try:
+                writer(self.db, os.path.join(self.output_dir, filename))
+            except Exception as e:
+                # One broken artifact must not stop the others or the watcher
+                print(f"Error regenerating {name}: {e}")
+                continue
+            timings[name] = round(time.perf_counter() - start, 3)
+        return timings
+
+    def _wait_until_quiet(self):
+        started = time.monotonic()
+        quiet_since = started
+        while True:
+            now = time.monotonic()
+            if now - quiet_since >= self.debounce or now - started >= self.max_delay:
+                return
+            time.sleep(min(self.interval, self.debounce))
+            if self.poll():
+                quiet_since = time.monotonic()
+
+    def run_once(self, tables: Optional[Set[str]] = None, seq: Optional[int] = None) -> List[str]:
+        """Regenerate what ``tables`` make stale (everything for None) and advance to ``seq``"""
+        names = self.stale_artifacts(tables)
+        if names:
+            timings = self.regenerate(names)
+            stamp = datetime.now().strftime('%H:%M:%S')
+            reason = f"{', '.join(sorted(tables))} changed" if tables is not None else "full rebuild"
+            print(f"[{stamp}] {reason}: regenerated {len(timings)}/{len(names)} artifact(s) "
+                  f"in {sum(timings.values()):.2f}s")
+        if seq is not None:
+            self.seq = seq
+        return names
+
+    def run(self, initial: bool = True, max_rounds: Optional[int] = None):
+        """Watch until interrupted, or for ``max_rounds`` regenerations"""
+        self.poll()
+        _, seq = self.changed_tables()
+        if initial:
+            self.run_once(None, seq)
+        else:
+            self.seq = seq
+
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            time.sleep(self.interval)
+            if not self.poll():
+                continue
+            self._wait_until_quiet()
+            tables, seq = self.changed_tables()
+            # Commits that did not touch the change log (a rebuild of grade totals,
+            # a watermark) leave every artifact as it was
+            if tables is None or tables:
+                self.run_once(tables, seq)
+                rounds += 1
+            else:
+                self.seq = seq
@@ -0,0 +1,15 @@
+"""Migrated temporary databases shared by the tests."""
+import os
+from studytracker.db import Database
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_database(path: str, **options) -> Database:
+    """Connect to a new database at ``path`` with the schema and every migration applied"""
+    db = Database(path, **options)
+    db.connect()
+    db.initialize_schema(os.path.join(ROOT, 'database', 'schema.sql'))
+    db.apply_migrations(os.path.join(ROOT, 'database', 'migrations'))
+    return db
@@ -0,0 +1,148 @@
+"""Archiving old terms into per-term files.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from studytracker import archive
+from studytracker.dashboard import build_dashboard_data
+from studytracker.reports import ReportGenerator
+from studytracker.study_session_service import StudySessionService
+from _db import create_database
+
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.tmpdir, 'archive')
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 5)])
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)", [
+            (1, 'Spring quiz', '2024-03-10', 70.0),        # 1: archived, 2024-spring
+            (2, 'Fall lab', '2024-09-20', 90.0),           # 2: archived, 2024-fall
+            (2, 'Fall essay', '2024-11-02', None),         # 3: archived, ungraded
+            (1, 'Fall project', '2024-12-01', 85.0),       # 4: stays, a 2025 session points to it
+            (1, 'Midterm', '2025-03-15', 60.0),            # 5: live
+            (2, 'Final', '2025-06-01', 95.0),              # 6: live
+        ])
+        connection.executemany(
+            "INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes) VALUES (?, ?, ?, ?, ?)", [
+                (1, 1, '2024-03-01', 60, 'spring review'),
+                (2, None, '2024-05-05', 45, None),
+                (2, 2, '2024-09-15', 90, 'lab prep'),
+                (1, 4, '2024-11-20', 30, None),
+                (1, 4, '2025-01-10', 120, 'project'),
+                (2, 6, '2025-05-20', 75, None),
+            ]
+        )
+        connection.commit()
+        self.reports = ReportGenerator(self.db)
+        self.sessions = StudySessionService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def count(self, table, path=None):
+        if path is None:
+            return self.db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            connection.close()
+
+    def study_totals(self):
+        return [tuple(row) for row in self.sessions.get_study_summary_by_course()]
+
+    def test_archive_moves_rows_and_keeps_totals(self):
+        final_grade = self.reports.calculate_weighted_final_grade()
+        study_totals = self.study_totals()
+        trend = [tuple(row) for row in self.sessions.get_study_trend('month')]
+
+        report = archive.archive_before(self.db, '2025-01-01', self.archive_dir)
+
+        self.assertEqual(list(report), ['2024-spring', '2024-fall'])
+        self.assertEqual((report['2024-spring']['sessions'], report['2024-spring']['assignments']), (2, 1))
+        self.assertEqual((report['2024-fall']['sessions'], report['2024-fall']['assignments']), (2, 2))
+        self.assertEqual(self.count('study_sessions'), 2)
+        self.assertEqual(self.count('assignments'), 3)
+        self.assertEqual(self.count('study_sessions', report['2024-spring']['path']), 2)
+        self.assertEqual(self.count('assignments', report['2024-spring']['path']), 1)
+        self.assertEqual(self.count('study_sessions', report['2024-fall']['path']), 2)
+        self.assertEqual(self.count('assignments', report['2024-fall']['path']), 2)
+        # The assignment a live session points to is not archived
+        self.assertIsNotNone(self.db.fetch_one("SELECT id FROM assignments WHERE id = 4"))
+
+        self.assertEqual(self.reports.calculate_weighted_final_grade(), final_grade)
+        self.assertEqual(self.reports.recalculate_weighted_final_grade(), final_grade)
+        self.assertTrue(self.reports.verify_grade_totals()['ok'])
+        self.assertEqual(self.study_totals(), study_totals)
+        self.assertEqual([tuple(row) for row in self.sessions.get_study_trend('month')], trend)
+
+        # Archived sessions are still found by date
+        rows = self.sessions.get_sessions_between('2024-01-01', '2024-12-31')
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 2, 3, 4])
+        self.assertEqual({row['assignment_title'] for row in rows if row['id'] == 1}, {'Spring quiz'})
+
+    def test_study_time_by_assignment_includes_archived_rows(self):
+        by_assignment = [tuple(row) for row in self.sessions.get_study_time_by_assignment()]
+        archive.archive_before(self.db, '2025-01-01', self.archive_dir)
+        self.assertEqual([tuple(row) for row in self.sessions.get_study_time_by_assignment()], by_assignment)
+        # A live assignment keeps the minutes of its archived sessions
+        row = self.sessions.get_study_time_by_assignment(assignment_id=4)[0]
+        self.assertEqual((row['session_count'], row['total_minutes']), (2, 150))
+        rows = self.sessions.get_study_time_by_assignment(course_id=2, graded_only=True)
+        self.assertEqual([(row['title'], row['total_minutes']) for row in rows],
+                         [('Fall lab', 90), ('Final', 75)])
+
+    def test_dashboard_summary_counts_archived_rows(self):
+        summary = build_dashboard_data(self.db)['summary']
+        self.assertEqual((summary['assignments'], summary['graded']), (6, 5))
+        archive.archive_before(self.db, '2025-01-01', self.archive_dir)
+        self.assertEqual(build_dashboard_data(self.db)['summary'], summary)
+
+    def test_archived_rows_are_logged_as_archive(self):
+        before = self.db.fetch_one("SELECT MAX(seq) FROM change_log")[0]
+        archive.archive_before(self.db, '2025-01-01', self.archive_dir)
+        rows = self.db.fetch_all(
+            "SELECT table_name, row_id, operation FROM change_log WHERE seq > ? ORDER BY seq", (before,)
+        )
+        self.assertEqual({row['operation'] for row in rows}, {'archive'})
+        self.assertEqual(sorted((row['table_name'], row['row_id']) for row in rows),
+                         [('assignments', 1), ('assignments', 2), ('assignments', 3),
+                          ('study_sessions', 1), ('study_sessions', 2), ('study_sessions', 3),
+                          ('study_sessions', 4)])
+
+        # An ordinary delete afterwards is still a delete
+        self.sessions.delete_session(6)
+        last = self.db.fetch_one("SELECT operation FROM change_log ORDER BY seq DESC LIMIT 1")
+        self.assertEqual(last['operation'], 'delete')
+
+    def test_archive_twice_adds_to_the_same_files(self):
+        archive.archive_before(self.db, '2024-07-01', self.archive_dir)
+        final_grade = self.reports.calculate_weighted_final_grade()
+        report = archive.archive_before(self.db, '2025-01-01', self.archive_dir)
+
+        self.assertEqual(list(report), ['2024-fall'])
+        partitions = self.db.fetch_all(
+            "SELECT term, session_count, assignment_count FROM archive_partitions ORDER BY first_day"
+        )
+        self.assertEqual([tuple(row) for row in partitions], [('2024-spring', 2, 1), ('2024-fall', 2, 2)])
+        self.assertEqual(self.reports.calculate_weighted_final_grade(), final_grade)
+        self.assertEqual(archive.archive_before(self.db, '2025-01-01', self.archive_dir), {})
+
+    def test_archive_rejects_bad_date(self):
+        with self.assertRaises(ValueError):
+            archive.archive_before(self.db, '2025-13-01', self.archive_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
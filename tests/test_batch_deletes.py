@@ -0,0 +1,115 @@
+"""Batched deletes: delete_in_batches, delete_course and purge_sessions.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from studytracker.course_service import CourseService
+from studytracker.study_session_service import StudySessionService
+from _db import create_database
+
+
+SESSION_DATES = ['2025-01-15', '2025-02-28', '2025-03-01', '2025-04-10', '2025-10-10']
+
+
+class BatchDeleteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'deletes.db'))
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 4)])
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+                               [(course_id, f"Homework {i}", '2025-05-01', 80 + i)
+                                for course_id in (1, 2) for i in range(4)])
+        connection.executemany(
+            "INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes) VALUES (?, ?, ?, ?)",
+            [(course_id, None, date, 60) for course_id in (1, 2) for date in SESSION_DATES]
+        )
+        connection.commit()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def session_dates(self, course_id):
+        rows = self.db.fetch_all("SELECT date FROM study_sessions WHERE course_id = ? ORDER BY date", (course_id,))
+        return [row['date'] for row in rows]
+
+    def test_delete_in_batches_reports_every_batch(self):
+        done = []
+        deleted = self.db.delete_in_batches('study_sessions', "course_id = ?", (1,), 2, done.append)
+        self.assertEqual(deleted, 5)
+        self.assertEqual(done, [2, 4, 5])
+        self.assertEqual(self.session_dates(1), [])
+        self.assertEqual(self.session_dates(2), SESSION_DATES)
+
+    def test_delete_in_batches_exact_multiple_of_batch_size(self):
+        done = []
+        deleted = self.db.delete_in_batches('assignments', "course_id = ?", (2,), 2, done.append)
+        self.assertEqual(deleted, 4)
+        self.assertEqual(done, [2, 4])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM assignments WHERE course_id = 1")[0], 4)
+
+    def test_delete_in_batches_without_matches(self):
+        done = []
+        self.assertEqual(self.db.delete_in_batches('study_sessions', "course_id = ?", (99,), 2, done.append), 0)
+        self.assertEqual(done, [])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM study_sessions")[0], 10)
+
+    def test_delete_in_batches_rejects_bad_batch_size(self):
+        with self.assertRaises(ValueError):
+            self.db.delete_in_batches('study_sessions', "course_id = ?", (1,), 0)
+
+    def test_delete_course_keeps_other_courses(self):
+        self.assertTrue(CourseService(self.db).delete_course(1, batch_size=3))
+        self.assertIsNone(self.db.fetch_one("SELECT id FROM courses WHERE id = 1"))
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM assignments WHERE course_id = 1")[0], 0)
+        self.assertEqual(self.session_dates(1), [])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM assignments WHERE course_id = 2")[0], 4)
+        self.assertEqual(self.session_dates(2), SESSION_DATES)
+        # The rollup and grade totals follow the batched deletes
+        self.assertIsNone(self.db.fetch_one("SELECT * FROM study_daily_rollup WHERE course_id = 1"))
+        self.assertIsNone(self.db.fetch_one("SELECT * FROM course_grade_totals WHERE course_id = 1"))
+
+    def test_delete_unknown_course(self):
+        self.assertFalse(CourseService(self.db).delete_course(99))
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM study_sessions")[0], 10)
+
+    def test_purge_before_date(self):
+        deleted = StudySessionService(self.db).purge_sessions(before='2025-03-01', batch_size=1)
+        self.assertEqual(deleted, 4)
+        for course_id in (1, 2):
+            self.assertEqual(self.session_dates(course_id), ['2025-03-01', '2025-04-10', '2025-10-10'])
+
+    def test_purge_before_unpadded_date(self):
+        # As text, 2025-10-10 sorts before 2025-3-1
+        deleted = StudySessionService(self.db).purge_sessions(before='2025-3-1')
+        self.assertEqual(deleted, 4)
+        for course_id in (1, 2):
+            self.assertEqual(self.session_dates(course_id), ['2025-03-01', '2025-04-10', '2025-10-10'])
+
+    def test_purge_course_and_date(self):
+        deleted = StudySessionService(self.db).purge_sessions(before='2025-04-10', course_id=2, batch_size=2)
+        self.assertEqual(deleted, 3)
+        self.assertEqual(self.session_dates(1), SESSION_DATES)
+        self.assertEqual(self.session_dates(2), ['2025-04-10', '2025-10-10'])
+
+    def test_purge_course(self):
+        self.assertEqual(StudySessionService(self.db).purge_sessions(course_id=1), 5)
+        self.assertEqual(self.session_dates(1), [])
+        self.assertEqual(self.session_dates(2), SESSION_DATES)
+
+    def test_purge_needs_a_filter(self):
+        with self.assertRaises(ValueError):
+            StudySessionService(self.db).purge_sessions()
+        with self.assertRaises(ValueError):
+            StudySessionService(self.db).purge_sessions(before='2025-02-30')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Delta exports from the change log.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from studytracker import maintenance
+from studytracker.reports import ReportGenerator
+from _db import create_database
+
+
+class DeltaExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 5)])
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+                               [(1, 'Quiz', '2025-03-10', 70.0), (2, 'Lab', '2025-04-20', None)])
+        connection.execute("INSERT INTO study_sessions (course_id, date, duration_minutes) VALUES (1, '2025-03-01', 60)")
+        connection.commit()
+        self.reports = ReportGenerator(self.db)
+        self.output = os.path.join(self.tmpdir, 'changes.ndjson')
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def export(self, since=None, tables=None, name='default'):
+        watermark = self.reports.export_changes(self.output, since, 'ndjson', tables, name)
+        with open(self.output, encoding='utf-8') as f:
+            return watermark, [json.loads(line) for line in f]
+
+    def test_first_export_has_every_row(self):
+        watermark, records = self.export()
+        self.assertEqual(watermark, 5)
+        self.assertEqual([(r['table'], r['id'], r['operation']) for r in records], [
+            ('courses', 1, 'insert'), ('courses', 2, 'insert'),
+            ('assignments', 1, 'insert'), ('assignments', 2, 'insert'),
+            ('study_sessions', 1, 'insert'),
+        ])
+        self.assertEqual(records[2]['data'], {'id': 1, 'course_id': 1, 'title': 'Quiz',
+                                              'due_date': '2025-03-10', 'grade': 70.0})
+        self.assertEqual(self.reports.get_export_watermark(), 5)
+
+    def test_delta_after_insert_update_delete(self):
+        self.export()
+        connection = self.db.connection
+        connection.execute("UPDATE assignments SET grade = 88.5 WHERE id = 2")
+        connection.execute("INSERT INTO courses (name, teacher, credits) VALUES ('Chemistry', 'Dr. C', 4)")
+        connection.execute("UPDATE courses SET credits = 6 WHERE id = 3")
+        connection.execute("DELETE FROM study_sessions WHERE id = 1")
+        connection.execute("INSERT INTO study_sessions (course_id, date, duration_minutes) VALUES (2, '2025-03-02', 30)")
+        connection.execute("DELETE FROM study_sessions WHERE id = 2")
+        connection.commit()
+
+        watermark, records = self.export()
+        # One record per row, with its latest operation and current values
+        self.assertEqual([(r['table'], r['id'], r['operation']) for r in records], [
+            ('assignments', 2, 'update'), ('courses', 3, 'update'),
+            ('study_sessions', 1, 'delete'), ('study_sessions', 2, 'delete'),
+        ])
+        self.assertEqual(records[0]['data']['grade'], 88.5)
+        self.assertEqual(records[1]['data']['credits'], 6)
+        self.assertIsNone(records[2]['data'])
+        self.assertEqual(watermark, self.db.fetch_one("SELECT MAX(seq) FROM change_log")[0])
+
+        # Nothing changed since the stored watermark
+        self.assertEqual(self.export(), (watermark, []))
+
+    def test_watermarks_are_per_name_and_tables_filter(self):
+        self.export(name='courses', tables=['courses'])
+        self.db.execute("UPDATE assignments SET grade = 50 WHERE id = 1")
+        self.db.execute("UPDATE courses SET name = 'Algebra I' WHERE id = 1")
+
+        _, records = self.export(name='courses', tables=['courses'])
+        self.assertEqual([(r['table'], r['id']) for r in records], [('courses', 1)])
+        _, records = self.export(name='full')
+        self.assertEqual(len(records), 5)
+
+    def test_csv_format(self):
+        output = os.path.join(self.tmpdir, 'changes.csv')
+        self.reports.export_changes(output, 0, 'csv', ['assignments'])
+        with open(output, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['seq', 'table', 'operation', 'id', 'data'])
+        self.assertEqual([row[1:4] for row in rows[1:]], [['assignments', 'insert', '1'],
+                                                          ['assignments', 'insert', '2']])
+        self.assertEqual(json.loads(rows[1][4])['title'], 'Quiz')
+
+    def test_pruned_log_falls_back_to_every_row(self):
+        self.export(name='courses', tables=['courses'])
+        self.db.execute("DELETE FROM study_sessions WHERE id = 1")
+        self.assertEqual(self.export(name='sessions', tables=['study_sessions'])[1][0]['operation'], 'delete')
+        # Pruning stops at the lowest watermark, so the 'full' name that never exported lost entries
+        self.assertEqual(maintenance.prune_change_log(self.db), 5)
+
+        watermark, records = self.export(name='full')
+        self.assertEqual(watermark, 6)
+        self.assertEqual({r['operation'] for r in records}, {'full'})
+        self.assertEqual([(r['table'], r['id']) for r in records], [
+            ('courses', 1), ('courses', 2), ('assignments', 1), ('assignments', 2),
+        ])
+        self.assertEqual(records[0]['data']['name'], 'Algebra')
+
+        # The next export is an ordinary delta again
+        self.db.execute("UPDATE courses SET credits = 4 WHERE id = 2")
+        _, records = self.export(name='full')
+        self.assertEqual([(r['table'], r['id'], r['operation']) for r in records], [('courses', 2, 'update')])
+
+    def test_maintain_only_prunes_on_request(self):
+        self.export(name='courses', tables=['courses'])
+        self.assertIsNone(maintenance.run_maintenance(self.db)['change_log_pruned'])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM change_log")[0], 5)
+
+    def test_rejects_bad_format_and_table(self):
+        with self.assertRaises(ValueError):
+            self.reports.export_changes(self.output, 0, 'excel')
+        with self.assertRaises(ValueError):
+            self.reports.export_changes(self.output, 0, 'csv', ['grades'])
+
+
+if __name__ == '__main__':
+    unittest.main()
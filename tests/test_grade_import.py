@@ -0,0 +1,103 @@
+"""Bulk grade updates: update_grades and import_grades.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from studytracker.assignment_service import AssignmentService
+from _db import create_database
+
+
+class GradeImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        connection = self.db.connection
+        connection.execute("INSERT INTO courses (name, teacher, credits) VALUES ('Algebra', 'Dr. A', 3)")
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+                               [(1, f"Homework {i}", '2025-03-10', None) for i in range(1, 5)])
+        connection.commit()
+        self.service = AssignmentService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def grades(self):
+        return [row['grade'] for row in self.db.fetch_all("SELECT grade FROM assignments ORDER BY id")]
+
+    def test_update_grades(self):
+        result = self.service.update_grades([(1, 95), (2, 80.5), (1, 90), (4, 0)])
+        self.assertEqual(result, {'updated': 3, 'missing_ids': []})
+        # The last grade for a repeated ID wins
+        self.assertEqual(self.grades(), [90.0, 80.5, None, 0.0])
+        self.assertEqual(self.service.update_grades([]), {'updated': 0, 'missing_ids': []})
+
+    def test_unknown_ids_are_reported_not_written(self):
+        result = self.service.update_grades([(2, 70), (9, 50), (7, 60), (9, 55)])
+        self.assertEqual(result, {'updated': 1, 'missing_ids': [7, 9]})
+        self.assertEqual(self.grades(), [None, 70.0, None, None])
+        self.assertIsNone(self.db.fetch_one("SELECT id FROM assignments WHERE id IN (7, 9)"))
+
+    def test_out_of_range_grade_rejects_the_batch(self):
+        for bad in (-1, 100.5, float('nan'), float('inf')):
+            with self.subTest(grade=bad):
+                with self.assertRaisesRegex(ValueError, 'not between 0 and 100'):
+                    self.service.update_grades([(1, 90), (2, bad)])
+                self.assertEqual(self.grades(), [None] * 4)
+        with self.assertRaises(ValueError):
+            self.service.update_grades([(1, 'A+')])
+
+    def test_import_csv_and_jsonl(self):
+        path = self.write('grades.csv', "assignment_id,grade\n1,88\n3,72.5\n8,60\n")
+        self.assertEqual(self.service.import_grades(path), {'updated': 2, 'missing_ids': [8]})
+        path = self.write('grades.jsonl', json.dumps({'assignment_id': 2, 'grade': 64}) + "\n\n"
+                          + json.dumps({'assignment_id': 3, 'grade': 75}) + "\n")
+        self.assertEqual(self.service.import_grades(path), {'updated': 2, 'missing_ids': []})
+        self.assertEqual(self.grades(), [88.0, 64.0, 75.0, None])
+
+    def test_import_errors_write_nothing(self):
+        cases = [
+            ('grades.csv', "assignment_id,grade\n1,88\n\n2,excellent\n", r'grades\.csv, line 4:'),
+            ('grades.csv', "assignment_id,grade\n1,88\n2,101\n", 'not between 0 and 100'),
+            ('grades.jsonl', json.dumps({'assignment_id': 1, 'grade': 88}) + "\n"
+             + json.dumps({'assignment_id': 2}) + "\n", r'grades\.jsonl, line 2:'),
+            ('grades.jsonl', json.dumps({'assignment_id': 1, 'grade': 88}) + "\n{\n", r'grades\.jsonl, line 2:'),
+            ('grades.jsonl', json.dumps({'assignment_id': 1, 'grade': 88}) + "\n"
+             + json.dumps({'assignment_id': 2, 'grade': -5}) + "\n", 'not between 0 and 100'),
+        ]
+        for name, text, message in cases:
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, message):
+                    self.service.import_grades(self.write(name, text))
+                self.assertEqual(self.grades(), [None] * 4)
+
+    def test_failed_write_rolls_back_the_whole_file(self):
+        # A failure part way through the executemany must undo the rows before it
+        self.db.execute("""
+            CREATE TRIGGER refuse_grade BEFORE UPDATE OF grade ON assignments WHEN NEW.id = 3
+            BEGIN SELECT RAISE(ABORT, 'grade is locked'); END
+        """)
+        for name, text in (('grades.csv', "assignment_id,grade\n1,88\n2,64\n3,75\n4,90\n"),
+                           ('grades.jsonl', "".join(json.dumps({'assignment_id': i, 'grade': 80}) + "\n"
+                                                    for i in range(1, 5)))):
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(ValueError, 'grade is locked'):
+                    self.service.import_grades(self.write(name, text))
+                self.assertEqual(self.grades(), [None] * 4)
+                self.assertFalse(self.db.connection.in_transaction)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Running per-course grade totals and the transaction helpers.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from studytracker import archive
+from studytracker.assignment_service import AssignmentService
+from studytracker.reports import ReportGenerator
+from _db import create_database
+
+
+class GradeTotalsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 5)])
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)", [
+            (1, 'Spring quiz', '2024-03-10', 70.0),
+            (2, 'Fall lab', '2024-09-20', 90.0),
+            (1, 'Midterm', '2025-03-15', 60.0),
+            (2, 'Final', '2025-06-01', None),
+        ])
+        connection.commit()
+        self.reports = ReportGenerator(self.db)
+        self.assignments = AssignmentService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def totals(self):
+        rows = self.db.fetch_all("SELECT course_id, graded_count, grade_sum, weighted_sum, total_weight "
+                                 "FROM course_grade_totals WHERE graded_count > 0 ORDER BY course_id")
+        return [tuple(row) for row in rows]
+
+    def assert_totals_match(self, final_grade):
+        report = self.reports.verify_grade_totals()
+        self.assertTrue(report['ok'], report)
+        self.assertEqual(report['running'], final_grade)
+        self.assertEqual(self.reports.calculate_weighted_final_grade(), final_grade)
+        running = self.totals()
+        self.reports.rebuild_grade_totals()
+        self.assertEqual(self.totals(), running)
+        self.assertEqual(self.reports.calculate_weighted_final_grade(), final_grade)
+
+    def test_initial_totals(self):
+        # (70 + 60) * 3 + 90 * 5 over 2 * 3 + 1 * 5
+        self.assertEqual(self.totals(), [(1, 2, 130.0, 390.0, 6), (2, 1, 90.0, 450.0, 5)])
+        self.assert_totals_match(76.36)
+
+    def test_insert(self):
+        self.assignments.add_assignment(2, 'Essay', '2025-04-01', 80.0)
+        self.assignments.add_assignment(1, 'Homework', '2025-04-02')
+        self.assert_totals_match(77.5)
+
+    def test_update(self):
+        self.assignments.update_grade(4, 100.0)
+        self.assignments.update_grade(1, 40.0)
+        self.db.execute("UPDATE assignments SET grade = NULL WHERE id = 3")
+        self.assertEqual(self.totals()[0], (1, 1, 40.0, 120.0, 3))
+        self.assert_totals_match(82.31)
+
+    def test_move_to_another_course(self):
+        self.db.execute("UPDATE assignments SET course_id = 2 WHERE id = 3")
+        self.assert_totals_match(73.85)
+
+    def test_delete(self):
+        self.db.execute("DELETE FROM assignments WHERE id = 2")
+        self.assert_totals_match(65.0)
+
+    def test_credit_change(self):
+        self.db.execute("UPDATE courses SET credits = 1 WHERE id = 2")
+        self.assert_totals_match(68.57)
+
+    def test_archive(self):
+        archive.archive_before(self.db, '2025-01-01', os.path.join(self.tmpdir, 'archive'))
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM assignments")[0], 2)
+        self.assert_totals_match(76.36)
+        # Live changes after the archive still add to the archived part
+        self.assignments.update_grade(4, 50.0)
+        self.assert_totals_match(68.12)
+
+
+class TransactionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        self.db.execute("INSERT INTO courses (name, teacher, credits) VALUES ('Algebra', 'Dr. A', 3)")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_write_transaction_inside_read_transaction_is_refused(self):
+        with self.db.read_transaction():
+            with self.assertRaisesRegex(RuntimeError, 'inside read_transaction'):
+                with self.db.transaction():
+                    self.db.execute("UPDATE courses SET credits = 4")
+            self.assertTrue(self.db.connection.in_transaction)
+        self.assertEqual(self.db.fetch_one("SELECT credits FROM courses")[0], 3)
+
+        # Both work again once the read has ended
+        with self.db.transaction():
+            self.db.execute("UPDATE courses SET credits = 4")
+        self.assertEqual(self.db.fetch_one("SELECT credits FROM courses")[0], 4)
+
+    def test_read_transaction_inside_write_transaction_joins_it(self):
+        with self.db.transaction():
+            self.db.execute("UPDATE courses SET credits = 4")
+            with self.db.read_transaction():
+                self.assertEqual(self.db.fetch_one("SELECT credits FROM courses")[0], 4)
+                with self.db.transaction():
+                    self.db.execute("UPDATE courses SET credits = 5")
+        self.assertFalse(self.db.connection.in_transaction)
+        self.assertEqual(self.db.fetch_one("SELECT credits FROM courses")[0], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Invalidation of the read-through query cache.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from studytracker.course_service import CourseService
+from studytracker.study_session_service import StudySessionService
+from _db import create_database
+
+
+COURSES_QUERY = "SELECT id, name FROM courses ORDER BY id"
+ASSIGNMENTS_QUERY = "SELECT id FROM assignments ORDER BY id"
+
+
+class QueryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'tracker.db')
+        self.db = create_database(self.path, cache_size=16, cache_max_rows=5)
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 5)])
+        connection.executemany("INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+                               [(1, 'Quiz', '2025-03-10', 70.0), (2, 'Lab', '2025-04-20', None)])
+        connection.execute("INSERT INTO study_sessions (course_id, date, duration_minutes) VALUES (1, '2025-03-01', 60)")
+        connection.commit()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def course_names(self):
+        return [row['name'] for row in self.db.fetch_all(COURSES_QUERY)]
+
+    def assignment_ids(self):
+        return [row['id'] for row in self.db.fetch_all(ASSIGNMENTS_QUERY)]
+
+    def test_repeated_read_is_a_hit(self):
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+        info = self.db.cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['entries']), (1, 1, 1))
+
+    def test_returned_lists_are_copies(self):
+        self.db.fetch_all(COURSES_QUERY).clear()
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+
+    def test_execute_invalidates_the_written_table_only(self):
+        self.course_names()
+        self.assignment_ids()
+        self.db.execute("DELETE FROM assignments WHERE id = 2")
+        self.assertEqual(self.assignment_ids(), [1])
+        self.course_names()
+        self.assertEqual(self.db.cache_info()['hits'], 1)
+
+    def test_executemany_invalidates(self):
+        self.course_names()
+        self.db.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                            [('Chemistry', 'Dr. C', 4), ('Physics', 'Dr. D', 2)])
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology', 'Chemistry', 'Physics'])
+
+    def test_trigger_targets_are_invalidated(self):
+        service = StudySessionService(self.db)
+        self.assertEqual([row['total_minutes'] for row in service.get_study_summary_by_course()], [60])
+        # The rollup is written by a trigger on study_sessions
+        self.db.execute("INSERT INTO study_sessions (course_id, date, duration_minutes) VALUES (1, '2025-03-02', 30)")
+        self.assertEqual([row['total_minutes'] for row in service.get_study_summary_by_course()], [90])
+
+    def test_cascading_deletes_are_invalidated(self):
+        self.assertEqual(self.assignment_ids(), [1, 2])
+        self.db.execute("DELETE FROM courses WHERE id = 2")
+        self.assertEqual(self.assignment_ids(), [1])
+
+    def test_transaction_invalidates_on_commit(self):
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+        with self.db.transaction():
+            self.db.execute("UPDATE courses SET name = 'Algebra I' WHERE id = 1")
+            # Reads inside the transaction bypass the cache and see the write
+            self.assertEqual(self.course_names(), ['Algebra I', 'Biology'])
+        self.assertEqual(self.course_names(), ['Algebra I', 'Biology'])
+
+    def test_rolled_back_transaction_keeps_the_cache_valid(self):
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.execute("UPDATE courses SET name = 'Algebra I' WHERE id = 1")
+                raise RuntimeError("abort")
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+
+    def test_commit_by_another_connection_clears_the_cache(self):
+        self.assertEqual(self.course_names(), ['Algebra', 'Biology'])
+        other = sqlite3.connect(self.path)
+        try:
+            other.execute("UPDATE courses SET name = 'Zoology' WHERE id = 2")
+            other.commit()
+        finally:
+            other.close()
+        self.assertEqual(self.course_names(), ['Algebra', 'Zoology'])
+
+    def test_schema_change_clears_the_cache(self):
+        self.course_names()
+        self.db.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY)")
+        self.assertEqual(self.db.cache_info()['entries'], 0)
+
+    def test_service_lookups_see_new_rows(self):
+        service = CourseService(self.db)
+        self.assertIsNone(service.get_course_by_id(3))
+        course_id = service.add_course('Chemistry', 'Dr. C', 4)
+        self.assertEqual(service.get_course_by_id(course_id)['name'], 'Chemistry')
+
+    def test_long_results_are_not_cached(self):
+        self.db.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                            [(f"Course {i}", 'Dr. X', 1) for i in range(5)])
+        self.assertEqual(len(self.course_names()), 7)
+        self.assertEqual(self.db.cache_info()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
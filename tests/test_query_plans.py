@@ -0,0 +1,128 @@
+"""EXPLAIN QUERY PLAN checks that the service queries read through indexes.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from studytracker.db import Database
+from studytracker.course_service import CourseService
+from studytracker.assignment_service import AssignmentService
+from studytracker.study_session_service import StudySessionService
+from studytracker.search_service import SearchService
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One row per archive file; reading all of them is the point of the table
+SMALL_TABLES = {'archive_partitions'}
+
+SCAN_PATTERN = re.compile(r'^SCAN (\w+)')
+
+
+def full_scans(plan):
+    """Tables in an EXPLAIN QUERY PLAN that are read row by row without an index"""
+    tables = []
+    for detail in plan:
+        match = SCAN_PATTERN.match(detail)
+        if not match or match.group(1) in SMALL_TABLES:
+            continue
+        if 'USING' not in detail and 'VIRTUAL TABLE' not in detail:
+            tables.append(match.group(1))
+    return tables
+
+
+class QueryPlanTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.db = Database(os.path.join(cls.tmpdir, 'plans.db'))
+        cls.db.connect()
+        cls.db.initialize_schema(os.path.join(ROOT, 'database', 'schema.sql'))
+        cls.db.apply_migrations(os.path.join(ROOT, 'database', 'migrations'))
+        connection = cls.db.connection
+        connection.executemany(
+            "INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+            [(f"Course {i}", f"Teacher {i}", 1 + i % 6) for i in range(20)]
+        )
+        connection.executemany(
+            "INSERT INTO assignments (course_id, title, due_date, grade) VALUES (?, ?, ?, ?)",
+            [(1 + i % 20, f"Assignment {i} review", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+              None if i % 5 == 0 else 50 + i % 50) for i in range(500)]
+        )
+        connection.executemany(
+            "INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(1 + i % 20, 1 + i % 500 if i % 3 else None, f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+              15 + i % 120, f"Session {i} reviewed notes") for i in range(2000)]
+        )
+        connection.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        shutil.rmtree(cls.tmpdir)
+
+    def service_queries(self, call):
+        """SELECT statements, with their parameters bound, that ``call`` runs"""
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            self.db.connection.set_trace_callback(None)
+        return [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))]
+
+    def assert_no_full_scans(self, name, call):
+        with self.subTest(name):
+            queries = self.service_queries(call)
+            self.assertTrue(queries, f"{name} ran no queries")
+            for query in queries:
+                plan = [row[3] for row in self.db.connection.execute(f"EXPLAIN QUERY PLAN {query}")]
+                self.assertEqual(full_scans(plan), [], f"{name} scans a whole table:\n{query}\n" + "\n".join(plan))
+
+    def test_course_queries(self):
+        service = CourseService(self.db)
+        self.assert_no_full_scans('get_all_courses', service.get_all_courses)
+        self.assert_no_full_scans('get_course_by_id', lambda: service.get_course_by_id(3))
+
+    def test_assignment_queries(self):
+        service = AssignmentService(self.db)
+        self.assert_no_full_scans('get_all_assignments', service.get_all_assignments)
+        self.assert_no_full_scans('get_assignments_by_course', lambda: service.get_assignments_by_course(3))
+        self.assert_no_full_scans('get_assignments_due_between',
+                                  lambda: service.get_assignments_due_between('2025-03-01', '2025-04-01'))
+        self.assert_no_full_scans('get_upcoming_assignments', lambda: service.get_upcoming_assignments(30))
+        self.assert_no_full_scans('get_upcoming_assignments by course',
+                                  lambda: service.get_upcoming_assignments(30, 3))
+        self.assert_no_full_scans('get_assignment_by_id', lambda: service.get_assignment_by_id(5))
+
+    def test_session_queries(self):
+        service = StudySessionService(self.db)
+        self.assert_no_full_scans('get_all_sessions', service.get_all_sessions)
+        self.assert_no_full_scans('get_sessions_by_course', lambda: service.get_sessions_by_course(3))
+        self.assert_no_full_scans('get_sessions_between',
+                                  lambda: service.get_sessions_between('2025-03-01', '2025-04-01'))
+        self.assert_no_full_scans('get_study_summary_by_course', service.get_study_summary_by_course)
+        self.assert_no_full_scans('get_study_time_by_assignment', service.get_study_time_by_assignment)
+        self.assert_no_full_scans('get_study_time_by_assignment for one',
+                                  lambda: service.get_study_time_by_assignment(7))
+        for period in ('week', 'month'):
+            self.assert_no_full_scans(f'get_study_trend by {period}',
+                                      lambda: service.get_study_trend(period, '2025-03-05', '2025-04-09'))
+            self.assert_no_full_scans(f'get_study_trend by {period} for a course',
+                                      lambda: service.get_study_trend(period, '2025-03-05', '2025-04-09', 3))
+
+    def test_search_queries(self):
+        service = SearchService(self.db)
+        self.assert_no_full_scans('search', lambda: service.search('review'))
+        self.assert_no_full_scans('search by course and dates',
+                                  lambda: service.search('review', 3, '2025-03-01', '2025-06-01'))
+
+
+if __name__ == '__main__':
+    unittest.main()
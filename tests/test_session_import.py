@@ -0,0 +1,152 @@
+"""Session audit, bulk import and the 24-hour check of add_session.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from studytracker import archive
+from studytracker.study_session_service import StudySessionService
+from _db import create_database
+
+
+class SessionImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = create_database(os.path.join(self.tmpdir, 'tracker.db'))
+        connection = self.db.connection
+        connection.executemany("INSERT INTO courses (name, teacher, credits) VALUES (?, ?, ?)",
+                               [('Algebra', 'Dr. A', 3), ('Biology', 'Dr. B', 5)])
+        connection.execute("INSERT INTO assignments (course_id, title, due_date) VALUES (1, 'Quiz', '2025-03-10')")
+        connection.executemany(
+            "INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes) VALUES (?, ?, ?, ?, ?)", [
+                (1, 1, '2025-03-01', 60, 'chapter 1'),
+                (2, None, '2025-03-01', 120, None),
+                (1, None, '2025-03-02', 1400, 'marathon'),
+            ]
+        )
+        connection.commit()
+        self.service = StudySessionService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def session_count(self):
+        return self.db.fetch_one("SELECT COUNT(*) FROM study_sessions")[0]
+
+    def test_audit_finds_duplicates_and_overfull_days(self):
+        self.db.executemany(
+            "INSERT INTO study_sessions (course_id, assignment_id, date, duration_minutes, notes) VALUES (?, ?, ?, ?, ?)",
+            [(1, 1, '2025-03-01', 60, 'chapter 1'), (1, None, '2025-03-02', 50, None)]
+        )
+        report = self.service.audit_sessions()
+        self.assertEqual([(d['ref'], d['duplicate_of']) for d in report['duplicates']], [(4, 1)])
+        self.assertEqual(report['duplicate_minutes'], 60)
+        self.assertEqual([(d['date'], d['minutes'], d['sessions']) for d in report['overfull_days']],
+                         [('2025-03-02', 1450, 2)])
+
+        report = self.service.audit_sessions('2025-03-02', '2025-03-31')
+        self.assertEqual(report['duplicates'], [])
+        self.assertEqual(len(report['overfull_days']), 1)
+
+    def test_add_session_checks_the_course_before_the_day(self):
+        with self.assertRaisesRegex(ValueError, 'Course with ID 99 does not exist'):
+            self.service.add_session(99, '2025-03-02', 60)
+        with self.assertRaisesRegex(ValueError, 'more than 24 hours'):
+            self.service.add_session(2, '2025-03-02', 60)
+        self.service.add_session(2, '2025-3-2', 40)
+        self.assertEqual(self.db.fetch_one("SELECT date FROM study_sessions WHERE id = 4")['date'], '2025-03-02')
+
+    def test_archived_sessions_do_not_count_towards_a_day(self):
+        archive.archive_before(self.db, '2025-03-02', os.path.join(self.tmpdir, 'archive'))
+        self.service.add_session(1, '2025-03-01', 1300)
+        path = self.write('sessions.csv', "course_id,date,duration_minutes\n2,2025-03-01,100\n")
+        self.assertEqual(self.service.import_sessions(path)['imported'], 1)
+
+    def test_import_csv(self):
+        path = self.write('sessions.csv', "course_id,date,duration_minutes,assignment_id,notes\n"
+                                          "1,2025-3-5,45,1,new\n"
+                                          "2,2025-03-06,30,,\n")
+        report = self.service.import_sessions(path)
+        self.assertEqual(report, {'imported': 2, 'duplicates': [], 'overfull_days': []})
+        rows = self.db.fetch_all("SELECT course_id, assignment_id, date, duration_minutes, notes "
+                                 "FROM study_sessions WHERE id > 3 ORDER BY id")
+        self.assertEqual([tuple(row) for row in rows],
+                         [(1, 1, '2025-03-05', 45, 'new'), (2, None, '2025-03-06', 30, None)])
+
+    def test_import_rejects_stored_and_repeated_duplicates(self):
+        path = self.write('sessions.csv', "course_id,date,duration_minutes,assignment_id,notes\n"
+                                          "1,2025-03-01,60,1,chapter 1\n"
+                                          "2,2025-03-07,30,,\n"
+                                          "2,2025-03-07,30,,\n")
+        report = self.service.import_sessions(path)
+        self.assertEqual(report['imported'], 0)
+        self.assertEqual([(d['ref'], d['duplicate_of'], d['duplicate_of_imported']) for d in report['duplicates']],
+                         [(2, 1, False), (4, 3, True)])
+        self.assertEqual(self.session_count(), 3)
+
+    def test_import_skip_duplicates(self):
+        path = self.write('sessions.csv', "course_id,date,duration_minutes,assignment_id,notes\n"
+                                          "1,2025-03-01,60,1,chapter 1\n"
+                                          "2,2025-03-07,30,,\n"
+                                          "2,2025-03-07,30,,\n")
+        report = self.service.import_sessions(path, skip_duplicates=True)
+        self.assertEqual(report['imported'], 1)
+        self.assertTrue(all(d['dropped'] for d in report['duplicates']))
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) FROM study_sessions WHERE date = '2025-03-07'")[0], 1)
+        self.assertEqual(self.session_count(), 4)
+
+    def test_import_overfull_days(self):
+        path = self.write('sessions.jsonl', json.dumps({'course_id': 2, 'date': '2025-03-02', 'duration_minutes': 60})
+                          + "\n" + json.dumps({'course_id': 2, 'date': '2025-03-09', 'duration_minutes': 30}) + "\n")
+        report = self.service.import_sessions(path)
+        self.assertEqual(report['imported'], 0)
+        self.assertEqual([(d['date'], d['minutes']) for d in report['overfull_days']], [('2025-03-02', 1460)])
+        self.assertEqual(self.session_count(), 3)
+
+        self.assertEqual(self.service.import_sessions(path, allow_overfull=True)['imported'], 2)
+        self.assertEqual(self.session_count(), 5)
+
+    def test_import_errors_name_the_line(self):
+        path = self.write('sessions.csv', "course_id,date,duration_minutes\n"
+                                          "1,2025-03-05,45\n"
+                                          "\n"
+                                          "1,2025-02-30,45\n")
+        with self.assertRaisesRegex(ValueError, r'sessions\.csv, line 4:'):
+            self.service.import_sessions(path)
+
+        path = self.write('sessions.jsonl', json.dumps({'course_id': 1, 'date': '2025-03-05', 'duration_minutes': 5})
+                          + "\n\n" + json.dumps({'course_id': 1, 'date': '2025-03-05', 'duration_minutes': 0}) + "\n")
+        with self.assertRaisesRegex(ValueError, r'sessions\.jsonl, line 3:'):
+            self.service.import_sessions(path)
+        path = self.write('sessions.jsonl', "{\"course_id\": 1,\n")
+        with self.assertRaisesRegex(ValueError, r'sessions\.jsonl, line 1:'):
+            self.service.import_sessions(path)
+        self.assertEqual(self.session_count(), 3)
+
+    def test_import_rejects_unknown_ids(self):
+        path = self.write('sessions.csv', "course_id,date,duration_minutes,assignment_id\n"
+                                          "7,2025-03-05,45,\n"
+                                          "1,2025-03-05,45,9\n")
+        with self.assertRaisesRegex(ValueError, r'Unknown course_id\(s\): 7'):
+            self.service.import_sessions(path)
+        path = self.write('sessions.csv', "course_id,date,duration_minutes,assignment_id\n"
+                                          "1,2025-03-05,45,9\n")
+        with self.assertRaisesRegex(ValueError, r'Unknown assignment_id\(s\): 9'):
+            self.service.import_sessions(path)
+        self.assertEqual(self.session_count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()